@@ -1,7 +1,74 @@
-__all__ = ["WSTest", "WSResponse", "WSMessage", "WSTimeoutError", "RestRequest"]
+import importlib
+from typing import TYPE_CHECKING
 
-from .ws_message import WSMessage
-from .ws_response import WSResponse
-from .ws_test import WSTest
-from .ws_timeout_error import WSTimeoutError
-from .rest_request import RestRequest
+__all__ = [
+    "WSTest",
+    "WSResponse",
+    "WSMessage",
+    "WSTimeoutError",
+    "WSPerformanceError",
+    "RestRequest",
+    "WSServer",
+    "WSStats",
+    "LatencyHistogram",
+    "MetricsExporter",
+    "WSTracer",
+    "EventLogWriter",
+    "LoadProfile",
+    "LoadOptions",
+    "LoadRunner",
+    "DataFeeder",
+    "LoadCoordinator",
+    "LoadWorker",
+]
+
+# each class is imported from its module on first use, so importing pywsitest stays cheap
+_MODULES = {
+    "WSTest": ".ws_test",
+    "WSResponse": ".ws_response",
+    "WSMessage": ".ws_message",
+    "WSTimeoutError": ".ws_timeout_error",
+    "WSPerformanceError": ".ws_performance_error",
+    "RestRequest": ".rest_request",
+    "WSServer": ".ws_server",
+    "WSStats": ".ws_stats",
+    "LatencyHistogram": ".ws_stats",
+    "MetricsExporter": ".ws_metrics",
+    "WSTracer": ".ws_tracer",
+    "EventLogWriter": ".ws_event_log",
+    "LoadProfile": ".ws_load",
+    "LoadOptions": ".ws_load",
+    "LoadRunner": ".ws_load",
+    "DataFeeder": ".ws_feeder",
+    "LoadCoordinator": ".ws_distributed",
+    "LoadWorker": ".ws_distributed",
+}
+
+if TYPE_CHECKING:
+    from .ws_message import WSMessage
+    from .ws_response import WSResponse
+    from .ws_test import WSTest
+    from .ws_timeout_error import WSTimeoutError
+    from .ws_performance_error import WSPerformanceError
+    from .rest_request import RestRequest
+    from .ws_server import WSServer
+    from .ws_stats import WSStats, LatencyHistogram
+    from .ws_metrics import MetricsExporter
+    from .ws_tracer import WSTracer
+    from .ws_event_log import EventLogWriter
+    from .ws_load import LoadProfile, LoadOptions, LoadRunner
+    from .ws_feeder import DataFeeder
+    from .ws_distributed import LoadCoordinator, LoadWorker
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,402 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import List
+
+from . import runner
+from .rest_request import RestRequest
+from .ws_load import LoadOptions, LoadProfile, LoadRunner, take_objectives
+from .ws_message import WSMessage
+from .ws_performance_error import check_objectives
+from .ws_response import WSResponse
+from .ws_stats import WSStats
+from .ws_test import WSTest
+from .ws_timeout_error import WSTimeoutError
+
+
+SCENARIO_KEYS = {
+    "uri", "parameters", "headers", "messages", "responses", "requests",
+    "response_timeout", "message_timeout", "request_timeout", "test_timeout",
+}
+
+
+def load_scenarios(path: str) -> List[dict]:
+    """
+    Loads scenarios from a json or yaml file, yaml needing PyYAML to be installed
+    The file holds a scenario, a list of scenarios, or an object with a "scenarios" list
+
+    Parameters:
+        path (str): The path of the scenario file
+
+    Returns:
+        (list[dict]): The scenarios
+    """
+    with open(path, encoding="utf-8") as scenario_file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml  # pylint:disable=import-outside-toplevel
+            except ImportError as ex:
+                raise ValueError("PyYAML is needed to load yaml scenarios: pip install pywsitest[yaml]") from ex
+            content = yaml.safe_load(scenario_file)
+        else:
+            content = json.load(scenario_file)
+
+    if isinstance(content, dict):
+        content = content.get("scenarios", [content])
+    if not isinstance(content, list) or not content:
+        raise ValueError(f"No scenarios found in {path}")
+
+    for scenario in content:
+        if "uri" not in scenario:
+            raise ValueError("Every scenario needs a uri")
+        unknown = set(scenario) - SCENARIO_KEYS
+        if unknown:
+            raise ValueError(f"Unknown scenario keys: {', '.join(sorted(unknown))}")
+    return content
+
+
+def build_test(scenario: dict, user: int = 0) -> WSTest:
+    """
+    Builds a WSTest from a scenario, replacing ${user} in any string with the index of the virtual user
+
+    Parameters:
+        scenario (dict): The scenario, as loaded by load_scenarios
+        user (int): The index of the virtual user running the test
+
+    Returns:
+        (WSTest): The test the scenario describes
+    """
+    scenario = _substitute(scenario, str(user))
+    ws_test = WSTest(scenario["uri"])
+
+    for key, value in scenario.get("parameters", {}).items():
+        ws_test.with_parameter(key, value)
+    for key, value in scenario.get("headers", {}).items():
+        ws_test.with_header(key, value)
+    for message in scenario.get("messages", []):
+        ws_test.with_message(_build_message(message))
+    for response in scenario.get("responses", []):
+        ws_test.with_response(_build_response(response))
+    for request in scenario.get("requests", []):
+        ws_test.with_request(_build_request(request))
+
+    for timeout in ("response_timeout", "message_timeout", "request_timeout", "test_timeout"):
+        if timeout in scenario:
+            getattr(ws_test, f"with_{timeout}")(scenario[timeout])
+    return ws_test
+
+
+def run(scenarios: List[dict], options: LoadOptions = None, workers: int = 1) -> WSStats:
+    """
+    Runs scenarios as virtual users, each user running the scenario at its index modulo the number of scenarios
+    Performance objectives of WSTest templates are checked once against the stats of every worker
+
+    Parameters:
+        scenarios (list[dict or WSTest]): The scenarios, as loaded by load_scenarios, or WSTest templates to spawn
+        options (LoadOptions, optional): The users to run, how to start and hold them and the event loop
+            each process uses, one user running once on the auto loop if not given
+        workers (int): The number of processes to share the users between
+
+    Returns:
+        (WSStats): The stats of every run
+
+    Raises:
+        WSPerformanceError: If the runs together missed any of the templates' performance objectives
+    """
+    stats = WSStats().start()
+    objectives = []
+    scenarios = [
+        take_objectives(scenario.spawn(), objectives) if isinstance(scenario, WSTest) else scenario
+        for scenario in scenarios
+    ]
+    options = options or LoadOptions()
+    workers = max(1, min(workers, options.users))
+    jobs = [
+        (scenarios, first_user, share_options(options, share))
+        for first_user, share in split_users(options.users, workers)
+    ]
+
+    if workers == 1:
+        stats.merge(_run_worker(jobs[0]))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            for worker_stats in pool.map(_run_worker, jobs):
+                stats.merge(worker_stats)
+
+    if objectives:
+        check_objectives(stats, objectives)
+    return stats
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Runs the pywsitest command
+
+    Parameters:
+        argv (list[str], optional): The command line arguments, sys.argv if not given
+
+    Returns:
+        (int): The exit code, 1 if any run failed
+    """
+    parser = argparse.ArgumentParser(prog="pywsitest", description="Run websocket test scenarios from a file")
+    parser.add_argument("scenario", help="a json or yaml scenario file")
+    parser.add_argument("--users", type=int, default=1, help="the number of virtual users (default 1)")
+    parser.add_argument("--duration", type=float, help="seconds to hold every user for, each user runs once if unset")
+    parser.add_argument("--rate", type=float, help="users to start per second, all at once if unset")
+    parser.add_argument("--workers", type=int, default=1, help="processes to share the users between (default 1)")
+    parser.add_argument("--loop", choices=runner.LOOPS, default="auto",
+                        help="the event loop to use, auto picks uvloop when it's installed (default auto)")
+    parser.add_argument("--max-latency", type=_latency_objective, action="append", default=[],
+                        metavar="PERCENTILE=SECONDS",
+                        help="fail if a response latency percentile is higher, such as p99=0.2, can be repeated")
+    parser.add_argument("--min-throughput", type=float, help="fail if fewer frames are received per second")
+    parser.add_argument("--max-error-rate", type=float, help="fail if a higher fraction of runs fail, such as 0.001")
+    parser.add_argument("--remote-workers", type=int, default=0,
+                        help="run the users on this many pywsitest-worker processes instead, on this or other hosts")
+    parser.add_argument("--listen", default="127.0.0.1:7777",
+                        help="the host:port or unix socket path to wait for remote workers on, only ever a private "
+                             "interface as workers exchange pickled data (default 127.0.0.1:7777)")
+    parser.add_argument("--output", help="a path to write the results to as json")
+    args = parser.parse_args(argv)
+
+    if args.users < 1 or args.workers < 1:
+        parser.error("--users and --workers must be at least 1")
+    if args.remote_workers and not os.environ.get("PYWSITEST_AUTHKEY"):
+        parser.error("set PYWSITEST_AUTHKEY to a key shared with the remote workers")
+    try:
+        loop = runner.loop_name(args.loop)
+        scenarios = load_scenarios(args.scenario)
+    except (OSError, ValueError) as ex:
+        parser.error(str(ex))
+
+    objectives = list(args.max_latency)
+    if args.min_throughput is not None:
+        objectives.append({"metric": "frames_received_per_second", "min": args.min_throughput})
+    if args.max_error_rate is not None:
+        objectives.append({"metric": "error_rate", "max": args.max_error_rate})
+
+    if args.remote_workers:
+        stats = _run_remote(scenarios, args, loop)
+    else:
+        stats = run(scenarios, LoadOptions(args.users, args.duration, args.rate, loop), args.workers)
+    snapshot = stats.snapshot()
+    report = stats.check(objectives)
+    results = {
+        "users": args.users,
+        "duration": args.duration,
+        "rate": args.rate,
+        "workers": args.workers,
+        "remote_workers": args.remote_workers,
+        "loop": loop,
+        "stats": snapshot,
+        "objectives": report,
+    }
+
+    print(format_summary(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    return 1 if snapshot["failures"] or not all(check["passed"] for check in report) else 0
+
+
+def format_summary(results: dict) -> str:
+    """
+    Parameters:
+        results (dict): The results written by the pywsitest command
+
+    Returns:
+        (str): A readable summary of the throughput and latencies
+    """
+    stats = results["stats"]
+    lines = [
+        f"users: {results['users']}  workers: {results['workers']}  loop: {results.get('loop', 'asyncio')}  "
+        f"elapsed: {stats['elapsed']:.2f}s",
+        f"runs: {stats['runs']}  failures: {stats['failures']}  timeouts: {stats['timeouts']}",
+        f"frames sent: {stats['frames_sent']} ({stats['frames_sent_per_second']:.1f}/s)  "
+        f"received: {stats['frames_received']} ({stats['frames_received_per_second']:.1f}/s)",
+    ]
+    if stats["queue_time"]["count"]:
+        lines.append(f"max receive queue depth: {stats['max_queue_depth']}")
+    for name in ("connect_duration", "response_latency", "round_trip", "request_latency", "run_duration", "recv_wait",
+                 "queue_time"):
+        summary = stats[name]
+        if summary["count"]:
+            lines.append(
+                f"{name}: p50 {summary['p50'] * 1000:.1f}ms  p90 {summary['p90'] * 1000:.1f}ms  "
+                f"p99 {summary['p99'] * 1000:.1f}ms  max {summary['max'] * 1000:.1f}ms"
+            )
+    for check in results.get("objectives", []):
+        limit = f"max {check['max']}" if "max" in check else f"min {check['min']}"
+        lines.append(f"{check['metric']}: {check['actual']:.6g} ({limit}) {'passed' if check['passed'] else 'FAILED'}")
+    return "\n".join(lines)
+
+
+def _latency_objective(value: str) -> dict:
+    percentile, _, limit = value.partition("=")
+    if percentile not in ("p50", "p90", "p99"):
+        raise argparse.ArgumentTypeError(f"expected p50, p90 or p99=SECONDS, got {value}")
+    try:
+        return {"metric": f"response_latency/{percentile}", "max": float(limit)}
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(f"expected p50, p90 or p99=SECONDS, got {value}") from ex
+
+
+def split_users(users: int, workers: int) -> List[tuple]:
+    """
+    Shares virtual users between workers as evenly as possible
+
+    Parameters:
+        users (int): The number of virtual users
+        workers (int): The number of workers
+
+    Returns:
+        (list[tuple[int, int]]): The (first user, number of users) of each worker
+    """
+    shares = [(users + worker) // workers for worker in range(workers)]
+    return [(sum(shares[:worker]), share) for worker, share in enumerate(shares)]
+
+
+def share_options(options: LoadOptions, users: int) -> LoadOptions:
+    """
+    Parameters:
+        options (LoadOptions): The options of every virtual user
+        users (int): The number of the users a worker runs
+
+    Returns:
+        (LoadOptions): The options of the worker's users, starting them at its share of the rate
+    """
+    return options._replace(users=users, rate=options.rate and options.rate * users / options.users)
+
+
+def make_factory(scenarios: list, first_user: int = 0):
+    """
+    Parameters:
+        scenarios (list[dict or WSTest]): Scenarios as loaded by load_scenarios, or WSTest templates to spawn
+        first_user (int): The index of the first user, added to the index each user is created with
+
+    Returns:
+        (callable): A function creating the WSTest for the user at an index, such as a LoadRunner factory
+    """
+    # templates, and scenarios that don't depend on the user, are built once and spawned for each user
+    templates = [
+        scenario if isinstance(scenario, WSTest)
+        else None if "${user}" in json.dumps(scenario) else build_test(scenario)
+        for scenario in scenarios
+    ]
+
+    def factory(user: int) -> WSTest:
+        user += first_user
+        template = templates[user % len(scenarios)]
+        return template.spawn() if template else build_test(scenarios[user % len(scenarios)], user)
+
+    return factory
+
+
+def _run_remote(scenarios: List[dict], args: argparse.Namespace, loop: str) -> WSStats:
+    # imported here as the distributed module builds on this one
+    from .ws_distributed import LoadCoordinator, get_authkey, parse_address  # pylint:disable=import-outside-toplevel
+
+    with LoadCoordinator(parse_address(args.listen), get_authkey()) as coordinator:
+        print(f"waiting for {args.remote_workers} workers on {args.listen}", file=sys.stderr)
+        return coordinator.run(scenarios, args.remote_workers, LoadOptions(args.users, args.duration, args.rate, loop))
+
+
+def _run_worker(job: tuple) -> WSStats:
+    scenarios, first_user, options = job
+    factory = make_factory(scenarios, first_user)
+    return runner.run(run_users(factory, options.users, options.duration, options.rate), options.loop)
+
+
+async def run_users(factory, users: int, duration: float = None, rate: float = None,
+                    stats: WSStats = None) -> WSStats:
+    """
+    Runs virtual users in this process
+    Performance objectives of the users' tests are checked once against the stats of every run, after the last one
+
+    Parameters:
+        factory (callable): Called with the index of a virtual user, returning a new WSTest to run
+        users (int): The number of virtual users
+        duration (float, optional): The time to hold every user for in seconds, each running once if not given
+        rate (float, optional): The number of users to start per second, all at once if not given
+        stats (WSStats, optional): The stats to aggregate every run into, a new WSStats if not given
+
+    Returns:
+        (WSStats): The stats of every run
+
+    Raises:
+        WSPerformanceError: If the runs together missed any of the tests' performance objectives
+    """
+    from websockets.exceptions import WebSocketException  # pylint:disable=import-outside-toplevel
+
+    stats = (stats or WSStats()).start()
+    if duration is not None:
+        profile = LoadProfile()
+        if rate:
+            profile.with_ramp(users, rate)
+        else:
+            profile.with_step(users, 0.0)
+        load_runner = LoadRunner(factory, profile.with_hold(duration))
+        load_runner.stats = stats
+        await load_runner.run()
+        return stats
+
+    started = time.monotonic()
+    objectives = []
+
+    async def run_user(user: int):
+        if rate:
+            await asyncio.sleep(max(0.0, started + user / rate - time.monotonic()))
+        try:
+            await take_objectives(factory(user), objectives).with_stats(stats).run()
+        except (WSTimeoutError, WebSocketException, OSError):
+            stats.failures += 1
+
+    await asyncio.gather(*(run_user(user) for user in range(users)))
+    if objectives:
+        check_objectives(stats, objectives)
+    return stats
+
+
+def _substitute(value, user: str):
+    if isinstance(value, str):
+        return value.replace("${user}", user)
+    if isinstance(value, list):
+        return [_substitute(item, user) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, user) for key, item in value.items()}
+    return value
+
+
+def _build_message(message: dict) -> WSMessage:
+    ws_message = WSMessage().with_delay(message.get("delay", 0.0))
+    for key, value in message.get("attributes", {}).items():
+        ws_message.with_attribute(key, value)
+    return ws_message
+
+
+def _build_response(response: dict) -> WSResponse:
+    ws_response = WSResponse()
+    for key, value in response.get("attributes", {}).items():
+        ws_response.with_attribute(key, value)
+    for trigger in response.get("triggers", []):
+        ws_response.with_trigger(_build_message(trigger))
+    if "timeout" in response:
+        ws_response.with_timeout(response["timeout"])
+    return ws_response
+
+
+def _build_request(request: dict) -> RestRequest:
+    rest_request = RestRequest(request["uri"], request.get("method", "GET")).with_delay(request.get("delay", 0.0))
+    for key, value in request.get("headers", {}).items():
+        rest_request.with_header(key, value)
+    if "body" in request:
+        rest_request.with_body(request["body"])
+    return rest_request
+
+
+if __name__ == "__main__":
+    sys.exit(main())
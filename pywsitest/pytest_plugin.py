@@ -0,0 +1,255 @@
+"""
+A pytest plugin running websocket tests on one session-wide event loop
+
+Tests marked with @pytest.mark.wstest return a WSTest (or a coroutine returning one) instead of running it
+The plugin runs the WSTest and fails the test if it times out or isn't complete
+Marked tests that use no fixtures and can't be skipped are started together when the first of them is reached,
+up to --ws-concurrency at a time, so a suite of independent websocket tests waits on the network concurrently
+rather than in turn
+Tests run in turn can reuse one connection per uri for the session through the ws_connection fixture
+"""
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+import pytest
+
+from . import runner
+
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
+
+
+PLUGIN_NAME = "pywsitest-runner"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("pywsitest")
+    group.addoption(
+        "--ws-concurrency",
+        type=int,
+        default=50,
+        help="The number of wstest tests without fixtures to run at once, 0 to run each in turn",
+    )
+    group.addoption(
+        "--ws-loop",
+        choices=runner.LOOPS,
+        default="auto",
+        help="The event loop to run wstest tests on, auto picks uvloop when it's installed",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "wstest: the test returns a WSTest for pywsitest to run on the shared event loop",
+    )
+    try:
+        loop = runner.loop_name(config.getoption("ws_loop"))
+    except ValueError as ex:
+        raise pytest.UsageError(str(ex)) from ex
+    config.pluginmanager.register(WSTestPlugin(config.getoption("ws_concurrency"), loop), PLUGIN_NAME)
+
+
+def pytest_report_header(config) -> str:
+    return f"pywsitest: {config.pluginmanager.get_plugin(PLUGIN_NAME).loop} event loop"
+
+
+@pytest.fixture(scope="session")
+def ws_loop(request) -> asyncio.AbstractEventLoop:
+    """
+    The session-wide event loop, running in a background thread
+    """
+    return request.config.pluginmanager.get_plugin(PLUGIN_NAME).loop_thread.loop
+
+
+@pytest.fixture(scope="session")
+def ws_run(request):
+    """
+    A function running a coroutine, or a WSTest, on the session-wide event loop and returning the result
+    """
+    return request.config.pluginmanager.get_plugin(PLUGIN_NAME).loop_thread.run
+
+
+@pytest.fixture(scope="session")
+def ws_connection(request):
+    """
+    An async function returning a websocket connection to a uri, opened the first time it's asked for
+    and kept open for the rest of the session, to pass to WSTest.with_websocket in async wstest tests
+    """
+    return request.config.pluginmanager.get_plugin(PLUGIN_NAME).connection
+
+
+class LoopThread:
+    """
+    A class representing an event loop running forever in a daemon thread
+
+    Attributes:
+        loop (AbstractEventLoop)
+        loop_name (str)
+
+    Methods:
+        submit(coroutine):
+            Schedules a coroutine on the loop and returns a concurrent Future for its result
+        run(coroutine or WSTest):
+            Runs a coroutine, or a WSTest, on the loop and waits for the result
+        close():
+            Stops the loop and waits for the thread to finish
+    """
+
+    def __init__(self, loop: str = "auto"):
+        """
+        Parameters:
+            loop (str): The event loop to run, auto, uvloop or asyncio
+        """
+        self.loop_name = runner.loop_name(loop)
+        self.loop = runner.new_event_loop(loop)
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine) -> Future:
+        """
+        Parameters:
+            coroutine (coroutine): The coroutine to schedule
+
+        Returns:
+            (Future): A thread-safe future for the result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, runnable, timeout: float = None):
+        """
+        Parameters:
+            runnable (coroutine or WSTest): The coroutine to run, or a WSTest to call run on
+            timeout (float, optional): The time to wait for the result in seconds
+
+        Returns:
+            (object): The result of the coroutine
+        """
+        coroutine = runnable if inspect.isawaitable(runnable) else runnable.run()
+        return self.submit(coroutine).result(timeout)
+
+    def close(self):
+        """
+        Stops the loop and waits for the thread to finish
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class WSTestPlugin:
+    """
+    A class representing the pytest hooks that run wstest tests on a LoopThread
+
+    Attributes:
+        concurrency (int)
+        loop (str)
+
+    Methods:
+        async connection(uri: str):
+            Returns the session's open connection to a uri, opening one if there isn't one
+    """
+
+    def __init__(self, concurrency: int, loop: str = "auto"):
+        self.concurrency = concurrency
+        self.loop = loop
+        self._connections = {}
+        self._loop_thread = None
+        self._semaphore = None
+        self._concurrent_items = []
+        self._pending = None
+
+    @property
+    def loop_thread(self) -> LoopThread:
+        """
+        Returns:
+            (LoopThread): The session-wide loop, started on first use
+        """
+        if self._loop_thread is None:
+            self._loop_thread = LoopThread(self.loop)
+        return self._loop_thread
+
+    async def connection(self, uri: str, **kwargs) -> "WebSocketClientProtocol":
+        """
+        Parameters:
+            uri (str): The uri to connect to
+            kwargs: Any other arguments to pass to websockets.connect when a connection is opened
+
+        Returns:
+            (WebSocketClientProtocol): The open connection to the uri, a new one if the last one has closed
+        """
+        # websockets is only imported once a connection is made, keeping pywsitest quick to import
+        import websockets  # pylint:disable=import-outside-toplevel
+        from websockets.protocol import State  # pylint:disable=import-outside-toplevel
+
+        # marked tests run on the session-wide loop, so the connection is opened there and only ever used there
+        websocket = self._connections.get(uri)
+        if websocket is None or websocket.state is not State.OPEN:
+            websocket = self._connections[uri] = await websockets.connect(uri, **kwargs)
+        return websocket
+
+    def pytest_collection_finish(self, session):
+        # session.items is only final once -k and -m have deselected tests, and fixturenames includes
+        # autouse and usefixtures fixtures, which a test started early would run without
+        if self.concurrency:
+            self._concurrent_items = [
+                item for item in session.items
+                if item.get_closest_marker("wstest") and not getattr(item, "fixturenames", None)
+                and not _may_not_run(item)
+            ]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_pyfunc_call(self, pyfuncitem):
+        if not pyfuncitem.get_closest_marker("wstest"):
+            return None
+
+        if self._pending is None:
+            # start every test that doesn't need fixtures now, each reports when its own turn comes
+            self._pending = {
+                item.nodeid: self.loop_thread.submit(self._run(item.obj, {}))
+                for item in self._concurrent_items
+            }
+
+        future = self._pending.pop(pyfuncitem.nodeid, None)
+        if future is None:
+            argnames = pyfuncitem._fixtureinfo.argnames  # pylint:disable=protected-access
+            kwargs = {name: pyfuncitem.funcargs[name] for name in argnames}
+            future = self.loop_thread.submit(self._run(pyfuncitem.obj, kwargs))
+
+        future.result()
+        return True
+
+    def pytest_sessionfinish(self):
+        if self._loop_thread is not None:
+            for future in (self._pending or {}).values():
+                future.cancel()
+            for websocket in self._connections.values():
+                self._loop_thread.run(websocket.close())
+            self._connections = {}
+            self._loop_thread.close()
+            self._loop_thread = None
+
+    async def _run(self, function, kwargs: dict):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency or 1)
+
+        async with self._semaphore:
+            ws_test = function(**kwargs)
+            if inspect.isawaitable(ws_test):
+                ws_test = await ws_test
+            await ws_test.run()
+
+        if not ws_test.is_complete():
+            raise AssertionError(f"WSTest did not complete: {ws_test.uri}")
+
+
+def _may_not_run(item) -> bool:
+    # skipped tests are only known to be skipped once their setup runs, so any that might be are run in turn
+    return (
+        item.get_closest_marker("skip") is not None
+        or item.get_closest_marker("skipif") is not None
+        or any(not marker.kwargs.get("run", True) for marker in item.iter_markers("xfail"))
+    )
@@ -1,9 +1,7 @@
-import requests
-
-
 class RestRequest:
     """
     A class representing a rest request
+    Clones share their headers and body until one of them changes them through with_header or with_body
 
     Attributes:
         uri (str)
@@ -21,6 +19,8 @@ class RestRequest:
             Adds a delay and returns RestRequest
         send(timeout (float)):
             Composes and sends rest request, returning request response
+        clone():
+            Returns a copy of the RestRequest sharing its headers and body until either changes them
 
     Usage:
         rest_request = (
@@ -33,6 +33,8 @@ class RestRequest:
         rest_request.send(10.0)
     """
 
+    __slots__ = ("uri", "method", "headers", "body", "delay", "_shared")
+
     def __init__(self, uri: str, method: str):
         """
             Parameters:
@@ -44,6 +46,7 @@ class RestRequest:
         self.headers = {}
         self.body = {}
         self.delay = 0.0
+        self._shared = False
 
     def with_header(self, key: str, value: str) -> "RestRequest":
         """
@@ -57,6 +60,9 @@ class RestRequest:
         Returns:
             (RestRequest): The RestRequest instance with_header was called on
         """
+        if self._shared:
+            self.headers = dict(self.headers)
+            self._shared = False
         self.headers[key] = value
         return self
 
@@ -94,6 +100,9 @@ class RestRequest:
         Returns:
             (Response): An instance of a response object with the response of the rest api
         """
+        # requests is only imported once a request is sent, keeping pywsitest quick to import
+        import requests  # pylint:disable=import-outside-toplevel
+
         kwargs = {"timeout": timeout}
         if self.headers:
             kwargs["headers"] = self.headers
@@ -101,3 +110,19 @@ class RestRequest:
             kwargs["json"] = self.body
 
         return requests.request(self.method, self.uri, **kwargs)
+
+    def clone(self) -> "RestRequest":
+        """
+        Copies the request without copying its headers or body, the headers are copied by whichever changes them first
+
+        Returns:
+            (RestRequest): A new RestRequest with the same uri, method, headers, body and delay
+        """
+        request = RestRequest.__new__(RestRequest)
+        request.uri = self.uri
+        request.method = self.method
+        request.headers = self.headers
+        request.body = self.body
+        request.delay = self.delay
+        request._shared = self._shared = True  # noqa: pylint - protected-access
+        return request
@@ -0,0 +1,102 @@
+"""
+Runs coroutines on a new event loop, using uvloop when it's installed and the standard asyncio loop otherwise
+
+Loops:
+    auto: uvloop if it can be imported, asyncio otherwise
+    uvloop: uvloop, raising ValueError if it isn't installed
+    asyncio: the standard library loop
+
+Usage:
+    from pywsitest import runner
+
+    ws_test = WSTest("wss://example.com")
+    runner.run(ws_test.run(), loop="auto")
+    print(ws_test.stats.snapshot())
+"""
+import asyncio
+
+
+LOOPS = ("auto", "uvloop", "asyncio")
+
+
+def loop_name(loop: str = "auto") -> str:
+    """
+    Parameters:
+        loop (str): The loop to use, auto, uvloop or asyncio
+
+    Raises:
+        ValueError: If the loop is unknown, or is uvloop and uvloop isn't installed
+
+    Returns:
+        (str): The loop that would be used, uvloop or asyncio
+    """
+    if loop not in LOOPS:
+        raise ValueError(f"Unknown event loop {loop}, expected one of {', '.join(LOOPS)}")
+    if loop == "asyncio":
+        return loop
+    return "uvloop" if _import_uvloop(loop) else "asyncio"
+
+
+def new_event_loop(loop: str = "auto") -> asyncio.AbstractEventLoop:
+    """
+    Parameters:
+        loop (str): The loop to create, auto, uvloop or asyncio
+
+    Raises:
+        ValueError: If the loop is unknown, or is uvloop and uvloop isn't installed
+
+    Returns:
+        (AbstractEventLoop): A new event loop
+    """
+    uvloop = _import_uvloop(loop) if loop_name(loop) != "asyncio" else None
+    return uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+
+
+def run(coroutine, loop: str = "auto"):
+    """
+    Runs a coroutine to completion on a new event loop, like asyncio.run, then closes the loop
+
+    Parameters:
+        coroutine (coroutine): The coroutine to run
+        loop (str): The loop to run it on, auto, uvloop or asyncio
+
+    Raises:
+        ValueError: If the loop is unknown, or is uvloop and uvloop isn't installed
+
+    Returns:
+        (object): The result of the coroutine
+    """
+    try:
+        event_loop = new_event_loop(loop)
+    except ValueError:
+        coroutine.close()
+        raise
+
+    try:
+        asyncio.set_event_loop(event_loop)
+        return event_loop.run_until_complete(coroutine)
+    finally:
+        try:
+            _cancel_tasks(event_loop)
+            event_loop.run_until_complete(event_loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            event_loop.close()
+
+
+def _import_uvloop(loop: str):
+    try:
+        import uvloop  # pylint:disable=import-outside-toplevel
+    except ImportError as ex:
+        if loop == "uvloop":
+            raise ValueError("uvloop is needed to use the uvloop event loop: pip install pywsitest[uvloop]") from ex
+        return None
+    return uvloop
+
+
+def _cancel_tasks(event_loop: asyncio.AbstractEventLoop):
+    tasks = [task for task in asyncio.all_tasks(event_loop) if not task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        event_loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
@@ -3,6 +3,7 @@ from typing import List, Tuple, Union
 
 
 PATH_REGEX = re.compile(r"^\$\{(.*)\}$")
+PLACEHOLDER_REGEX = re.compile(r"\$\{([^}]*)\}")
 
 
 def get_resolved_values(response: Union[dict, list], path: str) -> List[object]:
@@ -47,6 +48,57 @@ def get_resolved_values(response: Union[dict, list], path: str) -> List[object]:
     return resolved
 
 
+def bind_placeholders(value: object, row: dict) -> object:
+    """
+    Replaces ${column} placeholders in a string with values from a row, leaving placeholders not in the row as they are
+    Strings in lists and dictionary values are bound too, at any depth
+
+    Parameters:
+        value (object): The value to bind, anything but a string, list or dictionary is returned as it is
+        row (dict): The values to bind by column name
+
+    Returns:
+        (object): The row value if the string is one placeholder, otherwise the string with placeholders replaced
+    """
+    if isinstance(value, list):
+        return [bind_placeholders(item, row) for item in value]
+    if isinstance(value, dict):
+        return {key: bind_placeholders(item, row) for key, item in value.items()}
+    if not isinstance(value, str):
+        return value
+
+    match = PATH_REGEX.match(value)
+    if match and match.group(1) in row:
+        return row[match.group(1)]
+    return PLACEHOLDER_REGEX.sub(lambda found: str(row.get(found.group(1), found.group(0))), value)
+
+
+def lookup_key(values: list) -> object:
+    """
+    Finds the value that ids and channels are compared by, only the first value at a path if it can be a dictionary key
+
+    Parameters:
+        values (list[object]): The values resolved at a path, as get_resolved_values returns them
+
+    Returns:
+        (object): The first value, None if there isn't one or it's a dictionary or list
+    """
+    if not values or values[0] is None or isinstance(values[0], (dict, list)):
+        return None
+    return values[0]
+
+
+def frame_size(frame: Union[str, bytes]) -> int:
+    """
+    Parameters:
+        frame (str or bytes): A text or binary websocket frame
+
+    Returns:
+        (int): The size of the frame's payload in bytes, text frames being utf-8 encoded
+    """
+    return len(frame) if isinstance(frame, bytes) else len(frame.encode("utf-8"))
+
+
 def _to_int(value: str) -> Tuple[int, bool]:
     try:
         return int(value), True
@@ -0,0 +1,148 @@
+import asyncio
+import collections
+import inspect
+import socket
+import time
+import urllib.parse
+from typing import TYPE_CHECKING
+
+from .ws_timeout_error import WSTimeoutError
+
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
+
+
+class ClientMixin:
+    """
+    A class opening a WSTest's websocket connection, timing each phase of the connection
+    and counting the bytes on the wire and the time frames wait in the client's receive queue
+    """
+
+    async def _open(self, connection_string: str, kwargs: dict) -> "WebSocketClientProtocol":
+        # a connection given with with_websocket is used as it is, its queue isn't timed
+        if self.websocket is not None:
+            self._arrivals = None
+            return self.websocket
+
+        try:
+            websocket = await self._connect(connection_string, kwargs)
+        except asyncio.TimeoutError as ex:
+            error = WSTimeoutError("Timed out connecting to websocket")
+            self._timed_out(error)
+            raise error from ex
+
+        connect_duration = self.timeline.mark("connect")
+        self._count_wire_bytes(websocket)
+        self._arrivals = self._time_receive_queue(websocket)
+        self.stats.open_connections += 1
+        self.stats.connect_duration.record(connect_duration)
+        for tracer in self.tracers:
+            tracer.on_connect(self, self.timeline.started + connect_duration, connect_duration)
+        return websocket
+
+    async def _connect(self, connection_string: str, kwargs: dict) -> "WebSocketClientProtocol":
+        # websockets is only imported once a connection is made, keeping pywsitest quick to import
+        import websockets  # pylint:disable=import-outside-toplevel
+
+        if self.connect_breakdown:
+            url = urllib.parse.urlparse(connection_string)
+            kwargs["sock"] = await self._open_socket(url.hostname, url.port or (443 if url.scheme == "wss" else 80))
+            if url.scheme == "wss":
+                kwargs["server_hostname"] = url.hostname
+
+        # only the legacy client has a read buffer limit, the asyncio client of websockets 14 and later rejects it
+        if "read_limit" in kwargs and "read_limit" not in inspect.signature(websockets.connect).parameters:
+            del kwargs["read_limit"]
+
+        return await websockets.connect(connection_string, **kwargs)
+
+    async def _open_socket(self, host: str, port: int) -> socket.socket:
+        loop = asyncio.get_event_loop()
+        addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        self.timeline.mark("dns")
+
+        family, socket_type, proto, _, address = addresses[0]
+        sock = socket.socket(family, socket_type, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+        except OSError:
+            sock.close()
+            raise
+        self.timeline.mark("tcp_connect")
+        return sock
+
+    def _get_compression_kwargs(self) -> dict:
+        if not self.compression["enabled"]:
+            return {"compression": None}
+
+        settings = {key: value for key, value in self.compression.items() if key != "enabled" and value is not None}
+        if not settings:
+            return {}
+
+        from websockets.extensions.permessage_deflate import (  # pylint:disable=import-outside-toplevel
+            ClientPerMessageDeflateFactory
+        )
+        return {"compression": None, "extensions": [ClientPerMessageDeflateFactory(**settings)]}
+
+    def _count_wire_bytes(self, websocket: "WebSocketClientProtocol"):
+        # count frames as they're written to and read from the transport, after compression and before decompression
+        transport = getattr(websocket, "transport", None)
+        if not isinstance(transport, asyncio.BaseTransport):
+            return
+
+        stats = self.stats
+        write = transport.write
+        data_received = websocket.data_received
+
+        def counting_write(data: bytes):
+            stats.wire_bytes_sent += len(data)
+            write(data)
+
+        def counting_data_received(data: bytes):
+            stats.wire_bytes_received += len(data)
+            data_received(data)
+
+        transport.write = counting_write
+        websocket.data_received = counting_data_received
+
+    def _time_receive_queue(self, websocket: "WebSocketClientProtocol") -> collections.deque:
+        # timestamp each message as the client queues it, _receive takes them off in the same order
+        arrivals = collections.deque()
+        messages = getattr(websocket, "messages", None)
+        if isinstance(messages, collections.deque):
+            # the legacy client queues whole messages in a deque
+            arrivals.extend([time.monotonic()] * len(messages))
+            websocket.messages = _TimedQueue(arrivals, messages)
+            return arrivals
+
+        try:
+            from websockets.asyncio.messages import Assembler  # pylint:disable=import-outside-toplevel
+        except ImportError:
+            return None
+        assembler = getattr(websocket, "recv_messages", None)
+        if not isinstance(assembler, Assembler):
+            return None
+
+        # the asyncio client queues frames, a message is ready once its final frame arrives
+        put = assembler.put
+
+        def timed_put(frame):
+            if frame.fin:
+                arrivals.append(time.monotonic())
+            put(frame)
+
+        arrivals.extend([time.monotonic()] * sum(1 for frame in getattr(assembler.frames, "queue", ()) if frame.fin))
+        assembler.put = timed_put
+        return arrivals
+
+
+class _TimedQueue(collections.deque):
+
+    def __init__(self, arrivals: collections.deque, messages: collections.deque):
+        super().__init__(messages)
+        self.arrivals = arrivals
+
+    def append(self, x):
+        self.arrivals.append(time.monotonic())
+        super().append(x)
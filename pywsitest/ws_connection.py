@@ -0,0 +1,235 @@
+import asyncio
+import heapq
+from typing import TYPE_CHECKING
+
+from .ws_recording import WSRecorder
+
+if TYPE_CHECKING:
+    from .ws_response import WSResponse
+    from .ws_test import WSTest
+
+
+class ConnectionState:  # noqa: pylint - too-many-instance-attributes
+    """
+    A class representing the state of one run shared by a test and the channels carried over its connection:
+    the channels still waiting, the triggered messages being sent, and the response deadlines of every waiting test
+    The test creates one for each run and passes it to its channels, so neither reaches into the other's state
+
+    Attributes:
+        test (WSTest)
+        open_channels (set)
+        recorder (WSRecorder)
+        replaying (bool)
+        started (float)
+        triggers (set)
+        trigger_error (Exception)
+        runners (Future)
+
+    Methods:
+        open(recording_path: str, replaying: bool, started: float):
+            Starts the state of a new run
+        close():
+            Closes the recording, if there is one
+        is_waiting():
+            Checks whether the test or any of its channels is still waiting for responses
+        waiting_tests():
+            Returns the test and its channels that are still waiting for responses
+        matched(test: WSTest, response: WSResponse):
+            Updates the channels and deadlines waiting once a test has matched a response
+        schedule_trigger(coroutine):
+            Sends triggered messages in the background, stopping the run if they fail
+        start_deadlines():
+            Starts timing the responses of every waiting test and returns a future done once one is due
+        resume_deadlines():
+            Keeps timing responses after a deadline that came too late and returns a new future
+        stop_deadlines():
+            Stops timing responses
+        interrupt_receiver():
+            Stops the receiver waiting for frames, once a deadline is due or nothing is left to wait for
+    """
+
+    def __init__(self, test: "WSTest"):
+        """
+        Parameters:
+            test (WSTest): The test whose connection the state is for
+        """
+        self.test = test
+        self.open_channels = set()
+        self.recorder = None
+        self.replaying = False
+        self.started = 0.0
+        self.triggers = set()
+        self.trigger_error = None
+        self.runners = None
+        self.last_frame = 0.0
+        self._due = None
+        self._deadlines = []
+        self._deadline_count = 0
+        self._waiting_on = {}
+        self._timer = None
+
+    def open(self, recording_path: str = None, replaying: bool = False, started: float = 0.0):
+        """
+        Starts the state of a new run
+
+        Parameters:
+            recording_path (str, optional): The path of the log to record every sent and received frame to
+            replaying (bool): Whether a recording is being replayed, which keeps the receiver waiting until it finishes
+            started (float): When the run started, as a monotonic time
+        """
+        if recording_path:
+            self.recorder = WSRecorder(recording_path)
+        self.replaying = replaying
+        self.started = started
+
+    def close(self):
+        """
+        Closes the recording, if there is one
+        """
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def is_waiting(self) -> bool:
+        """
+        Returns:
+            (bool): Whether the test or any of its channels is still waiting for responses
+        """
+        return bool(self.test.expected_responses or self.open_channels)
+
+    def waiting_tests(self) -> list:
+        """
+        Returns:
+            (list): The test, and its channels that are still waiting for responses
+        """
+        return [self.test] + [channel for channel in self.test.channels.values() if channel in self.open_channels]
+
+    def matched(self, test: "WSTest", response: "WSResponse"):
+        """
+        Parameters:
+            test (WSTest): The test or channel that matched the response
+            response (WSResponse): The expected response it matched
+        """
+        if not test.expected_responses:
+            self.open_channels.discard(test)
+        if id(response) in self._waiting_on:
+            self._start_waiting(response)
+
+    def schedule_trigger(self, coroutine) -> asyncio.Task:
+        """
+        Parameters:
+            coroutine (coroutine): Sends the triggered messages
+
+        Returns:
+            (Task): The task sending the triggered messages
+        """
+        # the receive loop goes straight back to reading frames while triggers wait for their delays
+        task = asyncio.ensure_future(coroutine)
+        self.triggers.add(task)
+        task.add_done_callback(self._trigger_done)
+        return task
+
+    def start_deadlines(self) -> asyncio.Future:
+        """
+        Starts timing the responses of every waiting test
+
+        Returns:
+            (Future): A future done once a deadline is due, or there's nothing left to wait for
+        """
+        # every deadline is kept in one heap with a single timer for the earliest, which is only moved when it fires
+        # or an earlier deadline is added, so receiving a frame never creates or reschedules a timer
+        loop = asyncio.get_event_loop()
+        self._due = loop.create_future()
+        self._deadlines = []
+        self._waiting_on = {}
+        self.last_frame = loop.time()
+        for test in self.waiting_tests():
+            expected = {id(response) for response in test.expected_responses}
+            for response in test.expected_responses:
+                if response.timeout is None:
+                    continue
+                if response.timeout_after is not None and id(response.timeout_after) in expected:
+                    self._waiting_on.setdefault(id(response.timeout_after), []).append((response, test))
+                else:
+                    self._add_deadline(response, test, self.last_frame)
+        self._set_timer()
+        return self._due
+
+    def resume_deadlines(self) -> asyncio.Future:
+        """
+        Keeps timing responses after a deadline came due just as the last response it was for matched
+
+        Returns:
+            (Future): A future done once the next deadline is due, or there's nothing left to wait for
+        """
+        self._due = asyncio.get_event_loop().create_future()
+        self._set_timer()
+        return self._due
+
+    def stop_deadlines(self):
+        """
+        Stops timing responses
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._due = None
+
+    def interrupt_receiver(self):
+        """
+        Stops the receiver waiting for frames, which raises a timeout if it's still waiting for responses
+        """
+        if self._due is not None and not self._due.done():
+            self._due.set_result(None)
+
+    def _trigger_done(self, task: asyncio.Task):
+        self.triggers.discard(task)
+        if task.cancelled() or not task.exception():
+            return
+
+        # stop the run as soon as a trigger fails, rather than when the receive loop next times out
+        if self.trigger_error is None:
+            self.trigger_error = task.exception()
+        if self.runners is not None:
+            self.runners.cancel()
+
+    def _start_waiting(self, matched: "WSResponse"):
+        start = asyncio.get_event_loop().time()
+        for response, test in self._waiting_on.pop(id(matched)):
+            self._add_deadline(response, test, start)
+        self._set_timer()
+
+    def _add_deadline(self, response: "WSResponse", test: "WSTest", start: float):
+        self._deadline_count += 1
+        heapq.heappush(self._deadlines, (start + response.timeout, self._deadline_count, response, test))
+
+    def _next_deadline(self) -> float:
+        # deadlines of responses that have been received are dropped as they reach the top of the heap
+        while self._deadlines and not any(
+            response is self._deadlines[0][2] for response in self._deadlines[0][3].expected_responses
+        ):
+            heapq.heappop(self._deadlines)
+
+        deadlines = [self._deadlines[0][0]] if self._deadlines else []
+        # the test's response timeout restarts on every frame, for responses without their own timeout
+        if self.replaying or any(
+            response.timeout is None for test in self.waiting_tests() for response in test.expected_responses
+        ):
+            deadlines.append(self.last_frame + self.test.response_timeout)
+        return min(deadlines, default=None)
+
+    def _set_timer(self):
+        deadline = self._next_deadline()
+        if self._timer and (deadline is None or self._timer.when() > deadline):
+            self._timer.cancel()
+            self._timer = None
+        if deadline is not None and self._timer is None:
+            self._timer = asyncio.get_event_loop().call_at(deadline, self._on_deadline)
+
+    def _on_deadline(self):
+        self._timer = None
+        deadline = self._next_deadline()
+        if deadline is not None and deadline <= asyncio.get_event_loop().time() and self.is_waiting():
+            self.interrupt_receiver()
+        else:
+            self._set_timer()
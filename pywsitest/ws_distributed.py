@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import multiprocessing.connection
+import os
+import sys
+import threading
+import time
+from typing import Callable, List, Union
+
+from . import runner
+from .cli import make_factory, run_users, share_options, split_users
+from .ws_load import LoadOptions, take_objectives
+from .ws_performance_error import check_objectives
+from .ws_stats import WSStats
+from .ws_test import WSTest
+
+
+AUTHKEY_VARIABLE = "PYWSITEST_AUTHKEY"
+
+
+def parse_address(address: str) -> Union[tuple, str]:
+    """
+    Parameters:
+        address (str): A host:port to listen on or connect to over tcp, or the path of a unix socket
+
+    Returns:
+        (tuple or str): The address as multiprocessing.connection expects it
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return host, int(port)
+    return address
+
+
+class LoadCoordinator:
+    """
+    A class representing the coordinator of a load test shared between worker processes on one or more hosts
+    Workers connect over tcp or a unix socket, each is sent the scenarios and a range of users,
+    and the stats each worker streams back while it runs are merged as they arrive
+
+    Attributes:
+        address (tuple or str)
+        interval (float)
+        stats (WSStats)
+
+    Methods:
+        run(scenarios, workers, options, on_stats, timeout):
+            Waits for the workers to connect, shares the users between them and returns the merged stats
+        close():
+            Stops listening for workers
+
+    Usage:
+        template = WSTest("wss://example.com").with_response(WSResponse().with_attribute("type", "connected"))
+
+        # workers are sent pickled scenarios and send pickled stats back, so only listen on a private interface
+        with LoadCoordinator(("10.0.0.10", 7777), authkey=b"secret") as coordinator:
+            stats = coordinator.run([template], workers=8, options=LoadOptions(users=10000, duration=300, rate=100))
+
+        # then on each load generator host
+        LoadWorker(("10.0.0.10", 7777), authkey=b"secret").run()
+    """
+
+    def __init__(self, address: Union[tuple, str] = ("127.0.0.1", 0), authkey: bytes = None, interval: float = 1.0):
+        """
+        Parameters:
+            address (tuple or str): The (host, port) to listen on, a port of 0 picking a free one,
+                or the path of a unix socket
+            authkey (bytes, optional): The key workers must know to connect, this process's authkey if not given,
+                which only worker processes started by this process share
+            interval (float): The time between the stats each worker sends while it runs in seconds
+        """
+        self._listener = multiprocessing.connection.Listener(address, authkey=authkey)
+        self.address = self._listener.address
+        self.interval = interval
+        self.stats = WSStats()
+
+    def __enter__(self) -> "LoadCoordinator":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def run(self, scenarios: list, workers: int, options: LoadOptions = None,
+            on_stats: Callable[[WSStats], None] = None, timeout: float = 60.0) -> WSStats:
+        """
+        Waits for the workers to connect, then runs the users on them until every worker has finished
+
+        Parameters:
+            scenarios (list[dict or WSTest]): Scenarios as loaded by load_scenarios, or WSTest templates to spawn
+            workers (int): The number of workers to wait for
+            options (LoadOptions, optional): The users to share between the workers, how to start and hold them
+                across every worker and the event loop each worker runs them on, one user running once if not given
+            on_stats (callable, optional): Called with the merged stats whenever a worker's stats arrive
+            timeout (float): The time to wait for the workers to connect, and for them to finish once the duration
+                and the time to start every user at the rate are up, in seconds
+
+        Raises:
+            ConnectionError: If a worker disconnects before it finishes
+            TimeoutError: If the workers don't all connect, or don't all finish, within the timeout
+            WSPerformanceError: If the workers together missed any of the WSTest templates' performance objectives
+
+        Returns:
+            (WSStats): The merged stats of every worker
+        """
+        options = options or LoadOptions()
+        # objectives are checked once against the merged stats, rather than by each worker against its share
+        objectives = []
+        scenarios = [
+            take_objectives(scenario.spawn(), objectives) if isinstance(scenario, WSTest) else scenario
+            for scenario in scenarios
+        ]
+        connections = self._accept(workers, timeout)
+        self.stats = WSStats().start()
+        try:
+            for connection, (first_user, share) in zip(connections, split_users(options.users, workers)):
+                connection.send(("job", {
+                    "scenarios": scenarios,
+                    "first_user": first_user,
+                    "options": share_options(options, share),
+                    "interval": self.interval,
+                }))
+
+            # a stuck worker would otherwise keep the run waiting forever
+            started = options.users / options.rate if options.rate else 0.0
+            deadline = time.monotonic() + (options.duration or 0.0) + started + timeout
+            self._receive(connections, deadline, on_stats)
+        finally:
+            for connection in connections:
+                connection.close()
+
+        if objectives:
+            check_objectives(self.stats, objectives)
+        return self.stats
+
+    def close(self):
+        """
+        Stops listening for workers
+        """
+        self._listener.close()
+
+    def _accept(self, workers: int, timeout: float) -> list:
+        # Listener.accept can't time out, so it runs on a thread that's left behind, with the listener closed,
+        # if the workers don't all connect in time
+        connections = []
+        errors = []
+
+        def accept():
+            try:
+                while len(connections) < workers:
+                    connections.append(self._listener.accept())
+            except (EOFError, OSError, multiprocessing.AuthenticationError) as ex:
+                errors.append(ex)
+
+        accepting = threading.Thread(target=accept, name="pywsitest-accept", daemon=True)
+        accepting.start()
+        accepting.join(timeout)
+        if accepting.is_alive() or errors:
+            connected = len(connections)
+            for connection in list(connections):
+                connection.close()
+            if errors:
+                raise errors[0]
+            self.close()
+            raise TimeoutError(f"Only {connected} of {workers} workers connected within {timeout} seconds")
+        return connections
+
+    def _receive(self, connections: list, deadline: float, on_stats: Callable[[WSStats], None]):
+        latest = {}
+        running = list(connections)
+        while running:
+            ready = multiprocessing.connection.wait(running, max(0.0, deadline - time.monotonic()))
+            if not ready:
+                raise TimeoutError(f"{len(running)} of {len(connections)} workers were still running at the deadline")
+            for connection in ready:
+                try:
+                    kind, stats = connection.recv()
+                except (EOFError, OSError) as ex:
+                    raise ConnectionError(f"Worker {connections.index(connection)} disconnected") from ex
+                latest[connection] = stats
+                if kind == "done":
+                    running.remove(connection)
+                self.stats = self._merge(latest.values())
+                if on_stats:
+                    on_stats(self.stats)
+
+    def _merge(self, worker_stats: List[WSStats]) -> WSStats:
+        # each worker sends everything it has aggregated so far, so the merge starts again from nothing each time
+        stats = WSStats()
+        stats.started = self.stats.started
+        for other in worker_stats:
+            stats.merge(other)
+        return stats
+
+
+class LoadWorker:
+    """
+    A class representing a worker running the users a LoadCoordinator gives it
+
+    Attributes:
+        address (tuple or str)
+
+    Methods:
+        run():
+            Connects to the coordinator, runs its users while streaming stats back and returns the stats
+    """
+
+    def __init__(self, address: Union[tuple, str], authkey: bytes = None):
+        """
+        Parameters:
+            address (tuple or str): The (host, port) or unix socket path of the coordinator
+            authkey (bytes, optional): The coordinator's key, this process's authkey if not given
+        """
+        self.address = address
+        self._authkey = authkey
+
+    def run(self) -> WSStats:
+        """
+        Connects to the coordinator, runs the users it's given and sends the stats back as they're aggregated
+
+        Returns:
+            (WSStats): The stats of this worker's users
+        """
+        stats = WSStats()
+        with multiprocessing.connection.Client(self.address, authkey=self._authkey) as connection:
+            _, job = connection.recv()
+            runner.run(self._run_job(connection, job, stats), job["options"].loop)
+            connection.send(("done", stats))
+        return stats
+
+    async def _run_job(self, connection: multiprocessing.connection.Connection, job: dict, stats: WSStats):
+        streamer = asyncio.ensure_future(self._stream(connection, stats, job["interval"]))
+        try:
+            factory = make_factory(job["scenarios"], job["first_user"])
+            options = job["options"]
+            await run_users(factory, options.users, options.duration, options.rate, stats)
+        finally:
+            streamer.cancel()
+
+    async def _stream(self, connection: multiprocessing.connection.Connection, stats: WSStats, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            connection.send(("stats", stats))
+
+
+def get_authkey() -> bytes:
+    """
+    Returns:
+        (bytes): The key in the PYWSITEST_AUTHKEY environment variable, None if it isn't set
+    """
+    authkey = os.environ.get(AUTHKEY_VARIABLE)
+    return authkey.encode("utf-8") if authkey else None
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Runs the pywsitest-worker command, connecting to a coordinator started with pywsitest --remote-workers
+
+    Parameters:
+        argv (list[str], optional): The command line arguments, sys.argv if not given
+
+    Returns:
+        (int): The exit code, 1 if any run failed
+    """
+    parser = argparse.ArgumentParser(prog="pywsitest-worker", description="Run users for a pywsitest coordinator")
+    parser.add_argument("coordinator", help="the host:port or unix socket path of the coordinator")
+    args = parser.parse_args(argv)
+
+    authkey = get_authkey()
+    if not authkey:
+        parser.error(f"set {AUTHKEY_VARIABLE} to the coordinator's key")
+
+    stats = LoadWorker(parse_address(args.coordinator), authkey).run()
+    return 1 if stats.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import csv
+import itertools
+import json
+import threading
+import time
+import weakref
+from collections import deque
+
+from .ws_tracer import WSTracer
+
+
+COLUMNS = ("timestamp", "connection", "event", "direction", "size", "expectation", "latency")
+
+FORMATS = ("jsonl", "csv")
+
+
+class EventLogWriter(WSTracer):  # noqa: pylint - too-many-instance-attributes
+    """
+    A class representing a tracer streaming every connect, send, receive, match, request and timeout to a file
+    Hooks only append a tuple to a queue, a background thread formats and writes the queue in batches,
+    and the queue is bounded, dropping the oldest events if the writer falls behind, so memory stays flat
+
+    Each event has the columns:
+        timestamp: seconds since the epoch
+        connection: the connection the event is from, numbered in the order they're made,
+            so each soak run gets a new number and channels share the number of the connection carrying them
+        event: connect, send, receive, match, request or timeout
+        direction: sent or received, empty for connect and timeout
+        size: the frame size in bytes for send and receive
+        expectation: the matched response, the rest request or the timeout error
+        latency: the connect duration, the time from the message a matched response answers, or the request duration
+
+    Attributes:
+        path (str)
+        format (str)
+        batch_size (int)
+        flush_interval (float)
+        max_queued (int)
+        events_written (int)
+        events_dropped (int)
+
+    Methods:
+        flush():
+            Writes any queued events and waits for them to be written
+        close():
+            Writes any queued events, stops the background thread and closes the file
+
+    Usage:
+        with EventLogWriter("events.csv") as event_log:
+            await WSTest("wss://example.com").with_tracer(event_log).run()
+
+        events = pandas.read_csv("events.csv")
+    """
+
+    def __init__(self, path: str, format: str = None, batch_size: int = 1000,  # pylint:disable=redefined-builtin
+                 flush_interval: float = 1.0, max_queued: int = 100000):
+        """
+        Parameters:
+            path (str): The path of the file to append events to
+            format (str, optional): jsonl or csv, csv if the path ends with .csv and jsonl otherwise
+            batch_size (int): The number of queued events that wakes the writer before the flush interval is up
+            flush_interval (float): The longest time events wait in the queue in seconds
+            max_queued (int): The most events to queue, the oldest being dropped and counted once it's full
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        self.path = path
+        self.format = format or ("csv" if path.endswith(".csv") else "jsonl")
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown event log format {self.format}, expected one of {', '.join(FORMATS)}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.events_written = 0
+        self.events_dropped = 0
+        self._events_queued = 0
+
+        # monotonic timestamps are turned into wall clock ones as they're written
+        self._offset = time.time() - time.monotonic()
+        self._connection_ids = weakref.WeakKeyDictionary()
+        self._next_id = itertools.count()
+        self._events = deque(maxlen=max_queued)
+        self._wake = threading.Event()
+        self._written = threading.Condition()
+        self._closed = False
+
+        self._file = open(path, "a", encoding="utf-8", newline="")  # pylint:disable=consider-using-with
+        self._csv = csv.writer(self._file) if self.format == "csv" else None
+        if self._csv and self._file.tell() == 0:
+            self._csv.writerow(COLUMNS)
+        self._thread = threading.Thread(target=self._write_loop, name="pywsitest-event-log", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "EventLogWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def on_connect(self, test, timestamp: float, duration: float):
+        # each connection gets a new number, shared with the channels it carries
+        connection = self._connection_ids[test] = next(self._next_id)
+        for channel in test.channels.values():
+            self._connection_ids[channel] = connection
+        self._queue((timestamp, connection, "connect", "", None, None, duration))
+
+    def on_send(self, test, timestamp: float, message, size: int):
+        self._queue((timestamp, self._connection(test), "send", "sent", size, None, None))
+
+    def on_receive(self, test, timestamp: float, response: str, size: int):
+        self._queue((timestamp, self._connection(test), "receive", "received", size, None, None))
+
+    def on_match(self, test, timestamp: float, response, latency: float):
+        self._queue((timestamp, self._connection(test), "match", "received", None, response, latency))
+
+    def on_request_end(self, test, timestamp: float, request, duration: float, response):
+        self._queue((timestamp, self._connection(test), "request", "sent", None, request, duration))
+
+    def on_timeout(self, test, timestamp: float, error: Exception):
+        self._queue((timestamp, self._connection(test), "timeout", "", None, error, None))
+
+    def flush(self):
+        """
+        Writes any queued events and waits for them to be written
+        """
+        queued = self._events_queued
+        with self._written:
+            self._wake.set()
+            self._written.wait_for(
+                lambda: self.events_written + self.events_dropped >= queued or not self._thread.is_alive()
+            )
+
+    def close(self):
+        """
+        Writes any queued events, stops the background thread and closes the file
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._file.close()
+
+    def _connection(self, test) -> int:
+        # events reported without a connect, such as those of a test run by hand, get a number of their own
+        connection = self._connection_ids.get(test)
+        if connection is None:
+            connection = self._connection_ids[test] = next(self._next_id)
+        return connection
+
+    def _queue(self, event: tuple):
+        # deque appends are thread safe, so the receive loop never waits on the writer,
+        # and a full deque drops its oldest event as the new one is appended
+        if len(self._events) == self.max_queued:
+            self.events_dropped += 1
+        self._events.append(event)
+        self._events_queued += 1
+        if len(self._events) >= self.batch_size:
+            self._wake.set()
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._write_batch()
+        self._write_batch()
+
+    def _write_batch(self):
+        rows = []
+        while self._events:
+            timestamp, connection, event, direction, size, expectation, latency = self._events.popleft()
+            rows.append((timestamp + self._offset, connection, event, direction, size,
+                         None if expectation is None else str(expectation), latency))
+
+        if rows:
+            if self._csv:
+                self._csv.writerows(rows)
+            else:
+                self._file.write("".join(json.dumps(dict(zip(COLUMNS, row))) + "\n" for row in rows))
+            self._file.flush()
+            self.events_written += len(rows)
+
+        with self._written:
+            self._written.notify_all()
@@ -0,0 +1,116 @@
+import csv
+import json
+import random
+from array import array
+
+
+class DataFeeder:
+    """
+    A class representing rows of per-user data streamed from a csv or json lines file
+    Rows are read from the file as they're needed, one row per line, so large files are never loaded into memory
+    Csv files need a header row naming the columns, any other file is read as one json object per line
+
+    Strategies:
+        circular: rows in file order, starting again from the first row at the end of the file
+        random: rows chosen at random, indexing the offset of each line in 8 bytes per row
+        unique: rows in file order, each used once, raising LookupError at the end of the file
+
+    Attributes:
+        path (str)
+        strategy (str)
+
+    Methods:
+        next_row():
+            Returns the next row as a dictionary
+        close():
+            Closes the file
+
+    Usage:
+        feeder = DataFeeder("credentials.csv", strategy="unique")
+
+        ws_test = (
+            WSTest("wss://example.com")
+            .with_feeder(feeder)
+            .with_header("Authorization", "Bearer ${token}")
+            .with_message(WSMessage().with_attribute("device", "${device_id}"))
+        )
+    """
+
+    STRATEGIES = ("circular", "random", "unique")
+
+    def __init__(self, path: str, strategy: str = "circular", seed: int = None):
+        """
+        Parameters:
+            path (str): The path of the csv or json lines file
+            strategy (str): How rows are chosen, circular, random or unique
+            seed (int, optional): The seed for the random strategy
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown feeder strategy {strategy}, expected one of {', '.join(self.STRATEGIES)}")
+
+        self.path = path
+        self.strategy = strategy
+        self._file = open(path, "rb")  # pylint:disable=consider-using-with
+        self._columns = None
+        if path.endswith(".csv"):
+            self._columns = next(csv.reader([self._file.readline().decode("utf-8")]), [])
+        self._start = self._file.tell()
+        self._random = random.Random(seed)  # nosec - choosing test data, not for security
+        self._offsets = self._index() if strategy == "random" else None
+
+    def __enter__(self) -> "DataFeeder":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def next_row(self) -> dict:
+        """
+        Reads the next row according to the strategy
+
+        Raises:
+            LookupError: If the file has no rows, or every row of a unique feeder has been used
+
+        Returns:
+            (dict): The row, by column name
+        """
+        if self._offsets is not None:
+            if not self._offsets:
+                raise LookupError(f"No rows in {self.path}")
+            self._file.seek(self._offsets[self._random.randrange(len(self._offsets))])
+            return self._parse(self._file.readline())
+
+        line = self._readline()
+        if not line and self.strategy == "circular":
+            self._file.seek(self._start)
+            line = self._readline()
+        if not line:
+            raise LookupError(f"No rows left in {self.path}")
+        return self._parse(line)
+
+    def close(self):
+        """
+        Closes the file
+        """
+        self._file.close()
+
+    def _index(self) -> array:
+        offsets = array("Q")
+        offset = self._start
+        for line in self._file:
+            if line.strip():
+                offsets.append(offset)
+            offset += len(line)
+        return offsets
+
+    def _readline(self) -> bytes:
+        line = self._file.readline()
+        while line and not line.strip():
+            line = self._file.readline()
+        return line
+
+    def _parse(self, line: bytes) -> dict:
+        text = line.decode("utf-8")
+        if self._columns is None:
+            return json.loads(text)
+        return dict(zip(self._columns, next(csv.reader([text]))))
@@ -0,0 +1,300 @@
+import asyncio
+import time
+from typing import Callable, NamedTuple, Optional
+
+from .ws_performance_error import check_objectives
+from .ws_stats import WSStats, LatencyHistogram
+from .ws_test import WSTest
+from .ws_timeout_error import WSTimeoutError
+from .ws_tracer import WSTracer
+
+
+class LoadPhase(NamedTuple):
+    """
+    A phase of a load profile, moving to the target concurrency at the rate, then holding until the duration is up
+    """
+    name: str
+    target: int
+    rate: Optional[float]
+    duration: float
+
+
+class LoadOptions(NamedTuple):
+    """
+    How many virtual users to run, how quickly to start them, how long to hold them for and on which event loop
+    Each user runs once if there's no duration, and users are all started at once if there's no rate
+    """
+    users: int = 1
+    duration: Optional[float] = None
+    rate: Optional[float] = None
+    loop: str = "auto"
+
+
+class LoadProfile:
+    """
+    A class representing how the number of concurrent virtual users changes over time
+
+    Attributes:
+        phases (list)
+
+    Methods:
+        with_ramp(target: int, rate: float):
+            Adds a phase moving linearly to a number of users and returns the LoadProfile
+        with_step(target: int, duration: float):
+            Adds a phase jumping to a number of users and holding and returns the LoadProfile
+        with_spike(target: int, duration: float):
+            Adds a phase jumping to a number of users, holding, then jumping back and returns the LoadProfile
+        with_hold(duration: float):
+            Adds a phase holding the number of users and returns the LoadProfile
+
+    Usage:
+        profile = (
+            LoadProfile()
+            .with_ramp(1000, rate=50)
+            .with_hold(60)
+            .with_spike(2000, 10)
+            .with_ramp(0, rate=100)
+        )
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    @property
+    def target(self) -> int:
+        """
+        Returns:
+            (int): The number of users at the end of the profile so far
+        """
+        return self.phases[-1].target if self.phases else 0
+
+    def with_ramp(self, target: int, rate: float, name: str = None) -> "LoadProfile":
+        """
+        Adds a phase opening or closing users at a steady rate until the target is reached
+
+        Parameters:
+            target (int): The number of concurrent users to move to
+            rate (float): The number of users to open or close per second
+            name (str, optional): The name to record the phase's stats under
+
+        Returns:
+            (LoadProfile): The LoadProfile instance with_ramp was called on
+        """
+        return self._with_phase("ramp", name, target, rate, 0.0)
+
+    def with_step(self, target: int, duration: float, name: str = None) -> "LoadProfile":
+        """
+        Adds a phase opening or closing users all at once, then holding
+
+        Parameters:
+            target (int): The number of concurrent users to move to
+            duration (float): The length of the phase in seconds
+            name (str, optional): The name to record the phase's stats under
+
+        Returns:
+            (LoadProfile): The LoadProfile instance with_step was called on
+        """
+        return self._with_phase("step", name, target, None, duration)
+
+    def with_spike(self, target: int, duration: float, name: str = None) -> "LoadProfile":
+        """
+        Adds a phase opening users all at once, holding, then closing them all at once
+
+        Parameters:
+            target (int): The number of concurrent users at the peak of the spike
+            duration (float): The length of the spike in seconds
+            name (str, optional): The name to record the phase's stats under
+
+        Returns:
+            (LoadProfile): The LoadProfile instance with_spike was called on
+        """
+        previous = self.target
+        self._with_phase("spike", name, target, None, duration)
+        return self._with_phase("spike-end", name and f"{name}-end", previous, None, 0.0)
+
+    def with_hold(self, duration: float, name: str = None) -> "LoadProfile":
+        """
+        Adds a phase keeping the number of concurrent users steady
+
+        Parameters:
+            duration (float): The length of the phase in seconds
+            name (str, optional): The name to record the phase's stats under
+
+        Returns:
+            (LoadProfile): The LoadProfile instance with_hold was called on
+        """
+        return self._with_phase("hold", name, self.target, None, duration)
+
+    def _with_phase(self, kind: str, name: str, target: int, rate: float, duration: float) -> "LoadProfile":
+        self.phases.append(LoadPhase(name or f"{kind}-{len(self.phases) + 1}", target, rate, duration))
+        return self
+
+
+class LoadRunner:  # noqa: pylint - too-many-instance-attributes
+    """
+    A class representing virtual users running WSTest scenarios following a load profile
+    Each virtual user runs its scenario in a loop on a new connection each time until the user is closed
+    Performance objectives of the scenarios are checked once against the stats of every run, when the profile ends
+
+    Attributes:
+        factory (callable)
+        profile (LoadProfile)
+        stats (WSStats)
+        phase (str)
+        connect_durations (dict)
+        failures (dict)
+        errors (list)
+        objectives (list)
+        users_started (int)
+
+    Methods:
+        async run():
+            Runs the load profile
+        summary():
+            Returns the connection setup latencies and failures of each phase
+
+    Usage:
+        def scenario(user: int) -> WSTest:
+            return (
+                WSTest("wss://example.com")
+                .with_parameter("user", user)
+                .with_response(WSResponse().with_attribute("type", "connected"))
+            )
+
+        runner = LoadRunner(scenario, LoadProfile().with_ramp(100, rate=10).with_hold(60))
+        await runner.run()
+        print(runner.summary())
+    """
+
+    def __init__(self, factory: Callable[[int], WSTest], profile: LoadProfile):
+        """
+        Parameters:
+            factory (callable): Called with the index of a virtual user, returning a new WSTest to run
+            profile (LoadProfile): The phases of the load
+        """
+        self.factory = factory
+        self.profile = profile
+        self.stats = WSStats()
+        self.connect_durations = {}
+        self.failures = {}
+        self.errors = []
+        self.objectives = []
+        self.users_started = 0
+        self.phase = None
+        self._users = []
+        self._closing = set()
+        self._tracer = _PhaseTracer(self)
+
+    async def run(self):
+        """
+        Runs each phase of the load profile in turn, then closes any remaining users
+
+        Raises:
+            WSPerformanceError: If the runs of every user together missed any of the scenarios' performance objectives
+        """
+        self.stats.start()
+        try:
+            for phase in self.profile.phases:
+                await self._run_phase(phase)
+        finally:
+            for user in self._users:
+                self._close(user)
+            await asyncio.gather(*self._users, return_exceptions=True)
+            self._users = []
+
+        if self.objectives:
+            check_objectives(self.stats, self.objectives)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            (dict): The connection setup latency summary and failure count of each phase, by phase name
+        """
+        return {
+            phase.name: {
+                "connect_duration": self.connect_durations[phase.name].summary(),
+                "failures": self.failures[phase.name],
+            }
+            for phase in self.profile.phases
+            if phase.name in self.connect_durations
+        }
+
+    async def _run_phase(self, phase: LoadPhase):
+        self.phase = phase.name
+        self.connect_durations.setdefault(phase.name, LatencyHistogram())
+        self.failures.setdefault(phase.name, 0)
+
+        started = time.monotonic()
+        changed = 0
+        while len(self._users) != phase.target:
+            if phase.rate:
+                # schedule against the start of the phase so sleep overruns don't slow the ramp down
+                await asyncio.sleep(max(0.0, started + changed / phase.rate - time.monotonic()))
+
+            if len(self._users) < phase.target:
+                self._users.append(asyncio.ensure_future(self._user(self.users_started)))
+                self.users_started += 1
+            else:
+                self._close(self._users.pop())
+            changed += 1
+
+        await asyncio.sleep(max(0.0, started + phase.duration - time.monotonic()))
+
+    def _close(self, user: asyncio.Task):
+        self._closing.add(user)
+        user.add_done_callback(self._closing.discard)
+        user.cancel()
+
+    async def _user(self, user: int):
+        from websockets.exceptions import WebSocketException  # pylint:disable=import-outside-toplevel
+
+        # wait_for can lose the cancellation closing the user when a run finishes at the same moment,
+        # so the user also stops looping once it's been closed
+        task = asyncio.current_task()
+        while task not in self._closing:
+            try:
+                test = take_objectives(self.factory(user), self.objectives)
+                await test.with_stats(self.stats).with_tracer(self._tracer).run()
+            except asyncio.CancelledError:  # pylint:disable=try-except-raise
+                # a subclass of Exception before python 3.8
+                raise
+            except (WSTimeoutError, WebSocketException, OSError):
+                self._count_failure()
+            except Exception as ex:  # pylint:disable=broad-except
+                # anything else, such as a feeder running out of rows, fails the same way every time,
+                # so it's counted and kept, and the user stops rather than looping on it
+                self._count_failure()
+                self.errors.append(ex)
+                return
+
+    def _count_failure(self):
+        self.failures[self.phase] += 1
+        self.stats.failures += 1
+
+
+def take_objectives(test: WSTest, objectives: list) -> WSTest:
+    """
+    Moves the performance objectives of a test to a list, so they can be checked once against the stats of every run
+    Checked after each run instead, the first breach of shared stats would fail that run and stop its user
+
+    Parameters:
+        test (WSTest): The test to take the objectives of
+        objectives (list[dict]): The objectives to add any new ones to
+
+    Returns:
+        (WSTest): The test, without objectives
+    """
+    for objective in test.objectives:
+        if objective not in objectives:
+            objectives.append(objective)
+    test.objectives = []
+    return test
+
+
+class _PhaseTracer(WSTracer):
+
+    def __init__(self, runner: LoadRunner):
+        self.runner = runner
+
+    def on_connect(self, test, timestamp: float, duration: float):
+        self.runner.connect_durations[self.runner.phase].record(duration)
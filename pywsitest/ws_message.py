@@ -6,9 +6,11 @@ from .utils import get_resolved_values, PATH_REGEX
 class WSMessage:
     """
     A class representing a message to send through the websocket
+    Clones share their attributes dictionary until one of them changes it through with_attribute or resolve
 
     Attributes:
         attributes (dict)
+        delay (float)
 
     Methods:
         with_attribute(key, value):
@@ -17,6 +19,8 @@ class WSMessage:
             Adds a delay to message being sent
         resolve(response):
             Resolves any attributes that get their value from a parent response
+        clone():
+            Returns a copy of the WSMessage sharing its attributes until either changes them
 
     Usage:
         message = (
@@ -25,9 +29,12 @@ class WSMessage:
         )
     """
 
+    __slots__ = ("attributes", "delay", "_shared")
+
     def __init__(self):
         self.attributes = {}
         self.delay = 0.0
+        self._shared = False
 
     def __str__(self) -> str:
         # Output the attributes dictionary as json
@@ -44,6 +51,7 @@ class WSMessage:
         Returns:
             (WSMessage): The WSMessage instance with_attribute was called on
         """
+        self._own_attributes()
         self.attributes[key] = value
         return self
 
@@ -76,5 +84,25 @@ class WSMessage:
             match = PATH_REGEX.match(str(value))
             if match:
                 resolved_values = get_resolved_values(response, match.group(1))
-                self.attributes[key] = resolved_values[0] if resolved_values else value
+                if resolved_values:
+                    self._own_attributes()
+                    self.attributes[key] = resolved_values[0]
         return self
+
+    def clone(self) -> "WSMessage":
+        """
+        Copies the message without copying its attributes, which are copied by whichever changes them first
+
+        Returns:
+            (WSMessage): A new WSMessage with the same attributes and delay
+        """
+        message = WSMessage.__new__(WSMessage)
+        message.attributes = self.attributes
+        message.delay = self.delay
+        message._shared = self._shared = True  # noqa: pylint - protected-access
+        return message
+
+    def _own_attributes(self):
+        if self._shared:
+            self.attributes = dict(self.attributes)
+            self._shared = False
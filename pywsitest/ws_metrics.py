@@ -0,0 +1,174 @@
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .ws_stats import WSStats, LatencyHistogram
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+COUNTERS = (
+    ("runs", "Test runs started"),
+    ("failures", "Soak test runs that failed"),
+    ("frames_sent", "Websocket frames sent"),
+    ("frames_received", "Websocket frames received"),
+    ("bytes_sent", "Websocket payload bytes sent"),
+    ("bytes_received", "Websocket payload bytes received"),
+    ("wire_bytes_sent", "Websocket frame bytes written to the connection, after compression"),
+    ("wire_bytes_received", "Websocket frame bytes read from the connection, before decompression"),
+    ("matches", "Received frames matching an expected response"),
+    ("timeouts", "Test runs that timed out"),
+    ("requests", "Rest requests sent"),
+)
+
+HISTOGRAMS = (
+    ("connect_duration", "Time taken to open each websocket connection"),
+    ("response_latency", "Time from the message each expected response answers to its arrival"),
+    ("request_latency", "Rest request durations"),
+    ("run_duration", "Test run durations"),
+    ("recv_wait", "Time spent waiting for each frame to arrive"),
+    ("queue_time", "Time each frame waited in the client receive queue before being handled"),
+    ("round_trip", "Time from sending each correlated message to receiving its reply"),
+)
+
+
+def to_openmetrics(stats: WSStats, prefix: str = "pywsitest") -> str:
+    """
+    Formats stats in the OpenMetrics text exposition format
+
+    Parameters:
+        stats (WSStats): The stats to format
+        prefix (str, optional): The prefix of every metric name
+
+    Returns:
+        (str): The OpenMetrics exposition, terminated with # EOF
+    """
+    lines = [
+        f"# TYPE {prefix}_open_connections gauge",
+        f"# HELP {prefix}_open_connections Websocket connections currently open",
+        f"{prefix}_open_connections {stats.open_connections}",
+        f"# TYPE {prefix}_max_queue_depth gauge",
+        f"# HELP {prefix}_max_queue_depth Most frames waiting in a client receive queue at once",
+        f"{prefix}_max_queue_depth {stats.max_queue_depth}",
+    ]
+
+    for name, description in COUNTERS:
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"{prefix}_{name}_total {getattr(stats, name)}")
+
+    for name, description in HISTOGRAMS:
+        lines.extend(_histogram_lines(f"{prefix}_{name}_seconds", description, getattr(stats, name)))
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, description: str, histogram: LatencyHistogram) -> list:
+    lines = [f"# TYPE {name} histogram", f"# HELP {name} {description}"]
+
+    # only expose every doubling, the finer buckets would multiply the number of series for little gain
+    # the last bucket is rounded up to the next doubling so the largest recorded value is always covered
+    units = 1
+    for upper_bound, cumulative in histogram.cumulative():
+        units = round(upper_bound / LatencyHistogram.UNIT)
+        if not units & (units - 1):
+            lines.append(f"{name}_bucket{{le=\"{upper_bound:.6g}\"}} {cumulative}")
+    if units & (units - 1):
+        upper_bound = (1 << units.bit_length()) * LatencyHistogram.UNIT
+        lines.append(f"{name}_bucket{{le=\"{upper_bound:.6g}\"}} {histogram.count}")
+
+    lines.append(f"{name}_bucket{{le=\"+Inf\"}} {histogram.count}")
+    lines.append(f"{name}_count {histogram.count}")
+    lines.append(f"{name}_sum {histogram.total}")
+    return lines
+
+
+class MetricsExporter:
+    """
+    A class representing an OpenMetrics exporter for WSStats
+
+    Attributes:
+        stats (WSStats)
+        prefix (str)
+        port (int)
+
+    Methods:
+        serve(host: str, port: int):
+            Serves the metrics over http from a background thread
+        stop():
+            Stops serving the metrics
+        write(path: str):
+            Writes the metrics to a file for a textfile collector
+
+    Usage:
+        stats = WSStats()
+        exporter = MetricsExporter(stats)
+        exporter.serve(port=9100)
+
+        await WSTest("wss://example.com").with_stats(stats).run()
+
+        exporter.stop()
+    """
+
+    def __init__(self, stats: WSStats, prefix: str = "pywsitest"):
+        """
+        Parameters:
+            stats (WSStats): The stats to export
+            prefix (str, optional): The prefix of every metric name
+        """
+        self.stats = stats
+        self.prefix = prefix
+        self.port = None
+        self._server = None
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "MetricsExporter":
+        """
+        Serves the metrics over http from a daemon thread, formatting them on each scrape
+
+        Parameters:
+            host (str, optional): The host to listen on, loopback by default
+            port (int, optional): The port to listen on, any free port by default
+
+        Returns:
+            (MetricsExporter): The MetricsExporter instance serve was called on
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: pylint - invalid-name
+                body = to_openmetrics(exporter.stats, exporter.prefix).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):  # noqa: pylint - arguments-differ
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving the metrics
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def write(self, path: str):
+        """
+        Writes the metrics to a file, replacing it atomically so a collector never reads a partial file
+
+        Parameters:
+            path (str): The path of the file, usually ending .prom in the textfile collector directory
+        """
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            file.write(to_openmetrics(self.stats, self.prefix))
+        os.replace(temp_path, path)
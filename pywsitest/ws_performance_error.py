@@ -0,0 +1,40 @@
+class WSPerformanceError(Exception):
+    """
+    The run finished but missed one or more of its performance objectives
+
+    Attributes:
+        report (list): Every objective checked, as returned by WSStats.check, with whether each passed
+    """
+
+    def __init__(self, *args, report=None):
+        super().__init__(*args)
+        self.report = report or []
+
+    @property
+    def failures(self) -> list:
+        """
+        Returns:
+            (list): The objectives that weren't met
+        """
+        return [check for check in self.report if not check["passed"]]
+
+
+def check_objectives(stats, objectives: list):
+    """
+    Checks stats against performance objectives, raising if any were missed
+
+    Parameters:
+        stats (WSStats): The stats to check
+        objectives (list[dict]): The objectives, as taken by WSStats.check
+
+    Raises:
+        WSPerformanceError: If any of the objectives was missed
+    """
+    report = stats.check(objectives)
+    failures = [check for check in report if not check["passed"]]
+    if failures:
+        lines = ["Missed performance objectives:"]
+        for check in failures:
+            limit = f"max {check['max']}" if "max" in check else f"min {check['min']}"
+            lines.append(f"{check['metric']}: {check['actual']:.6g} ({limit})")
+        raise WSPerformanceError("\n".join(lines), report=report)
@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import json
+import time
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Union
+
+from .utils import frame_size, get_resolved_values, lookup_key
+from .ws_recording import RECEIVED
+from .ws_response import WSResponse
+from .ws_timeout_error import WSTimeoutError
+
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
+
+
+class ReceiveMixin:  # noqa: pylint - too-many-instance-attributes
+    """
+    A class receiving a WSTest's frames, routing them to its channels and matching them against expected responses,
+    found through indexes by correlation id and by attribute for near misses, and timing each response
+    """
+
+    def _reset_matching(self):
+        # the indexes, near misses and timings of the responses a run is waiting for
+        self._correlated = {}
+        self._uncorrelated = {}
+        self._sent_at = {}
+        self._last_sent = None
+        self._matched_at = {}
+        self._near_misses = {}
+        self._near_miss_index = {}
+        self._always_scored = {}
+        self._near_miss_count = 0
+
+    async def _receive(self, websocket: "WebSocketClientProtocol"):
+        connection = self._connection
+        due = connection.start_deadlines()
+        # frames are received in a task of their own that the deadline timer stops,
+        # instead of wrapping every recv in a timeout or cancelling the task waiting on it
+        receiver = asyncio.ensure_future(self._receive_frames(websocket))
+        try:
+            while True:
+                await asyncio.wait({receiver, due}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver.done():
+                    receiver.result()
+                    return
+                if connection.is_waiting():
+                    raise WSTimeoutError(self._get_receive_error_message())
+                if not connection.replaying:
+                    return
+                # the last response the deadline was for matched as it came due, but a replay can add more
+                due = connection.resume_deadlines()
+        finally:
+            receiver.cancel()
+            connection.stop_deadlines()
+
+    async def _receive_frames(self, websocket: "WebSocketClientProtocol"):
+        connection = self._connection
+        # iterate while there are still expected responses that haven't been received yet
+        # a replay can add more expected responses until it has finished
+        while connection.is_waiting() or connection.replaying:
+            waited = time.monotonic()
+            response = await websocket.recv()
+            received = time.monotonic()
+            connection.last_frame = asyncio.get_event_loop().time()
+            self.stats.recv_wait.record(received - waited)
+            if self._arrivals:
+                self.stats.queue_time.record(received - self._arrivals.popleft())
+                self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._arrivals))
+            await self._receive_handler(websocket, response)
+
+    async def _receive_handler(self, websocket: "WebSocketClientProtocol", response: Union[str, bytes]):
+        if self._connection.recorder:
+            self._connection.recorder.record(RECEIVED, response)
+        size = frame_size(response)
+        self.stats.frames_received += 1
+        self.stats.bytes_received += size
+        if self.tracers:
+            timestamp = time.monotonic()
+            for tracer in self.tracers:
+                tracer.on_receive(self, timestamp, response, size)
+        if self.keep_history:
+            self.received_json.append(response)
+        if self.timeline.first_frame is None:
+            self.timeline.mark("first_frame")
+        parsed_response = json.loads(response)
+
+        if self.channels and self.channel_key:
+            channel = self.channels.get(lookup_key(get_resolved_values(parsed_response, self.channel_key)))
+            if channel is not None:
+                if channel.keep_history:
+                    channel.received_json.append(response)
+                channel._match_response(websocket, parsed_response)  # pylint:disable=protected-access
+                return
+
+        self._match_response(websocket, parsed_response)
+
+    def _match_response(self, websocket: "WebSocketClientProtocol", parsed_response: dict):
+        key = sent = None
+        if self.correlation:
+            key = lookup_key(get_resolved_values(parsed_response, self.correlation[1]))
+            sent = self._sent_at.pop(key, None)
+            if sent is not None:
+                self.stats.round_trip.record(time.monotonic() - sent)
+
+        expected_response = self._find_match(parsed_response, key)
+        if expected_response is None:
+            if self.nearest_misses:
+                self._track_near_misses(parsed_response)
+            return
+
+        matched = time.monotonic()
+        self.timeline.last_match = matched - self.timeline.started
+        self.stats.matches += 1
+        latency = matched - self._latency_start(expected_response, sent)
+        if id(expected_response) in self._matched_at:
+            self._matched_at[id(expected_response)] = matched
+        self.stats.response_latency.record(latency)
+        for tracer in self.tracers:
+            tracer.on_match(self, matched, expected_response, latency)
+        if self.keep_history:
+            self.received_responses.append(expected_response)
+        self.expected_responses.remove(expected_response)
+        self._unindex_response(expected_response)
+        self._connection.matched(self, expected_response)
+        self._trigger_handler(websocket, expected_response, parsed_response, matched)
+
+    def _find_match(self, parsed_response: dict, key: object = None) -> WSResponse:
+        candidates = self.expected_responses
+        if self.correlation:
+            # responses expecting this id are checked first, then only those expecting no id one by one as usual
+            for expected_response in self._correlated.get(key, ()):
+                if expected_response.is_match(parsed_response):
+                    return expected_response
+            candidates = self._uncorrelated.values()
+
+        for expected_response in candidates:
+            if expected_response.is_match(parsed_response):
+                return expected_response
+        return None
+
+    def _start_timing(self):
+        # responses timed after another are timed from when it matched, so those it's matched at are kept
+        self._last_sent = None
+        self._matched_at = {
+            id(response.timeout_after): None for response in self.expected_responses if response.timeout_after
+        }
+
+    def _latency_start(self, response: WSResponse, sent: float = None) -> float:
+        # a response is timed from what it answers, so its latency doesn't grow with its place in the scenario:
+        # the message with its correlation id, the response it's timed after, or failing those the last message sent
+        if sent is not None:
+            return sent
+        if response.timeout_after is not None and self._matched_at.get(id(response.timeout_after)) is not None:
+            return self._matched_at[id(response.timeout_after)]
+        return self._connection.started if self._last_sent is None else self._last_sent
+
+    def _index_responses(self):
+        # each run starts without the ids sent or the near misses of the last one
+        self._correlated = {}
+        self._uncorrelated = {}
+        self._sent_at = {}
+        self._near_misses = {}
+        self._near_miss_index = {}
+        self._always_scored = {}
+        for response in self.expected_responses:
+            self._index_response(response)
+
+    def _index_response(self, response: WSResponse):
+        # responses are indexed as they're expected, so those added while replaying are looked up like any other
+        if self.correlation:
+            key = lookup_key([response.attributes.get(self.correlation[1])])
+            if key is None:
+                self._uncorrelated[id(response)] = response
+            else:
+                self._correlated.setdefault(key, []).append(response)
+
+        if self.nearest_misses:
+            # near misses are found by attribute path and value, or by path alone for attributes without a value
+            for path, value in response.attributes.items():
+                if isinstance(value, Hashable):
+                    self._near_miss_index.setdefault(path, {}).setdefault(value, {})[id(response)] = response
+                else:
+                    self._always_scored[id(response)] = response
+
+    def _unindex_response(self, response: WSResponse):
+        if self.correlation:
+            key = lookup_key([response.attributes.get(self.correlation[1])])
+            responses = self._correlated.get(key)
+            if key is None:
+                self._uncorrelated.pop(id(response), None)
+            elif responses and response in responses:
+                responses.remove(response)
+                if not responses:
+                    del self._correlated[key]
+
+        if self.nearest_misses:
+            self._always_scored.pop(id(response), None)
+            for path, value in response.attributes.items():
+                by_value = self._near_miss_index.get(path, {})
+                if isinstance(value, Hashable) and value in by_value:
+                    by_value[value].pop(id(response), None)
+                    if not by_value[value]:
+                        del by_value[value]
+                    if not by_value:
+                        del self._near_miss_index[path]
+
+    def _track_near_misses(self, parsed_response: dict):
+        # keep a min-heap of the closest responses for each expected response, the order breaking ties by age
+        self._near_miss_count += 1
+
+        # only responses sharing at least one attribute with the frame can be near misses, so only they are scored
+        candidates = dict(self._always_scored)
+        for path, by_value in self._near_miss_index.items():
+            values = get_resolved_values(parsed_response, path)
+            if values:
+                candidates.update(by_value.get(None, {}))
+                for value in values:
+                    if isinstance(value, Hashable):
+                        candidates.update(by_value.get(value, {}))
+
+        for expected_response in candidates.values():
+            score = len(expected_response.attributes) - len(expected_response.get_differences(parsed_response))
+            if not score:
+                continue
+
+            near_misses = self._near_misses.setdefault(id(expected_response), [])
+            near_miss = (score, self._near_miss_count, parsed_response)
+            if len(near_misses) < self.nearest_misses:
+                heapq.heappush(near_misses, near_miss)
+            elif near_miss > near_misses[0]:
+                heapq.heapreplace(near_misses, near_miss)
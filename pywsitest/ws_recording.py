@@ -0,0 +1,201 @@
+import json
+import mmap
+import struct
+import time
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from .ws_message import WSMessage
+from .ws_response import WSResponse
+
+
+SENT = 0
+RECEIVED = 1
+
+# set on the direction of records holding binary frames
+BINARY = 0x80
+
+MAGIC = b"PWSR\x02"
+LEGACY_MAGIC = b"PWSR\x01"
+FILE_HEADER = struct.Struct("<d")
+RECORD_HEADER = struct.Struct("<dBI")
+
+
+class WSRecorder:
+    """
+    A class representing an append-only binary log of websocket frames
+
+    The log starts with a header holding the wall clock time it was created, then each record is a little-endian
+    header of (timestamp (double), direction (byte), length (uint32)) followed by the utf-8 encoded text frame
+    or the binary frame, with BINARY set on the direction,
+    so logs can be streamed or memory-mapped without an index
+    Timestamps are seconds since the log was created and never go backwards, so logs can be appended to across runs
+
+    Attributes:
+        path (str)
+
+    Methods:
+        record(direction: int, payload: str or bytes):
+            Appends a frame to the log
+        close():
+            Flushes and closes the log
+
+    Usage:
+        recorder = WSRecorder("session.pwsr")
+        recorder.record(SENT, "{\"type\": \"connect\"}")
+        recorder.close()
+    """
+
+    def __init__(self, path: str):
+        """
+        Parameters:
+            path (str): The path of the log file, appended to if it already exists
+
+        Raises:
+            ValueError: If the file exists and is not a pywsitest recording
+        """
+        self.path = path
+        started = time.time()
+        self._start = time.monotonic()
+        self._file = open(path, "a+b")  # pylint:disable=consider-using-with
+        try:
+            self._offset = self._open_log(started)
+        except ValueError:
+            self._file.close()
+            raise
+
+    def record(self, direction: int, payload: Union[str, bytes]):
+        """
+        Appends a frame to the log, timestamped in seconds since the log was created
+
+        Parameters:
+            direction (int): SENT or RECEIVED
+            payload (str or bytes): The text or binary frame as sent or received through the websocket
+        """
+        if isinstance(payload, bytes):
+            data = payload
+            direction |= BINARY
+        else:
+            data = payload.encode("utf-8")
+        self._file.write(RECORD_HEADER.pack(self._offset + time.monotonic() - self._start, direction, len(data)))
+        self._file.write(data)
+
+    def close(self):
+        """
+        Flushes and closes the log
+        """
+        self._file.close()
+
+    def _open_log(self, started: float) -> float:
+        self._file.seek(0)
+        header = self._file.read(len(MAGIC) + FILE_HEADER.size)
+        if not header:
+            self._file.write(MAGIC + FILE_HEADER.pack(started))
+            return 0.0
+
+        data_start, base = _read_header(header, self.path)
+        end, last = data_start, 0.0
+        file_size = self._file.seek(0, 2)
+        if file_size > data_start:
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for timestamp, _, offset, length in _records(data, data_start, file_size):
+                    end, last = offset + length, timestamp
+
+        # drop a record cut short by a recorder that crashed, so new records aren't appended after it
+        if end < file_size:
+            self._file.truncate(end)
+
+        # carry on from the wall clock time since the log was created, but never before the last record
+        return last if base is None else max(last, started - base)
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, int, Union[str, bytes]]]:
+    """
+    Streams the frames of a log written by WSRecorder, memory-mapping the file rather than reading it in
+    A last record cut short by a recorder that crashed is skipped
+
+    Parameters:
+        path (str): The path of the log file
+
+    Returns:
+        (iterator[tuple[float, int, str or bytes]]): (seconds since the log was created, direction, payload)
+            for each recorded frame, the payload being bytes for binary frames
+
+    Raises:
+        ValueError: If the file is not a pywsitest recording
+    """
+    with open(path, "rb") as file:
+        data_start, _ = _read_header(file.read(len(MAGIC) + FILE_HEADER.size), path)
+
+        file_size = file.seek(0, 2)
+        if file_size <= data_start:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for timestamp, direction, offset, length in _records(data, data_start, file_size):
+                payload = data[offset:offset + length]
+                if direction & BINARY:
+                    yield timestamp, direction & ~BINARY, payload
+                else:
+                    yield timestamp, direction, payload.decode("utf-8")
+
+
+def _read_header(header: bytes, path: str) -> Tuple[int, Optional[float]]:
+    # logs written before the header held a creation time are read and appended to with the timestamps they have
+    if header.startswith(MAGIC) and len(header) == len(MAGIC) + FILE_HEADER.size:
+        return len(header), FILE_HEADER.unpack_from(header, len(MAGIC))[0]
+    if header.startswith(LEGACY_MAGIC):
+        return len(LEGACY_MAGIC), None
+    raise ValueError(f"Not a pywsitest recording: {path}")
+
+
+def _records(data: mmap.mmap, offset: int, file_size: int) -> Iterator[Tuple[float, int, int, int]]:
+    while offset + RECORD_HEADER.size <= file_size:
+        timestamp, direction, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + length > file_size:
+            return
+        yield timestamp, direction, offset, length
+        offset += length
+
+
+def to_message(payload: Union[str, bytes], delay: float) -> WSMessage:
+    """
+    Converts a recorded sent frame into a WSMessage
+
+    Parameters:
+        payload (str or bytes): The recorded frame
+        delay (float): The delay in seconds before the message should be sent
+
+    Returns:
+        (WSMessage): A message with the attributes of the recorded frame
+    """
+    message = WSMessage().with_delay(delay)
+    for key, value in json.loads(payload).items():
+        message.with_attribute(key, value)
+    return message
+
+
+def to_response(payload: Union[str, bytes], keys: Iterable[str] = None, ignore: Iterable[str] = None) -> WSResponse:
+    """
+    Converts a recorded received frame into a WSResponse expecting the non-null top level attributes of the frame
+
+    Parameters:
+        payload (str or bytes): The recorded frame
+        keys (iterable[str], optional): The only top level attributes to expect, every attribute if not given
+        ignore (iterable[str], optional): Top level attributes not to expect, such as server timestamps or ids
+
+    Returns:
+        (WSResponse): A response matching frames equal to the recorded frame at the expected top level attributes
+    """
+    parsed: Union[dict, list] = json.loads(payload)
+    items = parsed.items() if isinstance(parsed, dict) else enumerate(parsed)
+    keys = None if keys is None else set(keys)
+    ignore = set(ignore or ())
+
+    response = WSResponse()
+    for key, value in items:
+        key = str(key)
+        # null values can never be resolved from a response, so they can't be expected
+        if value is not None and (keys is None or key in keys) and key not in ignore:
+            response.with_attribute(key, value)
+    return response
@@ -7,18 +7,27 @@ from .ws_message import WSMessage
 class WSResponse:
     """
     A class representing an expected message to be received through the websocket
+    Clones share their attributes and triggers until one of them changes them through with_attribute or with_trigger
 
     Attributes:
         attributes (dict)
         triggers (list)
+        timeout (float)
+        timeout_after (WSResponse)
 
     Methods:
         with_attribute(key, value=None):
             Adds an attribute and returns the WSResponse
         with_trigger(message: WSResponse):
             Adds a trigger and returns the WSResponse
+        with_timeout(timeout: float, after: WSResponse):
+            Sets the time to wait for this response and returns the WSResponse
         is_match(response: dict):
             Checks if this WSResponse instance matches an input response and returns the result as a bool
+        get_differences(response: dict):
+            Returns the values found for each attribute that doesn't match an input response
+        clone():
+            Returns a copy of the WSResponse sharing its attributes and triggers until either changes them
 
     Usage:
         response = (
@@ -31,9 +40,14 @@ class WSResponse:
         )
     """
 
+    __slots__ = ("attributes", "triggers", "timeout", "timeout_after", "_shared")
+
     def __init__(self):
         self.attributes = {}
         self.triggers = []
+        self.timeout = None
+        self.timeout_after = None
+        self._shared = False
 
     def __str__(self) -> str:
         return json.dumps(self.attributes)
@@ -49,12 +63,14 @@ class WSResponse:
         Returns:
             (WSResponse): The WSResponse instance with_attribute was called on
         """
+        self._own_attributes()
         self.attributes[attribute] = value
         return self
 
     def with_trigger(self, message: WSMessage) -> "WSResponse":
         """
         Adds a trigger to the triggers list
+        A triggered message is sent once its delay has passed since the response was matched
 
         Parameters:
             message (WSMessage): The message object to send to the websocket
@@ -62,9 +78,27 @@ class WSResponse:
         Returns:
             (WSResponse): The WSResponse instance with_trigger was called on
         """
+        self._own_attributes()
         self.triggers.append(message)
         return self
 
+    def with_timeout(self, timeout: float, after: "WSResponse" = None) -> "WSResponse":
+        """
+        Sets the time to wait for this response, from the start of the test or from when another response is matched,
+        such as the response whose trigger this response answers
+        A response with its own timeout isn't subject to the test's response timeout
+
+        Parameters:
+            timeout (float): The time to wait for the response in seconds
+            after (WSResponse, optional): The expected response whose match starts the timeout
+
+        Returns:
+            (WSResponse): The WSResponse instance with_timeout was called on
+        """
+        self.timeout = timeout
+        self.timeout_after = after
+        return self
+
     def is_match(self, response: dict) -> bool:
         """
         Checks if this WSResponse instance matches an input response by checking all attributes are present
@@ -91,3 +125,41 @@ class WSResponse:
             return False
 
         return True
+
+    def get_differences(self, response: dict) -> dict:
+        """
+        Finds the attributes that an input response doesn't match, to explain why is_match is False
+
+        Parameters:
+            response (dict): The response to compare against
+
+        Returns:
+            (dict): The values found at the path of each attribute that doesn't match, empty if the path is missing
+        """
+        differences = {}
+        for key, value in self.attributes.items():
+            resolved_values = get_resolved_values(response, key)
+            if not resolved_values or (value is not None and value not in resolved_values):
+                differences[key] = resolved_values
+        return differences
+
+    def clone(self) -> "WSResponse":
+        """
+        Copies the response without copying its attributes or triggers, which are copied by whichever changes them first
+
+        Returns:
+            (WSResponse): A new WSResponse with the same attributes and triggers
+        """
+        response = WSResponse.__new__(WSResponse)
+        response.attributes = self.attributes
+        response.triggers = self.triggers
+        response.timeout = self.timeout
+        response.timeout_after = self.timeout_after
+        response._shared = self._shared = True  # noqa: pylint - protected-access
+        return response
+
+    def _own_attributes(self):
+        if self._shared:
+            self.attributes = dict(self.attributes)
+            self.triggers = list(self.triggers)
+            self._shared = False
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from .rest_request import RestRequest
+from .utils import frame_size, get_resolved_values, lookup_key
+from .ws_message import WSMessage
+from .ws_recording import SENT, RECEIVED, read_recording, to_message, to_response
+from .ws_response import WSResponse
+from .ws_timeout_error import WSTimeoutError
+
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
+
+
+class SendMixin:
+    """
+    A class sending a WSTest's messages, triggered messages, replayed frames and rest requests,
+    recording each in the test's stats, tracers, history and recording
+    """
+
+    def _trigger_handler(self, websocket: "WebSocketClientProtocol", response: WSResponse, raw_response: dict,
+                         matched: float):
+        # resolve clones so the triggers can be resolved again when the test is looped
+        messages = [message.clone().resolve(raw_response) for message in response.triggers]
+        if not messages:
+            return
+
+        if self.strict_trigger_order:
+            self._last_trigger = self._connection.schedule_trigger(
+                self._send_triggers(websocket, messages, matched, self._last_trigger)
+            )
+        else:
+            for message in messages:
+                self._connection.schedule_trigger(self._send_triggers(websocket, [message], matched))
+
+    async def _send_triggers(self, websocket: "WebSocketClientProtocol", messages: list, matched: float,
+                             previous: asyncio.Task = None):
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        for message in messages:
+            # delays are measured from when the response matched, not from the previous send
+            await self._send_handler(websocket, message, max(0.0, matched + message.delay - time.monotonic()))
+
+    async def _send(self, websocket: "WebSocketClientProtocol"):
+        while self.messages:
+            message = self.messages.pop(0)
+            await self._send_handler(websocket, message)
+
+    async def _send_handler(self, websocket: "WebSocketClientProtocol", message: WSMessage, delay: float = None):
+        delay = message.delay if delay is None else delay
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            payload = str(message)
+            self._last_sent = time.monotonic()
+            if self.correlation:
+                key = lookup_key(get_resolved_values(message.attributes, self.correlation[0]))
+                if key is not None:
+                    self._sent_at[key] = self._last_sent
+            await asyncio.wait_for(websocket.send(payload), timeout=self.message_timeout)
+            size = frame_size(payload)
+            self.stats.frames_sent += 1
+            self.stats.bytes_sent += size
+            if self.tracers:
+                timestamp = time.monotonic()
+                for tracer in self.tracers:
+                    tracer.on_send(self, timestamp, message, size)
+            if self.keep_history:
+                self.sent_messages.append(message)
+            if self._connection.recorder:
+                self._connection.recorder.record(SENT, payload)
+        except asyncio.TimeoutError as ex:
+            error_message = "Timed out trying to send message:\n" + str(message)
+            raise WSTimeoutError(error_message) from ex
+
+    async def _replay(self, websocket: "WebSocketClientProtocol"):
+        if not self.replay_path:
+            return
+
+        try:
+            previous = 0.0
+            pending = None
+            for timestamp, direction, payload in read_recording(self.replay_path):
+                # responses to a sent frame are expected before the frame itself is sent
+                if direction == RECEIVED:
+                    response = to_response(payload, self.replay_match_keys, self.replay_ignore_keys)
+                    self.expected_responses.append(response)
+                    self._index_response(response)
+                    continue
+
+                if pending:
+                    await self._send_handler(websocket, pending)
+
+                delay = max(0.0, timestamp - previous) / self.replay_speed if self.replay_speed else 0.0
+                previous = timestamp
+                pending = to_message(payload, delay)
+
+            if pending:
+                await self._send_handler(websocket, pending)
+        finally:
+            self._connection.replaying = False
+            # stop waiting for frames straight away if the replay's responses have all been received
+            if not self._connection.is_waiting():
+                self._connection.interrupt_receiver()
+
+    async def _request(self):
+        while self.requests:
+            request = self.requests.pop(0)
+            await self._request_handler(request)
+
+    async def _request_handler(self, request: RestRequest):
+        from requests.exceptions import ConnectTimeout, ReadTimeout  # pylint:disable=import-outside-toplevel
+
+        try:
+            if request.delay:
+                await asyncio.sleep(request.delay)
+
+            started = time.monotonic()
+            for tracer in self.tracers:
+                tracer.on_request_start(self, started, request)
+
+            response = request.send(self.request_timeout)
+
+            finished = time.monotonic()
+            self.stats.requests += 1
+            self.stats.request_latency.record(finished - started)
+            self.timeline.requests.append((started - self.timeline.started, finished - started, request.uri))
+            for tracer in self.tracers:
+                tracer.on_request_end(self, finished, request, finished - started, response)
+
+            if self.keep_history:
+                self.received_request_responses.append(response)
+                self.sent_requests.append(request)
+
+        except (ConnectTimeout, ReadTimeout) as ex:
+            error_message = "Timed out trying to send request:\n" + str(request)
+            raise WSTimeoutError(error_message) from ex
@@ -0,0 +1,258 @@
+import asyncio
+import collections
+import json
+import random
+
+from .ws_message import WSMessage
+from .ws_response import WSResponse
+
+
+# the number of received frames kept by default
+DEFAULT_HISTORY = 1000
+
+
+class WSServer:  # noqa: pylint - too-many-instance-attributes
+    """
+    A class representing a scriptable websocket server for testing websocket clients offline
+
+    Attributes:
+        host (str)
+        port (int)
+        replies (list)
+        pushes (list)
+        latency (float)
+        jitter (float)
+        disconnect_after_frames (int)
+        disconnect_after_seconds (float)
+        received_json (deque)
+        frames_received (int)
+        connections (int)
+
+    Methods:
+        with_reply(response: WSResponse):
+            Adds a pattern to reply to and returns the WSServer
+        with_push(message: WSMessage, interval: float, count: int):
+            Adds a message to push on an interval and returns the WSServer
+        with_latency(latency: float, jitter: float, seed: int):
+            Adds latency to every frame sent and returns the WSServer
+        with_disconnect_after(frames: int, seconds: float):
+            Disconnects clients after a number of frames or seconds and returns the WSServer
+        with_history(frames: int):
+            Sets how many of the latest received frames to keep and returns the WSServer
+        async start():
+            Starts listening on the loopback interface
+        async stop():
+            Stops listening and closes all connections
+        uri:
+            The uri clients can connect to
+
+    Usage:
+        server = (
+            WSServer()
+            .with_reply(
+                WSResponse()
+                .with_attribute("type", "ping")
+                .with_trigger(
+                    WSMessage()
+                    .with_attribute("type", "pong")
+                    .with_attribute("id", "${id}")
+                )
+            )
+            .with_latency(0.05, jitter=0.01)
+        )
+
+        async with server:
+            await WSTest(server.uri).with_message(...).with_response(...).run()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Parameters:
+            host (str, optional): The host to listen on, loopback by default
+            port (int, optional): The port to listen on, any free port by default
+        """
+        self.host = host
+        self.port = port
+        self.replies = []
+        self.pushes = []
+        self.latency = 0.0
+        self.jitter = 0.0
+        self.disconnect_after_frames = None
+        self.disconnect_after_seconds = None
+        self.received_json = collections.deque(maxlen=DEFAULT_HISTORY)
+        self.frames_received = 0
+        self.connections = 0
+        self._random = random.Random()  # nosec - jitter doesn't need to be cryptographically secure
+        self._server = None
+
+    @property
+    def uri(self) -> str:
+        """
+        Returns:
+            (str): The uri clients can connect to once the server has started
+        """
+        return f"ws://{self.host}:{self.port}"
+
+    def with_reply(self, response: WSResponse) -> "WSServer":
+        """
+        Adds a pattern to reply to
+        When a received frame matches the response, its triggers are sent back resolved against the received frame
+        Only the first matching reply is used
+
+        Parameters:
+            response (WSResponse): The pattern to match, with the replies as triggers
+
+        Returns:
+            (WSServer): The WSServer instance with_reply was called on
+        """
+        self.replies.append(response)
+        return self
+
+    def with_push(self, message: WSMessage, interval: float, count: int = None) -> "WSServer":
+        """
+        Adds a message to push to every client on an interval, starting when the client connects
+
+        Parameters:
+            message (WSMessage): The message to push
+            interval (float): The time between pushes in seconds
+            count (int, optional): The number of pushes, unlimited by default
+
+        Returns:
+            (WSServer): The WSServer instance with_push was called on
+        """
+        self.pushes.append((message, interval, count))
+        return self
+
+    def with_latency(self, latency: float, jitter: float = 0.0, seed: int = None) -> "WSServer":
+        """
+        Adds latency to every frame sent
+        Frames are delayed independently, so jitter can reorder frames as it would on a real network
+
+        Parameters:
+            latency (float): The delay before each frame is sent in seconds
+            jitter (float, optional): The maximum random deviation from latency in seconds
+            seed (int, optional): A seed for the jitter, to make runs repeatable
+
+        Returns:
+            (WSServer): The WSServer instance with_latency was called on
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self._random.seed(seed)
+        return self
+
+    def with_disconnect_after(self, frames: int = None, seconds: float = None) -> "WSServer":
+        """
+        Disconnects clients after a number of frames have been received from them, or after a time
+
+        Parameters:
+            frames (int, optional): The number of frames to receive before disconnecting
+            seconds (float, optional): The time to wait after connection before disconnecting
+
+        Returns:
+            (WSServer): The WSServer instance with_disconnect_after was called on
+        """
+        self.disconnect_after_frames = frames
+        self.disconnect_after_seconds = seconds
+        return self
+
+    def with_history(self, frames: int = None) -> "WSServer":
+        """
+        Sets how many of the latest frames received from every client are kept in received_json
+        Only the latest 1000 are kept by default, so a server under load or soak tests doesn't grow without limit
+
+        Parameters:
+            frames (int, optional): The number of frames to keep, 0 to keep none or None to keep every frame
+
+        Returns:
+            (WSServer): The WSServer instance with_history was called on
+        """
+        self.received_json = collections.deque(self.received_json, maxlen=frames)
+        return self
+
+    async def start(self):
+        """
+        Starts listening, updating the port if any free port was requested
+        """
+        import websockets  # pylint:disable=import-outside-toplevel
+
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stops listening and closes all connections
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> "WSServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.stop()
+
+    async def _handler(self, websocket, *_):
+        from websockets.exceptions import ConnectionClosed  # pylint:disable=import-outside-toplevel
+
+        self.connections += 1
+        tasks = set()
+        for message, interval, count in self.pushes:
+            task = asyncio.ensure_future(self._push(websocket, tasks, message, interval, count))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        try:
+            await asyncio.wait_for(self._receive(websocket, tasks), timeout=self.disconnect_after_seconds)
+        except (asyncio.TimeoutError, ConnectionClosed):
+            pass
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            await websocket.close()
+
+    async def _receive(self, websocket, tasks: set):
+        received = 0
+        async for response in websocket:
+            self.frames_received += 1
+            self.received_json.append(response)
+            received += 1
+
+            parsed_response = json.loads(response)
+            for reply in self.replies:
+                if reply.is_match(parsed_response):
+                    for message in reply.triggers:
+                        # resolve a clone so the reply can be resolved again for the next match
+                        self._send_later(websocket, tasks, message.clone().resolve(parsed_response))
+                    break
+
+            if self.disconnect_after_frames and received >= self.disconnect_after_frames:
+                return
+
+    async def _push(self, websocket, tasks: set, message: WSMessage, interval: float, count: int):
+        sent = 0
+        while count is None or sent < count:
+            await asyncio.sleep(interval)
+            self._send_later(websocket, tasks, message)
+            sent += 1
+
+    def _send_later(self, websocket, tasks: set, message: WSMessage):
+        task = asyncio.ensure_future(self._send(websocket, message))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def _send(self, websocket, message: WSMessage):
+        from websockets.exceptions import ConnectionClosed  # pylint:disable=import-outside-toplevel
+
+        delay = message.delay + self.latency
+        if self.jitter:
+            delay += self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        try:
+            await websocket.send(str(message))
+        except ConnectionClosed:
+            pass
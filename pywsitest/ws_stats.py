@@ -0,0 +1,358 @@
+import math
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import List, Tuple
+
+
+class WSStats:  # noqa: pylint - too-many-instance-attributes
+    """
+    A class representing rolling aggregates of one or more test runs
+    Only counters and histograms are kept, so memory stays flat however long the runs go on for
+    Rates are measured from the start of the first run aggregated, or from start if it's called before then
+
+    Attributes:
+        started (float)
+        open_connections (int)
+        runs (int)
+        failures (int)
+        frames_sent (int)
+        frames_received (int)
+        bytes_sent (int)
+        bytes_received (int)
+        wire_bytes_sent (int)
+        wire_bytes_received (int)
+        matches (int)
+        timeouts (int)
+        requests (int)
+        max_queue_depth (int)
+        connect_duration (LatencyHistogram)
+        response_latency (LatencyHistogram)
+        request_latency (LatencyHistogram)
+        run_duration (LatencyHistogram)
+        recv_wait (LatencyHistogram)
+        queue_time (LatencyHistogram)
+        round_trip (LatencyHistogram)
+
+    Methods:
+        start():
+            Starts the window rates are measured over, if it hasn't started yet
+        merge(other: WSStats):
+            Adds the counters and histograms of another WSStats and returns the WSStats
+        snapshot():
+            Returns the current aggregates as a dictionary
+        check(objectives: list):
+            Checks the current aggregates against performance objectives and returns the results
+
+    Usage:
+        stats = WSStats()
+
+        await WSTest("wss://example.com").with_stats(stats).run()
+
+        print(stats.snapshot())
+    """
+
+    def __init__(self):
+        self.started = None
+        self.open_connections = 0
+        self.runs = 0
+        self.failures = 0
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.wire_bytes_sent = 0
+        self.wire_bytes_received = 0
+        self.matches = 0
+        self.timeouts = 0
+        self.requests = 0
+        self.max_queue_depth = 0
+        self.connect_duration = LatencyHistogram()
+        self.response_latency = LatencyHistogram()
+        self.request_latency = LatencyHistogram()
+        self.run_duration = LatencyHistogram()
+        self.recv_wait = LatencyHistogram()
+        self.queue_time = LatencyHistogram()
+        self.round_trip = LatencyHistogram()
+
+    def start(self) -> "WSStats":
+        """
+        Starts the window rates are measured over, if it hasn't started yet
+        Runs call this as they start, so time spent between creating the stats and running doesn't lower the rates
+
+        Returns:
+            (WSStats): The WSStats instance start was called on
+        """
+        if self.started is None:
+            self.started = time.monotonic()
+        return self
+
+    def merge(self, other: "WSStats") -> "WSStats":
+        """
+        Adds the counters and histograms of another WSStats, such as one from another process, keeping this start time
+
+        Parameters:
+            other (WSStats): The stats to add
+
+        Returns:
+            (WSStats): The WSStats instance merge was called on
+        """
+        for name, value in vars(other).items():
+            if isinstance(value, LatencyHistogram):
+                getattr(self, name).merge(value)
+            elif name == "max_queue_depth":
+                self.max_queue_depth = max(self.max_queue_depth, value)
+            elif name != "started":
+                setattr(self, name, getattr(self, name) + value)
+        return self
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current aggregates, with rates calculated since the window started
+
+        Returns:
+            (dict): The counters, rates and histogram summaries, json serialisable
+        """
+        elapsed = 0.0 if self.started is None else time.monotonic() - self.started
+        return {
+            "elapsed": elapsed,
+            "open_connections": self.open_connections,
+            "runs": self.runs,
+            "failures": self.failures,
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "wire_bytes_sent": self.wire_bytes_sent,
+            "wire_bytes_received": self.wire_bytes_received,
+            "matches": self.matches,
+            "timeouts": self.timeouts,
+            "requests": self.requests,
+            "max_queue_depth": self.max_queue_depth,
+            "frames_sent_per_second": self.frames_sent / elapsed if elapsed else 0.0,
+            "frames_received_per_second": self.frames_received / elapsed if elapsed else 0.0,
+            "error_rate": self.failures / self.runs if self.runs else 0.0,
+            "connect_duration": self.connect_duration.summary(),
+            "response_latency": self.response_latency.summary(),
+            "request_latency": self.request_latency.summary(),
+            "run_duration": self.run_duration.summary(),
+            "recv_wait": self.recv_wait.summary(),
+            "queue_time": self.queue_time.summary(),
+            "round_trip": self.round_trip.summary(),
+        }
+
+    def check(self, objectives: List[dict]) -> List[dict]:
+        """
+        Checks the current aggregates against performance objectives
+        Each objective names a value of the snapshot, such as "error_rate" or "frames_received_per_second",
+        or a histogram percentile, such as "response_latency/p99", with a "max" or "min" limit
+
+        Parameters:
+            objectives (list[dict]): The objectives, each with a "metric" and a "max" or "min"
+
+        Returns:
+            (list[dict]): The objectives with the "actual" value and whether each "passed"
+        """
+        snapshot = self.snapshot()
+        results = []
+        for objective in objectives:
+            name, _, percentile = objective["metric"].partition("/")
+            actual = snapshot[name][percentile] if percentile else snapshot[name]
+            passed = actual <= objective["max"] if "max" in objective else actual >= objective["min"]
+            results.append({**objective, "actual": actual, "passed": passed})
+        return results
+
+
+class LatencyHistogram:
+    """
+    A class representing a log-linear histogram of durations in seconds, counted in whole microseconds
+    Durations under 64 microseconds get a bucket each, then every doubling is split into 32 equal buckets,
+    so percentiles are within 1/32 however many values are recorded, and histograms merge without losing anything
+
+    Attributes:
+        counts (array)
+        count (int)
+        total (float)
+        max (float)
+
+    Methods:
+        record(value: float):
+            Adds a duration to the histogram
+        merge(other: LatencyHistogram):
+            Adds the counts of another histogram and returns the LatencyHistogram
+        percentile(percent: float):
+            Returns the upper bound of the bucket containing the percentile
+        cumulative():
+            Returns the upper bound and cumulative count of each bucket
+        summary():
+            Returns the count, mean, max and common percentiles as a dictionary
+        to_bytes():
+            Returns the histogram as compressed bytes
+        from_bytes(data: bytes):
+            Returns a histogram read from to_bytes
+
+    Usage:
+        histogram = LatencyHistogram()
+        histogram.record(0.0042)
+
+        merged = LatencyHistogram.from_bytes(histogram.to_bytes()).merge(other_histogram)
+        print(merged.percentile(99))
+    """
+
+    UNIT = 1e-6
+    SUB_BUCKET_BITS = 6
+
+    _FORMAT_VERSION = 1
+    _HEADER = struct.Struct("<BBQdd")
+    _HALF = 1 << (SUB_BUCKET_BITS - 1)
+
+    def __init__(self):
+        self.counts = array("Q")
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        """
+        Adds a duration to the histogram
+
+        Parameters:
+            value (float): The duration in seconds
+        """
+        index = self._index(int(value / self.UNIT) if value > 0 else 0)
+        if index >= len(self.counts):
+            self._grow(index + 1)
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Adds the counts of another histogram, such as one from another connection or process
+
+        Parameters:
+            other (LatencyHistogram): The histogram to add
+
+        Returns:
+            (LatencyHistogram): The LatencyHistogram instance merge was called on
+        """
+        if len(other.counts) > len(self.counts):
+            self._grow(len(other.counts))
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the upper bound of the bucket containing the percentile, capped at the largest recorded value
+
+        Parameters:
+            percent (float): The percentile, between 0 and 100
+
+        Returns:
+            (float): The percentile in seconds, 0 if nothing has been recorded
+        """
+        target = math.ceil(self.count * percent / 100)
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= target:
+                return min(self.max, self._upper_bound(index) * self.UNIT)
+        return 0.0
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """
+        Returns the upper bound of each bucket up to the largest recorded value, with the count of values below it
+
+        Returns:
+            (list[tuple[float, int]]): The (upper bound in seconds, cumulative count) of each bucket
+        """
+        buckets = []
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            buckets.append((self._upper_bound(index) * self.UNIT, cumulative))
+        return buckets
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            (dict): The count, mean, max, 50th, 90th and 99th percentiles of the histogram
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the histogram as a header followed by the compressed little endian bucket counts,
+        which is also how histograms are pickled to send between processes
+
+        Returns:
+            (bytes): The serialised histogram
+        """
+        counts = array("Q", self.counts)
+        if sys.byteorder == "big":
+            counts.byteswap()
+        header = self._HEADER.pack(self._FORMAT_VERSION, self.SUB_BUCKET_BITS, self.count, self.total, self.max)
+        return header + zlib.compress(counts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LatencyHistogram":
+        """
+        Parameters:
+            data (bytes): A histogram serialised by to_bytes
+
+        Raises:
+            ValueError: If the data isn't a histogram with the same buckets
+
+        Returns:
+            (LatencyHistogram): The histogram
+        """
+        try:
+            version, bits, count, total, maximum = cls._HEADER.unpack_from(data)
+            counts = array("Q", zlib.decompress(data[cls._HEADER.size:]))
+        except (struct.error, zlib.error, ValueError) as ex:
+            raise ValueError("Invalid histogram data") from ex
+        if version != cls._FORMAT_VERSION or bits != cls.SUB_BUCKET_BITS:
+            raise ValueError(f"Unsupported histogram format {version} with {bits} sub bucket bits")
+        if sys.byteorder == "big":
+            counts.byteswap()
+
+        histogram = cls()
+        histogram.counts = counts
+        histogram.count = count
+        histogram.total = total
+        histogram.max = maximum
+        return histogram
+
+    def __reduce__(self):
+        return self.from_bytes, (self.to_bytes(),)
+
+    def _grow(self, size: int):
+        self.counts.frombytes(bytes(self.counts.itemsize * (size - len(self.counts))))
+
+    @classmethod
+    def _index(cls, units: int) -> int:
+        # values below 2 ** SUB_BUCKET_BITS get a bucket each, larger values keep their top SUB_BUCKET_BITS bits
+        magnitude = max(0, units.bit_length() - cls.SUB_BUCKET_BITS)
+        return magnitude * cls._HALF + (units >> magnitude)
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> int:
+        magnitude = max(0, index // cls._HALF - 1)
+        return (index - magnitude * cls._HALF + 1) << magnitude
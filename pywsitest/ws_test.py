@@ -1,18 +1,35 @@
 import asyncio
+import copy
 import json
 import ssl
+import time
+from typing import TYPE_CHECKING
 
-from requests.exceptions import ConnectTimeout, ReadTimeout
-import websockets
-from websockets.client import WebSocketClientProtocol
-
+from .utils import bind_placeholders
+from .ws_client import ClientMixin
+from .ws_connection import ConnectionState
+from .ws_feeder import DataFeeder
 from .ws_message import WSMessage
+from .ws_performance_error import check_objectives
+from .ws_receive import ReceiveMixin
 from .ws_response import WSResponse
+from .ws_send import SendMixin
+from .ws_stats import WSStats
+from .ws_timeline import WSTimeline
 from .ws_timeout_error import WSTimeoutError
+from .ws_tracer import WSTracer
 from .rest_request import RestRequest
 
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
+
+
+# timeout errors list at most this many responses, each cut to this many characters
+MAX_ERROR_ENTRIES = 50
+MAX_ERROR_ENTRY_LENGTH = 1000
 
-class WSTest:  # noqa: pylint - too-many-instance-attributes
+
+class WSTest(ClientMixin, SendMixin, ReceiveMixin):  # noqa: pylint - too-many-instance-attributes
     """
     A class representing a websocket test runner
 
@@ -31,6 +48,29 @@ class WSTest:  # noqa: pylint - too-many-instance-attributes
         message_timeout (float)
         request_timeout (float)
         test_timeout (float)
+        recording_path (str)
+        replay_path (str)
+        replay_speed (float)
+        replay_match_keys (list)
+        replay_ignore_keys (list)
+        stats (WSStats)
+        keep_history (bool)
+        soak_duration (float)
+        soak_flush_interval (float)
+        soak_sink (callable or str)
+        tracers (list)
+        timeline (WSTimeline)
+        connect_breakdown (bool)
+        compression (dict)
+        feeders (list)
+        row (dict)
+        nearest_misses (int)
+        buffer_limits (dict)
+        strict_trigger_order (bool)
+        correlation (tuple)
+        channel_key (str)
+        channels (dict)
+        objectives (list)
 
     Methods:
         with_parameter(key, value):
@@ -51,6 +91,44 @@ class WSTest:  # noqa: pylint - too-many-instance-attributes
             Enables websocket received response logging and returns the WSTest
         with_request(request: RestRequest):
             Adds a rest request and returns the WSTest
+        with_recording(path: str):
+            Records every sent and received frame to a log file and returns the WSTest
+        with_replay(path: str, speed: float, match_keys: list, ignore_keys: list):
+            Replays a recorded session against the websocket and returns the WSTest
+        with_stats(stats: WSStats):
+            Sets the stats to aggregate runs into and returns the WSTest
+        with_soak(duration: float, flush_interval: float, sink: callable or str):
+            Loops the test for a duration, keeping only aggregate stats, and returns the WSTest
+        with_tracer(tracer: WSTracer):
+            Adds a tracer to call on each connect, send, receive, match, request and timeout and returns the WSTest
+        with_connect_breakdown():
+            Times dns resolution and the tcp connection separately from the websocket handshake and returns the WSTest
+        with_compression(enabled, client_max_window_bits, server_max_window_bits, compress_settings):
+            Configures permessage-deflate compression and returns the WSTest
+        with_feeder(feeder: DataFeeder):
+            Binds a row from a data feeder into placeholders on each connection and returns the WSTest
+        with_buffer_limits(max_queue, max_size, read_limit, write_limit):
+            Sets the websocket client's receive queue and buffer limits and returns the WSTest
+        with_nearest_misses(count: int):
+            Tracks the received responses closest to each expected response for timeout errors and returns the WSTest
+        with_websocket(websocket: WebSocketClientProtocol):
+            Runs the test over an open websocket connection instead of connecting and returns the WSTest
+        with_strict_trigger_order():
+            Sends triggered messages one at a time in the order they were triggered and returns the WSTest
+        with_correlation(message_path: str, response_path: str):
+            Pairs replies with sent messages by a correlation id, timing each round trip, and returns the WSTest
+        with_channel_key(path: str):
+            Sets the path of the channel in received frames and returns the WSTest
+        with_channel(value, channel: WSTest):
+            Adds a logical session sharing this test's connection and returns the WSTest
+        with_max_latency(p50: float, p90: float, p99: float, metric: str):
+            Fails the run if latency percentiles are too high and returns the WSTest
+        with_min_throughput(frames_per_second: float, direction: str):
+            Fails the run if too few frames are sent or received per second and returns the WSTest
+        with_max_error_rate(rate: float):
+            Fails the run if too many runs fail and returns the WSTest
+        spawn(parameters: dict, headers: dict):
+            Returns a new runnable WSTest sharing this test's configuration, messages and expected responses
         async run():
             Runs the websocket tester with the current configuration
         is_complete():
@@ -97,6 +175,31 @@ class WSTest:  # noqa: pylint - too-many-instance-attributes
         self.request_timeout = 10.0
         self.test_timeout = 60.0
         self.log_responses_on_error = False
+        self.recording_path = None
+        self.replay_path = None
+        self.replay_speed = 1.0
+        self.replay_match_keys = None
+        self.replay_ignore_keys = None
+        self.stats = WSStats()
+        self.keep_history = True
+        self.soak_duration = None
+        self.soak_flush_interval = 60.0
+        self.soak_sink = None
+        self.tracers = []
+        self.timeline = WSTimeline()
+        self.connect_breakdown = False
+        self.compression = None
+        self.feeders = []
+        self.row = None
+        self.nearest_misses = 0
+        self.buffer_limits = {}
+        self.strict_trigger_order = False
+        self.correlation = None
+        self.channel_key = None
+        self.channels = {}
+        self.objectives = []
+        self.websocket = None
+        self._reset_run_state()
 
     def with_parameter(self, key: str, value: object) -> "WSTest":
         """
@@ -157,6 +260,7 @@ class WSTest:  # noqa: pylint - too-many-instance-attributes
     def with_response_timeout(self, timeout: float) -> "WSTest":
         """
         Sets the response timeout in seconds
+        The timeout restarts whenever a frame is received, and applies to expected responses without their own timeout
 
         Parameters:
             timeout (float): The time to wait for a response in seconds
@@ -229,119 +333,593 @@ class WSTest:  # noqa: pylint - too-many-instance-attributes
         self.requests.append(request)
         return self
 
-    # pylint:disable=no-member
+    def with_recording(self, path: str) -> "WSTest":
+        """
+        Records every frame sent and received during the test to an append-only log
+
+        Parameters:
+            path (str): The path of the log file, appended to if it already exists
+
+        Returns:
+            (WSTest): The WSTest instance with_recording was called on
+        """
+        self.recording_path = path
+        return self
+
+    def with_replay(self, path: str, speed: float = 1.0, match_keys: list = None,
+                    ignore_keys: list = None) -> "WSTest":
+        """
+        Replays a session recorded with with_recording
+        Recorded sent frames are sent with their original spacing divided by speed
+        Recorded received frames are expected as responses, in addition to any other expected responses,
+        matching every top level attribute unless match_keys or ignore_keys narrow them down
+        Sent and received history isn't kept, only the aggregates in stats, so long replays don't pile up frames
+
+        Parameters:
+            path (str): The path of the log file, streamed from disk as the replay progresses
+            speed (float, optional): The replay speed multiplier, None or 0 to send as fast as possible
+            match_keys (list[str], optional): The only top level attributes of recorded frames to expect
+            ignore_keys (list[str], optional): Top level attributes of recorded frames that change between sessions,
+                such as server timestamps or ids, which aren't expected
+
+        Returns:
+            (WSTest): The WSTest instance with_replay was called on
+        """
+        self.replay_path = path
+        self.replay_speed = speed
+        self.replay_match_keys = match_keys
+        self.replay_ignore_keys = ignore_keys
+        self.keep_history = False
+        return self
+
+    def with_stats(self, stats: WSStats) -> "WSTest":
+        """
+        Sets the stats the test aggregates into, so several tests can share one set of stats
+
+        Parameters:
+            stats (WSStats): The stats to aggregate into
+
+        Returns:
+            (WSTest): The WSTest instance with_stats was called on
+        """
+        self.stats = stats
+        return self
+
+    def with_soak(self, duration: float, flush_interval: float = 60.0, sink=None) -> "WSTest":
+        """
+        Enables soak mode, where run loops the test on a new connection until the duration expires
+        Sent and received history isn't kept, only the aggregates in stats, so memory stays flat
+        Timeouts and disconnects are counted as failures and the loop carries on
+
+        Parameters:
+            duration (float): The time to loop the test for in seconds
+            flush_interval (float, optional): The time between stats flushes in seconds
+            sink (callable or str, optional): Called with each stats snapshot, or a file to append them to as json
+
+        Returns:
+            (WSTest): The WSTest instance with_soak was called on
+        """
+        self.soak_duration = duration
+        self.soak_flush_interval = flush_interval
+        self.soak_sink = sink
+        self.keep_history = False
+        return self
+
+    def with_tracer(self, tracer: WSTracer) -> "WSTest":
+        """
+        Adds a tracer, whose hooks are called with monotonic timestamps as the test runs
+        Tests without tracers only pay for an empty list check at each hook point
+
+        Parameters:
+            tracer (WSTracer): The tracer to add
+
+        Returns:
+            (WSTest): The WSTest instance with_tracer was called on
+        """
+        self.tracers.append(tracer)
+        return self
+
+    def with_connect_breakdown(self) -> "WSTest":
+        """
+        Opens the tcp connection before handing it to websockets, so the timeline splits the connection into
+        dns resolution, tcp connection and the tls and http upgrade handshake
+
+        Returns:
+            (WSTest): The WSTest instance with_connect_breakdown was called on
+        """
+        self.connect_breakdown = True
+        return self
+
+    def with_compression(self, enabled: bool = True, client_max_window_bits: int = None,
+                         server_max_window_bits: int = None, compress_settings: dict = None) -> "WSTest":
+        """
+        Configures permessage-deflate compression, which websockets otherwise negotiates with its own defaults
+        Compare bytes_sent/bytes_received with wire_bytes_sent/wire_bytes_received in stats to see the saving
+
+        Parameters:
+            enabled (bool, optional): Whether to offer compression to the server at all
+            client_max_window_bits (int, optional): The size of the client's sliding window, 8 to 15
+            server_max_window_bits (int, optional): The size of the server's sliding window, 8 to 15
+            compress_settings (dict, optional): Keyword arguments for zlib.compressobj, such as level and memLevel
+
+        Returns:
+            (WSTest): The WSTest instance with_compression was called on
+        """
+        self.compression = {
+            "enabled": enabled,
+            "client_max_window_bits": client_max_window_bits,
+            "server_max_window_bits": server_max_window_bits,
+            "compress_settings": compress_settings,
+        }
+        return self
+
+    def with_feeder(self, feeder: DataFeeder) -> "WSTest":
+        """
+        Adds a data feeder to take a row from each time the test connects
+        The row's values replace ${column} placeholders for that run in parameters, headers, the attributes of
+        messages, including those of channels, and the headers and body of requests, including nested values
+
+        Parameters:
+            feeder (DataFeeder): The feeder to take rows from, which can be shared between tests
+
+        Returns:
+            (WSTest): The WSTest instance with_feeder was called on
+        """
+        self.feeders.append(feeder)
+        return self
+
+    def with_buffer_limits(self, max_queue: int = None, max_size: int = None, read_limit: int = None,
+                           write_limit: int = None) -> "WSTest":
+        """
+        Sets the buffer limits of the websocket client, any left as None keep the websockets library default
+        Frames waiting in the receive queue are counted in stats.max_queue_depth and timed in stats.queue_time
+
+        Parameters:
+            max_queue (int, optional): The most received messages to queue before the client stops reading
+            max_size (int, optional): The largest message to accept in bytes
+            read_limit (int, optional): The high-water mark of the read buffer in bytes,
+                ignored unless websockets.connect is the legacy client, as it is before websockets 14
+            write_limit (int, optional): The high-water mark of the write buffer in bytes
+
+        Returns:
+            (WSTest): The WSTest instance with_buffer_limits was called on
+        """
+        limits = {"max_queue": max_queue, "max_size": max_size, "read_limit": read_limit, "write_limit": write_limit}
+        self.buffer_limits = {key: value for key, value in limits.items() if value is not None}
+        return self
+
+    def with_correlation(self, message_path: str, response_path: str = None) -> "WSTest":
+        """
+        Pairs replies with the messages that caused them by a correlation id the server echoes back
+        Expected responses with a value at the response path are found by a dictionary lookup on the id of each
+        received frame, rather than by checking every expected response, and the time from sending each message
+        with an id to receiving a frame with the same id is recorded in the stats' round_trip histogram
+
+        Parameters:
+            message_path (str): The path of the id in sent messages, such as "id"
+            response_path (str, optional): The path of the id in received frames, such as "body/requestId",
+                the message path if not given
+
+        Returns:
+            (WSTest): The WSTest instance with_correlation was called on
+        """
+        self.correlation = (message_path, response_path or message_path)
+        return self
+
+    def with_channel_key(self, path: str) -> "WSTest":
+        """
+        Sets the path in received frames of the channel each frame belongs to, routing frames to channels
+
+        Parameters:
+            path (str): The path of the channel, such as "channel" or "body/subscription"
+
+        Returns:
+            (WSTest): The WSTest instance with_channel_key was called on
+        """
+        self.channel_key = path
+        return self
+
+    def with_channel(self, value: object, channel: "WSTest") -> "WSTest":
+        """
+        Adds a logical session carried over this test's connection, such as one subscription of many
+        The channel's messages and requests are sent, and received frames with the value at the channel key path
+        are matched against the channel's expected responses alone, found by a dictionary lookup on the value
+        Only the channel's messages, expected responses and requests are used: its uri, parameters and headers
+        are ignored, and it runs with this test's stats, tracers and timeouts
+
+        Parameters:
+            value (object): The value at the channel key path of frames belonging to the channel
+            channel (WSTest): The messages, expected responses and requests of the channel, holding its results
+
+        Returns:
+            (WSTest): The WSTest instance with_channel was called on
+        """
+        self.channels[value] = channel
+        return self
+
+    def with_max_latency(self, p50: float = None, p90: float = None, p99: float = None,
+                         metric: str = None) -> "WSTest":
+        """
+        Fails the run with a WSPerformanceError if any of the given latency percentiles is higher once it has finished
+        Percentiles are taken from the stats, so they cover every run aggregated into them
+
+        Parameters:
+            p50 (float, optional): The highest median latency in seconds
+            p90 (float, optional): The highest 90th percentile latency in seconds
+            p99 (float, optional): The highest 99th percentile latency in seconds
+            metric (str, optional): The latency histogram of the stats to check, round_trip if with_correlation
+                has already been called and response_latency otherwise
+
+        Returns:
+            (WSTest): The WSTest instance with_max_latency was called on
+        """
+        metric = metric or ("round_trip" if self.correlation else "response_latency")
+        for percentile, limit in (("p50", p50), ("p90", p90), ("p99", p99)):
+            if limit is not None:
+                self.objectives.append({"metric": f"{metric}/{percentile}", "max": limit})
+        return self
+
+    def with_min_throughput(self, frames_per_second: float, direction: str = "received") -> "WSTest":
+        """
+        Fails the run with a WSPerformanceError if fewer frames were sent or received per second once it has finished
+        Frames are counted from the start of the first run aggregated into the stats, not from when they were created
+
+        Parameters:
+            frames_per_second (float): The lowest number of frames per second
+            direction (str): The frames to count, sent or received
+
+        Returns:
+            (WSTest): The WSTest instance with_min_throughput was called on
+        """
+        if direction not in ("sent", "received"):
+            raise ValueError(f"Unknown throughput direction {direction}, expected sent or received")
+        self.objectives.append({"metric": f"frames_{direction}_per_second", "min": frames_per_second})
+        return self
+
+    def with_max_error_rate(self, rate: float) -> "WSTest":
+        """
+        Fails the run with a WSPerformanceError if a higher fraction of the runs aggregated into the stats failed,
+        such as the runs of a soak test, once it has finished
+
+        Parameters:
+            rate (float): The highest fraction of runs to fail, between 0 and 1
+
+        Returns:
+            (WSTest): The WSTest instance with_max_error_rate was called on
+        """
+        self.objectives.append({"metric": "error_rate", "max": rate})
+        return self
+
+    def with_nearest_misses(self, count: int = 3) -> "WSTest":
+        """
+        Keeps the received responses matching the most attributes of each expected response that's still waiting,
+        so a response timeout error can show which attributes matched and which differed
+        Only the closest responses are kept as they arrive, so nothing is rescanned when the test fails
+
+        Parameters:
+            count (int): The number of closest responses to show for each expected response
+
+        Returns:
+            (WSTest): The WSTest instance with_nearest_misses was called on
+        """
+        self.nearest_misses = count
+        return self
+
+    def with_websocket(self, websocket: "WebSocketClientProtocol") -> "WSTest":
+        """
+        Runs the test over a websocket connection that's already open, leaving it open once the run has finished,
+        so tests run one after another can reuse one connection
+        Parameters, headers, compression and buffer limits only apply to connections the test opens itself,
+        and wire bytes and receive queue times are only measured on them
+
+        Parameters:
+            websocket (WebSocketClientProtocol): The open connection to run the test over
+
+        Returns:
+            (WSTest): The WSTest instance with_websocket was called on
+        """
+        self.websocket = websocket
+        return self
+
+    def with_strict_trigger_order(self) -> "WSTest":
+        """
+        Sends triggered messages one at a time, in the order their responses were matched and their triggers were added
+        By default each triggered message is sent independently once its delay has passed since its response matched
+
+        Returns:
+            (WSTest): The WSTest instance with_strict_trigger_order was called on
+        """
+        self.strict_trigger_order = True
+        return self
+
+    def spawn(self, parameters: dict = None, headers: dict = None) -> "WSTest":
+        """
+        Creates a runnable instance of this test, using this test as a template that's never run itself
+        Messages, expected responses, requests and stats are shared with the template, not copied,
+        so only the instance's own containers and results are allocated
+
+        Parameters:
+            parameters (dict, optional): Parameters to add to or override the template's parameters with
+            headers (dict, optional): Headers to add to or override the template's headers with
+
+        Returns:
+            (WSTest): A new WSTest ready to run
+        """
+        # the shallow copy shares every container with the template, so each one is copied or reset below
+        instance = copy.copy(self)
+        instance.parameters = {**self.parameters, **parameters} if parameters else dict(self.parameters)
+        instance.headers = {**self.headers, **headers} if headers else dict(self.headers)
+        instance.tracers = list(self.tracers)
+        instance.feeders = list(self.feeders)
+        instance.buffer_limits = dict(self.buffer_limits)
+        instance.compression = dict(self.compression) if self.compression else self.compression
+        instance.objectives = list(self.objectives)
+
+        # run consumes these lists, so each instance needs its own list of the same objects
+        instance.messages = list(self.messages)
+        instance.expected_responses = list(self.expected_responses)
+        instance.requests = list(self.requests)
+        instance.channels = {value: channel.spawn() for value, channel in self.channels.items()}
+
+        instance.sent_messages = []
+        instance.sent_requests = []
+        instance.received_responses = []
+        instance.received_json = []
+        instance.received_request_responses = []
+        instance.timeline = WSTimeline()
+        instance.row = None
+
+        instance._reset_run_state()  # pylint:disable=protected-access
+        return instance
+
+    def _reset_run_state(self):
+        # the state of a run in progress, which a new test or a spawned instance starts without
+        self._connection = ConnectionState(self)
+        self._last_trigger = None
+        self._arrivals = None
+        self._reset_matching()
+
     async def run(self):
         """
         Runs the integration tests
         Sends any messages to the websocket
         Receives any responses from the websocket
+        In soak mode, loops until the soak duration expires
+        The phases of the run are recorded in timeline
 
         Raises:
-            WSTimeoutError: If the test/sending/receiving fails to finish within the time limit
+            WSTimeoutError: If the test/connecting/sending/receiving fails to finish within the time limit
+            WSPerformanceError: If the run finished but missed any of its performance objectives
         """
+        if self.soak_duration:
+            await self._soak()
+        else:
+            await self._run_once()
+
+        if self.objectives:
+            check_objectives(self.stats, self.objectives)
+
+    # pylint:disable=no-member
+    async def _run_once(self):
         kwargs = {}
-        connection_string = self._get_connection_string()
+        parameters, headers = self.parameters, self.headers
+        if self.feeders:
+            parameters, headers = self._bind_row()
+        connection_string = self._get_connection_string(parameters)
 
         # add ssl if using wss
         if connection_string.startswith("wss://"):
             kwargs["ssl"] = ssl.SSLContext()
 
         # add headers if headers are set
-        if self.headers:
-            kwargs["extra_headers"] = self.headers
+        if headers:
+            kwargs["extra_headers"] = headers
 
-        websocket = await websockets.connect(connection_string, **kwargs)
+        # replace the default compression if it's been configured
+        if self.compression:
+            kwargs.update(self._get_compression_kwargs())
+
+        kwargs.update(self.buffer_limits)
+
+        self.timeline = WSTimeline()
+        self.stats.start()
+
+        # channels share the state of the run on this connection, so each run starts a new one,
+        # opening its recording before connecting so a bad path can't leave the connection open
+        connection = self._connection = ConnectionState(self)
+        connection.open(self.recording_path, bool(self.replay_path))
+        try:
+            websocket = await self._open(connection_string, kwargs)
+        except BaseException:
+            connection.close()
+            raise
+        connection.started = time.monotonic()
+        self.stats.runs += 1
 
         try:
             # Run the receive and send methods async with a timeout
             await asyncio.wait_for(self._runner(websocket), timeout=self.test_timeout)
         except asyncio.TimeoutError as ex:
-            raise WSTimeoutError("Timed out waiting for test to finish") from ex
+            error = WSTimeoutError("Timed out waiting for test to finish")
+            self._timed_out(error)
+            raise error from ex
+        except WSTimeoutError as ex:
+            self._timed_out(ex)
+            raise
         finally:
-            await websocket.close()
-
-    async def _runner(self, websocket: WebSocketClientProtocol):
-        await asyncio.gather(self._receive(websocket), self._send(websocket), self._request())
-
-    async def _receive(self, websocket: WebSocketClientProtocol):
-        # iterate while there are still expected responses that haven't been received yet
-        while self.expected_responses:
+            self.stats.run_duration.record(time.monotonic() - connection.started)
+            self.timeline.mark("finished")
             try:
-                response = await asyncio.wait_for(websocket.recv(), timeout=self.response_timeout)
-                await self._receive_handler(websocket, response)
-            except asyncio.TimeoutError as ex:
-                error_message = self._get_receive_error_message()
-                raise WSTimeoutError(error_message) from ex
-
-    async def _receive_handler(self, websocket: WebSocketClientProtocol, response: str):
-        self.received_json.append(response)
-        parsed_response = json.loads(response)
-
-        for expected_response in self.expected_responses:
-            if expected_response.is_match(parsed_response):
-                self.received_responses.append(expected_response)
-                self.expected_responses.remove(expected_response)
-                await self._trigger_handler(websocket, expected_response, parsed_response)
-                break
-
-    async def _trigger_handler(self, websocket: WebSocketClientProtocol, response: WSResponse, raw_response: dict):
-        for message in response.triggers:
-            message = message.resolve(raw_response)
-            await self._send_handler(websocket, message)
-
-    async def _send(self, websocket: WebSocketClientProtocol):
-        while self.messages:
-            message = self.messages.pop(0)
-            await self._send_handler(websocket, message)
-
-    async def _send_handler(self, websocket: WebSocketClientProtocol, message: WSMessage):
+                if self.websocket is None:
+                    await websocket.close()
+            finally:
+                # a cancelled run can be interrupted while closing, so the connection is counted as closed regardless
+                if self.websocket is None:
+                    self.stats.open_connections -= 1
+                connection.close()
+
+    def _timed_out(self, error: WSTimeoutError):
+        error.timeline = self.timeline
+        self.stats.timeouts += 1
+        if self.tracers:
+            timestamp = time.monotonic()
+            for tracer in self.tracers:
+                tracer.on_timeout(self, timestamp, error)
+
+    async def _soak(self):
+        messages = list(self.messages)
+        expected_responses = list(self.expected_responses)
+        requests = list(self.requests)
+        channels = {
+            channel: (list(channel.messages), list(channel.expected_responses), list(channel.requests))
+            for channel in self.channels.values()
+        }
+
+        flusher = asyncio.ensure_future(self._flush_stats())
+        deadline = time.monotonic() + self.soak_duration
         try:
-            if message.delay:
-                await asyncio.sleep(message.delay)
-            await asyncio.wait_for(websocket.send(str(message)), timeout=self.message_timeout)
-            self.sent_messages.append(message)
-        except asyncio.TimeoutError as ex:
-            error_message = "Timed out trying to send message:\n" + str(message)
-            raise WSTimeoutError(error_message) from ex
-
-    async def _request(self):
-        while self.requests:
-            request = self.requests.pop(0)
-            await self._request_handler(request)
-
-    async def _request_handler(self, request: RestRequest):
+            await asyncio.wait_for(
+                self._soak_loop(messages, expected_responses, requests, deadline, channels), timeout=self.soak_duration
+            )
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            flusher.cancel()
+            self._flush()
+
+    async def _soak_loop(self, messages: list, expected_responses: list, requests: list, deadline: float,
+                         channels: dict = None):
+        from websockets.exceptions import WebSocketException  # pylint:disable=import-outside-toplevel
+
+        # wait_for can lose its cancellation when a run finishes as the soak times out, so check the deadline too
+        while time.monotonic() < deadline:
+            self.messages = list(messages)
+            self.expected_responses = list(expected_responses)
+            self.requests = list(requests)
+            for channel, (channel_messages, channel_responses, channel_requests) in (channels or {}).items():
+                channel.messages = list(channel_messages)
+                channel.expected_responses = list(channel_responses)
+                channel.requests = list(channel_requests)
+            try:
+                await self._run_once()
+            except (WSTimeoutError, WebSocketException, OSError):
+                self.stats.failures += 1
+
+    async def _flush_stats(self):
+        while True:
+            await asyncio.sleep(self.soak_flush_interval)
+            self._flush()
+
+    def _flush(self):
+        snapshot = self.stats.snapshot()
+        if callable(self.soak_sink):
+            self.soak_sink(snapshot)
+        elif self.soak_sink:
+            with open(self.soak_sink, "a", encoding="utf-8") as file:
+                file.write(json.dumps(snapshot) + "\n")
+
+    async def _runner(self, websocket: "WebSocketClientProtocol"):
+        connection = self._connection
+        self._index_responses()
+        self._start_timing()
+        self._last_trigger = None
+        channels = self.channels.values()
+        for channel in channels:
+            channel._join(connection)  # pylint:disable=protected-access
+        connection.runners = asyncio.gather(
+            self._receive(websocket), self._send(websocket), self._request(), self._replay(websocket),
+            *(channel._send(websocket) for channel in channels if channel.messages),  # pylint:disable=protected-access
+            *(channel._request() for channel in channels if channel.requests)  # pylint:disable=protected-access
+        )
         try:
-            if request.delay:
-                await asyncio.sleep(request.delay)
-
-            response = request.send(self.request_timeout)
-
-            self.received_request_responses.append(response)
-            self.sent_requests.append(request)
-
-        except (ConnectTimeout, ReadTimeout) as ex:
-            error_message = "Timed out trying to send request:\n" + str(request)
-            raise WSTimeoutError(error_message) from ex
-
-    def _get_connection_string(self) -> str:
+            await connection.runners
+            # triggers are sent in the background, so wait for any the last responses scheduled
+            while connection.triggers:
+                await asyncio.gather(*connection.triggers)
+        except asyncio.CancelledError:
+            if connection.trigger_error:
+                raise connection.trigger_error from None
+            raise
+        finally:
+            for task in connection.triggers:
+                task.cancel()
+
+    def _join(self, connection: ConnectionState):
+        # channels run on their parent's connection with its settings, sharing its stats and timeline
+        for name in ("stats", "tracers", "keep_history", "message_timeout", "request_timeout", "nearest_misses",
+                     "timeline"):
+            setattr(self, name, getattr(connection.test, name))
+        self._connection = connection
+        self._last_trigger = None
+        self._index_responses()
+        self._start_timing()
+        if self.expected_responses:
+            connection.open_channels.add(self)
+
+    def _bind_row(self) -> tuple:
+        self.row = {}
+        for feeder in self.feeders:
+            self.row.update(feeder.next_row())
+
+        # bind clones, leaving the messages and requests that soak runs and spawned tests start from unbound
+        for test in (self, *self.channels.values()):
+            test.messages = [_bind_message(message, self.row) for message in test.messages]
+            test.requests = [_bind_request(request, self.row) for request in test.requests]
+
+        parameters = {key: bind_placeholders(value, self.row) for key, value in self.parameters.items()}
+        headers = {key: bind_placeholders(value, self.row) for key, value in self.headers.items()}
+        return parameters, headers
+
+    def _get_connection_string(self, parameters: dict = None) -> str:
         # wss://example.com?first=123&second=456
         connection_string = self.uri.strip()
-        if self.parameters:
-            params = "&".join(f"{str(key).strip()}={str(value).strip()}" for key, value in self.parameters.items())
+        parameters = self.parameters if parameters is None else parameters
+        if parameters:
+            params = "&".join(f"{str(key).strip()}={str(value).strip()}" for key, value in parameters.items())
             connection_string += f"?{params}"
         return connection_string
 
     def _get_receive_error_message(self) -> str:
-        error_message = "Timed out waiting for responses:"
-        for response in self.expected_responses:
-            error_message += "\n" + str(response)
+        lines = ["Timed out waiting for responses:"]
+        lines.extend(self._get_expected_lines())
+        open_channels = [
+            (value, channel) for value, channel in self.channels.items() if channel in self._connection.open_channels
+        ]
+        for value, channel in open_channels[:MAX_ERROR_ENTRIES]:
+            lines.append(_truncate(f"Channel {json.dumps(value)}:"))
+            lines.extend(channel._get_expected_lines())  # pylint:disable=protected-access
+        if len(open_channels) > MAX_ERROR_ENTRIES:
+            lines.append(f"...and {len(open_channels) - MAX_ERROR_ENTRIES} more channels")
 
         if self.log_responses_on_error:
-            error_message += "\nReceived responses:"
-            for json_response in self.received_json:
-                error_message += "\n" + str(json_response)
-
-        return error_message
+            lines.append("Received responses:")
+            if len(self.received_json) > MAX_ERROR_ENTRIES:
+                lines.append(f"...{len(self.received_json) - MAX_ERROR_ENTRIES} earlier responses")
+            lines.extend(_truncate(str(json_response)) for json_response in self.received_json[-MAX_ERROR_ENTRIES:])
+
+        return "\n".join(lines)
+
+    def _get_expected_lines(self) -> list:
+        lines = []
+        for response in self.expected_responses[:MAX_ERROR_ENTRIES]:
+            lines.append(_truncate(str(response)))
+            lines.extend(self._get_near_miss_lines(response))
+        if len(self.expected_responses) > MAX_ERROR_ENTRIES:
+            lines.append(f"...and {len(self.expected_responses) - MAX_ERROR_ENTRIES} more")
+        return lines
+
+    def _get_near_miss_lines(self, response: WSResponse) -> list:
+        lines = []
+        for score, _, near_miss in sorted(self._near_misses.get(id(response), []), reverse=True):
+            differences = response.get_differences(near_miss)
+            matched = ", ".join(key for key in response.attributes if key not in differences)
+            differed = ", ".join(
+                f"{key} (received {', '.join(json.dumps(value) for value in values)})" if values else f"{key} (missing)"
+                for key, values in differences.items()
+            )
+            lines.append(f"  Nearest ({score}/{len(response.attributes)}): {_truncate(json.dumps(near_miss))}")
+            lines.append(_truncate(f"    matched: {matched}; differed: {differed}"))
+        return lines
 
     def is_complete(self) -> bool:
         """
@@ -350,4 +928,34 @@ class WSTest:  # noqa: pylint - too-many-instance-attributes
         Returns:
             (bool): Value to indicate whether the test has finished
         """
-        return not self.expected_responses and not self.messages and not self.requests
+        return (
+            not self.expected_responses and not self.messages and not self.requests
+            and all(channel.is_complete() for channel in self.channels.values())
+        )
+
+
+def _bind_message(message: WSMessage, row: dict) -> WSMessage:
+    bound = message.clone()
+    for key, value in message.attributes.items():
+        bound_value = bind_placeholders(value, row)
+        if bound_value != value:
+            bound.with_attribute(key, bound_value)
+    return bound
+
+
+def _bind_request(request: RestRequest, row: dict) -> RestRequest:
+    bound = request.clone()
+    for key, value in request.headers.items():
+        bound_value = bind_placeholders(value, row)
+        if bound_value != value:
+            bound.with_header(key, bound_value)
+    body = bind_placeholders(request.body, row)
+    if body != request.body:
+        bound.with_body(body)
+    return bound
+
+
+def _truncate(entry: str) -> str:
+    if len(entry) <= MAX_ERROR_ENTRY_LENGTH:
+        return entry
+    return entry[:MAX_ERROR_ENTRY_LENGTH] + "..."
@@ -0,0 +1,74 @@
+import time
+
+
+class WSTimeline:  # noqa: pylint - too-many-instance-attributes
+    """
+    A class representing when each phase of a test run happened
+    Offsets are in seconds from the start of the connection attempt, None if the phase didn't happen
+
+    Attributes:
+        started (float)
+        dns (float)
+        tcp_connect (float)
+        connect (float)
+        first_frame (float)
+        last_match (float)
+        finished (float)
+        requests (list)
+
+    Methods:
+        mark(phase: str):
+            Records the current time against a phase
+        to_dict():
+            Returns the timeline as a dictionary
+
+    Usage:
+        try:
+            await ws_test.run()
+        except WSTimeoutError as ex:
+            print(ex.timeline.to_dict())
+
+        print(ws_test.timeline.to_dict())
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.dns = None
+        self.tcp_connect = None
+        self.connect = None
+        self.first_frame = None
+        self.last_match = None
+        self.finished = None
+        self.requests = []
+
+    def mark(self, phase: str) -> float:
+        """
+        Records the offset of the current time from the start of the timeline against a phase
+
+        Parameters:
+            phase (str): The name of the phase attribute
+
+        Returns:
+            (float): The offset in seconds
+        """
+        offset = time.monotonic() - self.started
+        setattr(self, phase, offset)
+        return offset
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): The phase offsets, and the start offset, duration and uri of each rest request
+        """
+        return {
+            "dns": self.dns,
+            "tcp_connect": self.tcp_connect,
+            "connect": self.connect,
+            "first_frame": self.first_frame,
+            "last_match": self.last_match,
+            "finished": self.finished,
+            "requests": [
+                {"start": start, "duration": duration, "uri": uri}
+                for start, duration, uri in self.requests
+            ],
+        }
@@ -1,2 +1,11 @@
 class WSTimeoutError(Exception):
-    """The operation exceeded the given deadline"""
+    """
+    The operation exceeded the given deadline
+
+    Attributes:
+        timeline (WSTimeline): When each phase of the run that timed out happened, if it was recorded
+    """
+
+    def __init__(self, *args, timeline=None):
+        super().__init__(*args)
+        self.timeline = timeline
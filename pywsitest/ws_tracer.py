@@ -0,0 +1,94 @@
+class WSTracer:
+    """
+    A class representing hooks into a WSTest run, to be subclassed by profilers and exporters
+    Every hook does nothing by default, so subclasses only override the hooks they need
+    Timestamps are from time.monotonic and payloads are passed by reference, never copied
+
+    Methods:
+        on_connect(test, timestamp, duration):
+            Called once the websocket has connected
+        on_send(test, timestamp, message, size):
+            Called once a message has been sent
+        on_receive(test, timestamp, response, size):
+            Called when a frame has been received, before it's matched
+        on_match(test, timestamp, response, latency):
+            Called when a received frame matches an expected response
+        on_request_start(test, timestamp, request):
+            Called before a rest request is sent
+        on_request_end(test, timestamp, request, duration, response):
+            Called once a rest request has received a response
+        on_timeout(test, timestamp, error):
+            Called when a run times out
+
+    Usage:
+        class SendCounter(WSTracer):
+            def __init__(self):
+                self.sent = 0
+
+            def on_send(self, test, timestamp, message, size):
+                self.sent += 1
+
+        await WSTest("wss://example.com").with_tracer(SendCounter()).run()
+    """
+
+    def on_connect(self, test, timestamp: float, duration: float):
+        """
+        Parameters:
+            test (WSTest): The test that connected
+            timestamp (float): When the connection opened
+            duration (float): The time taken to connect in seconds
+        """
+
+    def on_send(self, test, timestamp: float, message, size: int):
+        """
+        Parameters:
+            test (WSTest): The test that sent the message
+            timestamp (float): When the message was sent
+            message (WSMessage): The message that was sent
+            size (int): The size of the sent frame in bytes
+        """
+
+    def on_receive(self, test, timestamp: float, response, size: int):
+        """
+        Parameters:
+            test (WSTest): The test that received the frame
+            timestamp (float): When the frame was received
+            response (str or bytes): The received text or binary frame
+            size (int): The size of the received frame in bytes
+        """
+
+    def on_match(self, test, timestamp: float, response, latency: float):
+        """
+        Parameters:
+            test (WSTest): The test that matched the response
+            timestamp (float): When the matching frame was received
+            response (WSResponse): The expected response that was matched
+            latency (float): The time from the message the response answers, its correlated message or the last one
+                sent, or from the response it's timed after, to the match in seconds
+        """
+
+    def on_request_start(self, test, timestamp: float, request):
+        """
+        Parameters:
+            test (WSTest): The test sending the request
+            timestamp (float): When the request was sent
+            request (RestRequest): The request being sent
+        """
+
+    def on_request_end(self, test, timestamp: float, request, duration: float, response):
+        """
+        Parameters:
+            test (WSTest): The test that sent the request
+            timestamp (float): When the response was received
+            request (RestRequest): The request that was sent
+            duration (float): The time taken for the request in seconds
+            response (Response): The response to the request
+        """
+
+    def on_timeout(self, test, timestamp: float, error: Exception):
+        """
+        Parameters:
+            test (WSTest): The test that timed out
+            timestamp (float): When the test timed out
+            error (WSTimeoutError): The error the run is raising
+        """
@@ -26,5 +26,16 @@ setup(name="pywsitest",
           "websockets",
           "requests"
       ],
+      extras_require={
+          "yaml": ["pyyaml"],
+          "uvloop": ["uvloop"]
+      },
+      entry_points={
+          "console_scripts": [
+              "pywsitest = pywsitest.cli:main",
+              "pywsitest-worker = pywsitest.ws_distributed:main"
+          ],
+          "pytest11": ["pywsitest = pywsitest.pytest_plugin"]
+      },
       zip_safe=False,
       python_requires=">=3.7")
@@ -0,0 +1,203 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from pywsitest import LoadOptions, WSPerformanceError, WSServer, WSTest, WSResponse, WSMessage
+from pywsitest.cli import build_test, load_scenarios, main, run, share_options
+from tests.utils import LoopThread
+
+
+SCENARIO = {
+    "uri": "ws://127.0.0.1:8765",
+    "parameters": {"user": "user-${user}"},
+    "headers": {"Authorization": "token"},
+    "messages": [{"attributes": {"type": "ping", "id": "${user}"}, "delay": 0.1}],
+    "responses": [
+        {"attributes": {"type": "pong", "body": None}, "triggers": [{"attributes": {"type": "ack"}}], "timeout": 3.0}
+    ],
+    "requests": [{"uri": "https://example.com", "method": "POST", "headers": {"a": "b"}, "body": {"c": 1}}],
+    "response_timeout": 2.0,
+    "test_timeout": 5.0,
+}
+
+
+class CliTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as scenario_file:
+            scenario_file.write(content)
+        return path
+
+    def test_load_json_scenario(self):
+        path = self.write("scenario.json", json.dumps(SCENARIO))
+
+        self.assertEqual([SCENARIO], load_scenarios(path))
+
+    @unittest.skipUnless(importlib.util.find_spec("yaml"), "needs PyYAML")
+    def test_load_yaml_scenarios(self):
+        path = self.write("scenarios.yaml", "scenarios:\n  - uri: ws://a\n  - uri: ws://b\n")
+
+        self.assertEqual([{"uri": "ws://a"}, {"uri": "ws://b"}], load_scenarios(path))
+
+    def test_load_scenario_without_uri(self):
+        path = self.write("scenario.json", json.dumps([{"messages": []}]))
+
+        with self.assertRaises(ValueError):
+            load_scenarios(path)
+
+    def test_load_scenario_with_unknown_key(self):
+        path = self.write("scenario.json", json.dumps({"uri": "ws://a", "mesages": []}))
+
+        with self.assertRaisesRegex(ValueError, "mesages"):
+            load_scenarios(path)
+
+    def test_build_test(self):
+        ws_test = build_test(SCENARIO, 3)
+
+        self.assertEqual("ws://127.0.0.1:8765", ws_test.uri)
+        self.assertEqual({"user": "user-3"}, ws_test.parameters)
+        self.assertEqual({"Authorization": "token"}, ws_test.headers)
+        self.assertEqual({"type": "ping", "id": "3"}, ws_test.messages[0].attributes)
+        self.assertEqual(0.1, ws_test.messages[0].delay)
+        self.assertEqual({"type": "pong", "body": None}, ws_test.expected_responses[0].attributes)
+        self.assertEqual({"type": "ack"}, ws_test.expected_responses[0].triggers[0].attributes)
+        self.assertEqual(3.0, ws_test.expected_responses[0].timeout)
+        self.assertEqual("post", ws_test.requests[0].method)
+        self.assertEqual({"a": "b"}, ws_test.requests[0].headers)
+        self.assertEqual({"c": 1}, ws_test.requests[0].body)
+        self.assertEqual(2.0, ws_test.response_timeout)
+        self.assertEqual(5.0, ws_test.test_timeout)
+
+    def test_share_options(self):
+        options = LoadOptions(users=10, duration=60.0, rate=5.0, loop="asyncio")
+
+        self.assertEqual(LoadOptions(4, 60.0, 2.0, "asyncio"), share_options(options, 4))
+        self.assertEqual(LoadOptions(4), share_options(LoadOptions(users=10), 4))
+
+    def test_run_against_server(self):
+        loop_thread = LoopThread()
+        server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        )
+        loop_thread.run(server.start())
+        try:
+            scenario = {
+                "uri": server.uri,
+                "messages": [{"attributes": {"type": "ping"}}],
+                "responses": [{"attributes": {"type": "pong"}}],
+                "response_timeout": 2.0,
+            }
+
+            stats = run([scenario], LoadOptions(users=4, rate=100))
+            worker_stats = run([scenario], LoadOptions(users=4), workers=2)
+        finally:
+            loop_thread.run(server.stop())
+            loop_thread.close()
+
+        self.assertEqual(4, stats.runs)
+        self.assertEqual(4, stats.matches)
+        self.assertEqual(0, stats.failures)
+        self.assertEqual(4, worker_stats.runs)
+        self.assertEqual(4, worker_stats.response_latency.count)
+
+    def test_run_checks_template_objectives_once(self):
+        loop_thread = LoopThread()
+        server = WSServer().with_push(WSMessage().with_attribute("type", "hello"), 0.0, count=1)
+        loop_thread.run(server.start())
+        try:
+            template = (
+                WSTest(server.uri)
+                .with_min_throughput(1000000)
+                .with_response(WSResponse().with_attribute("type", "hello"))
+            )
+
+            with self.assertRaises(WSPerformanceError) as context:
+                run([template], LoadOptions(users=3, rate=20))
+        finally:
+            loop_thread.run(server.stop())
+            loop_thread.close()
+
+        self.assertEqual(3, server.connections)
+        self.assertEqual(["frames_received_per_second"], [check["metric"] for check in context.exception.failures])
+        self.assertEqual(1, len(template.objectives))
+
+    def test_main_writes_results(self):
+        path = self.write("scenario.json", json.dumps({"uri": "ws://127.0.0.1:1", "test_timeout": 1.0}))
+        output = os.path.join(self.directory.name, "results.json")
+
+        with redirect_stdout(StringIO()) as stdout:
+            code = main([path, "--users", "2", "--loop", "asyncio", "--output", output])
+
+        with open(output, encoding="utf-8") as results_file:
+            results = json.load(results_file)
+
+        self.assertEqual(1, code)
+        self.assertEqual(2, results["users"])
+        self.assertEqual(2, results["stats"]["failures"])
+        self.assertEqual("asyncio", results["loop"])
+        self.assertIn("failures: 2", stdout.getvalue())
+        self.assertIn("loop: asyncio", stdout.getvalue())
+
+    def test_main_checks_objectives(self):
+        loop_thread = LoopThread()
+        server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        )
+        loop_thread.run(server.start())
+        try:
+            path = self.write("scenario.json", json.dumps({
+                "uri": server.uri,
+                "messages": [{"attributes": {"type": "ping"}}],
+                "responses": [{"attributes": {"type": "pong"}}],
+            }))
+            output = os.path.join(self.directory.name, "results.json")
+
+            with redirect_stdout(StringIO()) as stdout:
+                code = main([path, "--users", "2", "--max-latency", "p99=10", "--min-throughput", "1000000",
+                             "--max-error-rate", "0", "--output", output])
+        finally:
+            loop_thread.run(server.stop())
+            loop_thread.close()
+
+        with open(output, encoding="utf-8") as results_file:
+            results = json.load(results_file)
+
+        self.assertEqual(1, code)
+        self.assertEqual(0, results["stats"]["failures"])
+        self.assertEqual(
+            [("response_latency/p99", True), ("frames_received_per_second", False), ("error_rate", True)],
+            [(check["metric"], check["passed"]) for check in results["objectives"]]
+        )
+        self.assertIn("(min 1000000.0) FAILED", stdout.getvalue())
+
+    def test_main_rejects_unknown_percentile(self):
+        path = self.write("scenario.json", json.dumps({"uri": "ws://127.0.0.1:1"}))
+
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            main([path, "--max-latency", "p95=0.2"])
+
+    def test_main_rejects_missing_file(self):
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            main([os.path.join(self.directory.name, "missing.json")])
+
+    @patch.dict(sys.modules, {"uvloop": None})
+    def test_main_rejects_missing_uvloop(self):
+        path = self.write("scenario.json", json.dumps({"uri": "ws://127.0.0.1:1"}))
+
+        with redirect_stderr(StringIO()) as stderr, self.assertRaises(SystemExit):
+            main([path, "--loop", "uvloop"])
+
+        self.assertIn("pywsitest[uvloop]", stderr.getvalue())
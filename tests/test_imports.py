@@ -0,0 +1,40 @@
+import subprocess  # nosec
+import sys
+import unittest
+
+
+def imported_modules(code: str) -> set:
+    script = f"import sys\n{code}\nprint(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)  # nosec
+    return set(result.stdout.split())
+
+
+class ImportTests(unittest.TestCase):
+
+    def test_import_does_not_load_dependencies(self):
+        modules = imported_modules("from pywsitest import *")
+
+        self.assertIn("pywsitest.ws_test", modules)
+        self.assertNotIn("websockets", modules)
+        self.assertNotIn("requests", modules)
+
+    def test_building_tests_does_not_load_dependencies(self):
+        modules = imported_modules(
+            "from pywsitest import WSTest, WSMessage, WSResponse, RestRequest\n"
+            "WSTest('wss://example.com')"
+            ".with_message(WSMessage().with_attribute('type', 'ping'))"
+            ".with_response(WSResponse().with_attribute('type', 'pong'))"
+            ".with_request(RestRequest('https://example.com', 'GET'))"
+        )
+
+        self.assertNotIn("websockets", modules)
+        self.assertNotIn("requests", modules)
+
+    def test_classes_are_loaded_on_first_use(self):
+        import pywsitest  # pylint:disable=import-outside-toplevel
+        from pywsitest.ws_load import LoadRunner  # pylint:disable=import-outside-toplevel
+
+        self.assertIs(LoadRunner, pywsitest.LoadRunner)
+        self.assertIn("LoadRunner", dir(pywsitest))
+        with self.assertRaises(AttributeError):
+            pywsitest.Missing  # pylint:disable=pointless-statement
@@ -0,0 +1,260 @@
+import asyncio
+import os
+import subprocess  # nosec
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from pywsitest.pytest_plugin import LoopThread
+
+
+SUITE = textwrap.dedent("""
+    import pytest
+
+    from pywsitest import WSServer, WSStats, WSTest, WSTracer, WSMessage, WSResponse
+
+    URI = {}
+    STATS = WSStats()
+    OPEN_CONNECTIONS = []
+
+
+    class OpenConnections(WSTracer):
+        def on_connect(self, test, timestamp, duration):
+            OPEN_CONNECTIONS.append(test.stats.open_connections)
+
+
+    @pytest.fixture(scope="session")
+    def server(ws_run):
+        server = (
+            WSServer()
+            .with_latency(0.5)
+            .with_reply(
+                WSResponse()
+                .with_attribute("type", "ping")
+                .with_trigger(WSMessage().with_attribute("type", "pong"))
+            )
+        )
+        ws_run(server.start())
+        URI["server"] = server.uri
+        yield server
+        ws_run(server.stop())
+
+
+    def ping(uri):
+        return (
+            WSTest(uri)
+            .with_stats(STATS)
+            .with_tracer(OpenConnections())
+            .with_response_timeout(0.2)
+            .with_message(WSMessage().with_attribute("type", "ping"))
+            .with_response(WSResponse().with_attribute("type", "pong"))
+        )
+
+
+    @pytest.mark.wstest
+    def test_with_fixture(server):
+        return ping(server.uri).with_response_timeout(2.0)
+
+
+    @pytest.mark.wstest
+    def test_ping_1():
+        return ping(URI["server"]).with_response_timeout(2.0)
+
+
+    @pytest.mark.wstest
+    def test_ping_2():
+        return ping(URI["server"]).with_response_timeout(2.0)
+
+
+    @pytest.mark.wstest
+    async def test_ping_3():
+        return ping(URI["server"]).with_response_timeout(2.0)
+
+
+    @pytest.mark.wstest
+    def test_ping_4():
+        return ping(URI["server"]).with_response_timeout(2.0)
+
+
+    @pytest.mark.wstest
+    def test_times_out():
+        return ping(URI["server"])
+
+
+    def test_unmarked(ws_loop):
+        assert ws_loop.is_running()
+
+
+    def test_marked_tests_overlapped():
+        # each round trip takes half a second, so tests run in turn would only ever have one connection open
+        assert len(OPEN_CONNECTIONS) == 6
+        assert max(OPEN_CONNECTIONS) > 1
+""")
+
+
+SELECTION_SUITE = textwrap.dedent("""
+    import os
+
+    import pytest
+
+    from pywsitest import WSTest
+
+    READY = {"usefixtures": False, "autouse": False}
+
+
+    class Recorded(WSTest):
+        async def run(self):
+            with open(os.environ["WS_RAN"], "a", encoding="utf-8") as ran:
+                ran.write(self.uri + "\\n")
+
+        def is_complete(self):
+            return True
+
+
+    @pytest.fixture
+    def ready():
+        READY["usefixtures"] = True
+        yield
+        READY["usefixtures"] = False
+
+
+    @pytest.mark.wstest
+    def test_first():
+        return Recorded("first")
+
+
+    @pytest.mark.wstest
+    def test_deselected():
+        return Recorded("deselected")
+
+
+    @pytest.mark.wstest
+    @pytest.mark.usefixtures("ready")
+    def test_usefixtures():
+        assert READY["usefixtures"]
+        return Recorded("usefixtures")
+
+
+    @pytest.mark.wstest
+    @pytest.mark.skip(reason="skipped")
+    def test_skip():
+        return Recorded("skip")
+
+
+    @pytest.mark.wstest
+    @pytest.mark.skipif(True, reason="skipped")
+    def test_skipif():
+        return Recorded("skipif")
+
+
+    @pytest.mark.wstest
+    @pytest.mark.xfail(run=False, reason="not run")
+    def test_xfail_not_run():
+        return Recorded("xfail")
+
+
+    class TestAutouse:
+        @pytest.fixture(autouse=True)
+        def ready(self):
+            READY["autouse"] = True
+            yield
+            READY["autouse"] = False
+
+        @pytest.mark.wstest
+        def test_autouse(self):
+            assert READY["autouse"]
+            return Recorded("autouse")
+""")
+
+
+REUSE_SUITE = textwrap.dedent("""
+    import pytest
+
+    from pywsitest import WSServer, WSTest, WSMessage, WSResponse
+
+    WEBSOCKETS = []
+
+
+    @pytest.fixture(scope="session")
+    def server(ws_run):
+        server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        )
+        ws_run(server.start())
+        yield server
+        ws_run(server.stop())
+
+
+    @pytest.mark.wstest
+    @pytest.mark.parametrize("run", range(2))
+    async def test_reuse(server, ws_connection, run):
+        WEBSOCKETS.append(await ws_connection(server.uri))
+        return (
+            WSTest(server.uri)
+            .with_websocket(WEBSOCKETS[-1])
+            .with_message(WSMessage().with_attribute("type", "ping"))
+            .with_response(WSResponse().with_attribute("type", "pong"))
+        )
+
+
+    def test_one_connection(server):
+        assert WEBSOCKETS[0] is WEBSOCKETS[1]
+        assert server.connections == 1
+""")
+
+
+def run_suite(directory: str, suite: str, *args: str, env: dict = None) -> subprocess.CompletedProcess:
+    path = os.path.join(directory, "test_suite.py")
+    with open(path, "w", encoding="utf-8") as suite_file:
+        suite_file.write(suite)
+
+    return subprocess.run(  # nosec
+        [sys.executable, "-m", "pytest", "-q", "-p", "pywsitest.pytest_plugin", "-p", "no:cacheprovider", *args, path],
+        capture_output=True, text=True, check=False, cwd=directory,
+        env={**os.environ, "PYTHONPATH": os.getcwd(), **(env or {})}
+    )
+
+
+class PytestPluginTests(unittest.TestCase):
+
+    def test_loop_thread_runs_coroutines(self):
+        loop_thread = LoopThread()
+
+        async def add(first, second):
+            await asyncio.sleep(0)
+            return first + second
+
+        try:
+            self.assertTrue(loop_thread.loop.is_running())
+            self.assertEqual(3, loop_thread.run(add(1, 2)))
+            self.assertEqual(7, loop_thread.submit(add(3, 4)).result())
+        finally:
+            loop_thread.close()
+
+        self.assertTrue(loop_thread.loop.is_closed())
+
+    def test_marked_tests_run_concurrently_and_report_separately(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = run_suite(directory, SUITE)
+
+        # test_marked_tests_overlapped checks the tests without fixtures had their connections open at once
+        self.assertIn("1 failed, 7 passed", result.stdout)
+        self.assertIn("test_times_out", result.stdout)
+        self.assertIn("WSTimeoutError", result.stdout)
+
+    def test_deselected_skipped_and_fixture_tests_are_not_started_early(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ran = os.path.join(directory, "ran.txt")
+            result = run_suite(directory, SELECTION_SUITE, "-k", "not deselected", env={"WS_RAN": ran})
+            with open(ran, encoding="utf-8") as ran_file:
+                names = ran_file.read().split()
+
+        self.assertIn("3 passed, 2 skipped, 1 deselected, 1 xfailed", result.stdout)
+        self.assertEqual(["first", "usefixtures", "autouse"], names)
+
+    def test_tests_in_turn_reuse_a_connection(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = run_suite(directory, REUSE_SUITE)
+
+        self.assertIn("3 passed", result.stdout)
@@ -65,3 +65,23 @@ class RestRequestTests(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"abc": 123})
+
+    def test_rest_request_has_no_instance_dict(self):
+        self.assertFalse(hasattr(RestRequest("https://example.com", "GET"), "__dict__"))
+
+    def test_clone_copies_headers_on_write(self):
+        rest_request = (
+            RestRequest("https://example.com", "POST")
+            .with_header("Authorization", "token")
+            .with_body({"abc": 123})
+            .with_delay(1.0)
+        )
+
+        clone = rest_request.clone().with_header("Accept", "application/json")
+
+        self.assertEqual("https://example.com", clone.uri)
+        self.assertEqual("post", clone.method)
+        self.assertEqual(1.0, clone.delay)
+        self.assertIs(rest_request.body, clone.body)
+        self.assertEqual({"Authorization": "token"}, rest_request.headers)
+        self.assertEqual({"Authorization": "token", "Accept": "application/json"}, clone.headers)
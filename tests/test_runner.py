@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from pywsitest import runner
+
+
+class RunnerTests(unittest.TestCase):
+
+    def test_run_returns_result_and_closes_loop(self):
+        loops = []
+
+        async def add(first, second):
+            loops.append(asyncio.get_running_loop())
+            await asyncio.sleep(0)
+            return first + second
+
+        self.assertEqual(3, runner.run(add(1, 2), loop="asyncio"))
+        self.assertTrue(loops[0].is_closed())
+
+    def test_run_cancels_remaining_tasks(self):
+        cancelled = []
+
+        async def forever():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def start():
+            asyncio.ensure_future(forever())
+            await asyncio.sleep(0)
+
+        runner.run(start(), loop="asyncio")
+
+        self.assertEqual([True], cancelled)
+
+    def test_unknown_loop(self):
+        with self.assertRaises(ValueError):
+            runner.loop_name("trio")
+
+    @patch.dict(sys.modules, {"uvloop": None})
+    def test_auto_falls_back_to_asyncio(self):
+        self.assertEqual("asyncio", runner.loop_name("auto"))
+        event_loop = runner.new_event_loop("auto")
+        self.addCleanup(event_loop.close)
+        self.assertIsInstance(event_loop, asyncio.BaseEventLoop)
+
+    @patch.dict(sys.modules, {"uvloop": None})
+    def test_uvloop_not_installed(self):
+        coroutine = MagicMock()
+
+        with self.assertRaisesRegex(ValueError, "pywsitest\\[uvloop\\]"):
+            runner.run(coroutine, loop="uvloop")
+
+        coroutine.close.assert_called_once_with()
+
+    def test_auto_uses_uvloop_when_installed(self):
+        uvloop = SimpleNamespace(new_event_loop=MagicMock(side_effect=asyncio.new_event_loop))
+
+        async def answer():
+            return 42
+
+        with patch.dict(sys.modules, {"uvloop": uvloop}):
+            self.assertEqual("uvloop", runner.loop_name("auto"))
+            self.assertEqual(42, runner.run(answer()))
+
+        uvloop.new_event_loop.assert_called_once_with()
+
+    def test_asyncio_ignores_uvloop(self):
+        with patch.dict(sys.modules, {"uvloop": SimpleNamespace()}):
+            self.assertEqual("asyncio", runner.loop_name("asyncio"))
@@ -0,0 +1,41 @@
+import asyncio
+import unittest
+
+from pywsitest import WSTest, WSResponse
+from pywsitest.ws_connection import ConnectionState
+from tests.utils import syncify
+
+
+class ConnectionStateTests(unittest.TestCase):
+
+    def test_matched_closes_finished_channels(self):
+        response = WSResponse().with_attribute("type", "pong")
+        channel = WSTest("channel").with_response(response)
+        ws_tester = WSTest("ws://127.0.0.1").with_channel("prices", channel)
+        connection = ConnectionState(ws_tester)
+        connection.open_channels.add(channel)
+
+        self.assertTrue(connection.is_waiting())
+        self.assertEqual([ws_tester, channel], connection.waiting_tests())
+
+        channel.expected_responses.remove(response)
+        connection.matched(channel, response)
+
+        self.assertFalse(connection.is_waiting())
+        self.assertEqual([ws_tester], connection.waiting_tests())
+
+    @syncify
+    async def test_failed_trigger_stops_the_run(self):
+        connection = ConnectionState(WSTest("ws://127.0.0.1"))
+        connection.runners = asyncio.ensure_future(asyncio.sleep(10))
+
+        async def fail():
+            raise ValueError("bad trigger")
+
+        with self.assertRaises(ValueError):
+            await connection.schedule_trigger(fail())
+        with self.assertRaises(asyncio.CancelledError):
+            await connection.runners
+
+        self.assertIsInstance(connection.trigger_error, ValueError)
+        self.assertFalse(connection.triggers)
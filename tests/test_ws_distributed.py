@@ -0,0 +1,180 @@
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from pywsitest import WSServer, WSResponse, WSMessage, WSTest, LoadCoordinator, LoadOptions, LoadWorker
+from pywsitest.cli import main as cli_main
+from pywsitest.ws_distributed import main, parse_address
+from tests.utils import LoopThread
+
+
+AUTHKEY = b"test-key"
+
+
+def _run_worker(address, authkey=AUTHKEY):
+    LoadWorker(address, authkey).run()
+
+
+def _disconnect_worker(address):
+    # connects and takes a job, then leaves without running it
+    with multiprocessing.connection.Client(address, authkey=AUTHKEY) as connection:
+        connection.recv()
+
+
+def _stuck_worker(address):
+    # takes a job, then never reports back, leaving once the coordinator hangs up
+    with multiprocessing.connection.Client(address, authkey=AUTHKEY) as connection:
+        connection.recv()
+        try:
+            connection.recv()
+        except EOFError:
+            pass
+
+
+def _start_workers(address, count, target=_run_worker):
+    # forking would copy the running server's loop thread, so workers start in a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=target, args=(address,)) for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+class WSDistributedTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loop_thread = LoopThread()
+        cls.server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        )
+        cls.loop_thread.run(cls.server.start())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop_thread.run(cls.server.stop())
+        cls.loop_thread.close()
+
+    def setUp(self):
+        self.workers = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.join(10)
+
+    def scenario(self) -> dict:
+        return {
+            "uri": self.server.uri,
+            "messages": [{"attributes": {"type": "ping", "user": "${user}"}}],
+            "responses": [{"attributes": {"type": "pong"}}],
+            "response_timeout": 2.0,
+        }
+
+    def test_parse_address(self):
+        self.assertEqual(("0.0.0.0", 7777), parse_address("0.0.0.0:7777"))
+        self.assertEqual(("::1", 7777), parse_address("::1:7777"))
+        self.assertEqual("/tmp/pywsitest.sock", parse_address("/tmp/pywsitest.sock"))
+
+    def test_run_templates_on_workers(self):
+        template = (
+            WSTest(self.server.uri)
+            .with_message(WSMessage().with_attribute("type", "ping"))
+            .with_response(WSResponse().with_attribute("type", "pong"))
+            .with_response_timeout(2.0)
+        )
+        updates = []
+
+        with LoadCoordinator(authkey=AUTHKEY, interval=0.05) as coordinator:
+            self.workers += _start_workers(coordinator.address, 3)
+            stats = coordinator.run([template], workers=3, options=LoadOptions(users=7), on_stats=updates.append)
+
+        self.assertEqual(7, stats.runs)
+        self.assertEqual(7, stats.matches)
+        self.assertEqual(0, stats.failures)
+        self.assertEqual(7, stats.response_latency.count)
+        self.assertIs(stats, coordinator.stats)
+        self.assertGreaterEqual(len(updates), 3)
+        self.assertIs(stats, updates[-1])
+
+    def test_run_scenarios_for_duration_over_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with LoadCoordinator(os.path.join(directory, "coordinator.sock"), AUTHKEY) as coordinator:
+                self.workers += _start_workers(coordinator.address, 2)
+                stats = coordinator.run([self.scenario()], 2, LoadOptions(users=4, duration=0.5, rate=20))
+
+        # a run still going when the duration ends is counted but cut short
+        self.assertGreater(stats.matches, 4)
+        self.assertLessEqual(stats.runs - stats.matches, 4)
+        self.assertEqual(0, stats.failures)
+
+    def test_worker_disconnects(self):
+        with LoadCoordinator(authkey=AUTHKEY) as coordinator:
+            self.workers += _start_workers(coordinator.address, 1, _disconnect_worker)
+            self.workers += _start_workers(coordinator.address, 1)
+
+            with self.assertRaises(ConnectionError):
+                coordinator.run([self.scenario()], 2, LoadOptions(users=2, duration=1.0))
+
+    def test_workers_not_connecting_time_out(self):
+        with LoadCoordinator(authkey=AUTHKEY) as coordinator:
+            started = time.monotonic()
+
+            with self.assertRaisesRegex(TimeoutError, "Only 0 of 2 workers"):
+                coordinator.run([self.scenario()], 2, LoadOptions(users=2), timeout=0.2)
+
+        self.assertLess(time.monotonic() - started, 5.0)
+
+    def test_stuck_workers_time_out(self):
+        with LoadCoordinator(authkey=AUTHKEY) as coordinator:
+            self.workers += _start_workers(coordinator.address, 1, _stuck_worker)
+            self.workers += _start_workers(coordinator.address, 1)
+
+            with self.assertRaisesRegex(TimeoutError, "1 of 2 workers were still running"):
+                coordinator.run([self.scenario()], 2, LoadOptions(users=2, duration=0.2), timeout=2.0)
+
+    def test_cli_runs_on_remote_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            address = os.path.join(directory, "coordinator.sock")
+            path = os.path.join(directory, "scenario.json")
+            with open(path, "w", encoding="utf-8") as scenario_file:
+                json.dump(self.scenario(), scenario_file)
+
+            with patch.dict(os.environ, {"PYWSITEST_AUTHKEY": AUTHKEY.decode()}):
+                worker = multiprocessing.get_context("spawn").Process(target=_run_worker_command, args=(address,))
+                with redirect_stdout(StringIO()) as stdout, redirect_stderr(StringIO()):
+                    worker.start()
+                    self.workers.append(worker)
+                    code = cli_main([path, "--users", "3", "--remote-workers", "1", "--listen", address])
+
+        self.assertEqual(0, code)
+        self.assertIn("runs: 3", stdout.getvalue())
+
+    def test_cli_needs_authkey(self):
+        with patch.dict(os.environ, clear=True), redirect_stderr(StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                cli_main(["scenario.json", "--remote-workers", "2"])
+
+        self.assertIn("PYWSITEST_AUTHKEY", stderr.getvalue())
+
+    def test_worker_needs_authkey(self):
+        with patch.dict(os.environ, clear=True), redirect_stderr(StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                main(["127.0.0.1:7777"])
+
+        self.assertIn("PYWSITEST_AUTHKEY", stderr.getvalue())
+
+
+def _run_worker_command(address):
+    # the coordinator may not be listening yet when the process starts
+    for _ in range(100):
+        if os.path.exists(address):
+            break
+        time.sleep(0.05)
+    main([address])
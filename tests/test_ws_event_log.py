@@ -0,0 +1,141 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from pywsitest import EventLogWriter, WSServer, WSTest, WSResponse, WSMessage, WSTimeoutError
+from tests.utils import syncify
+
+
+class EventLogWriterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def read_jsonl(self, path: str) -> list:
+        with open(path, encoding="utf-8") as log_file:
+            return [json.loads(line) for line in log_file]
+
+    @syncify
+    async def test_write_jsonl(self):
+        server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        )
+        started = time.time()
+
+        async with server:
+            with EventLogWriter(self.path("events.jsonl")) as event_log:
+                for _ in range(2):
+                    await (
+                        WSTest(server.uri)
+                        .with_message(WSMessage().with_attribute("type", "ping"))
+                        .with_response(WSResponse().with_attribute("type", "pong"))
+                        .with_tracer(event_log)
+                        .run()
+                    )
+
+        events = self.read_jsonl(self.path("events.jsonl"))
+
+        self.assertEqual(8, event_log.events_written)
+        self.assertEqual(["connect", "send", "receive", "match"] * 2, [event["event"] for event in events])
+        self.assertEqual([0] * 4 + [1] * 4, [event["connection"] for event in events])
+        self.assertEqual(["", "sent", "received", "received"], [event["direction"] for event in events[:4]])
+        self.assertEqual(len('{"type": "ping"}'), events[1]["size"])
+        self.assertEqual('{"type": "pong"}', events[3]["expectation"])
+        self.assertGreater(events[3]["latency"], 0)
+        self.assertIsNone(events[1]["latency"])
+        for event in events:
+            self.assertAlmostEqual(started, event["timestamp"], delta=10)
+
+    @syncify
+    async def test_write_csv_timeout(self):
+        async with WSServer() as server:
+            with EventLogWriter(self.path("events.csv")) as event_log:
+                with self.assertRaises(WSTimeoutError):
+                    await (
+                        WSTest(server.uri)
+                        .with_response(WSResponse().with_attribute("type", "pong"))
+                        .with_response_timeout(0.1)
+                        .with_tracer(event_log)
+                        .run()
+                    )
+
+        with open(self.path("events.csv"), encoding="utf-8", newline="") as log_file:
+            rows = list(csv.DictReader(log_file))
+
+        self.assertEqual(["connect", "timeout"], [row["event"] for row in rows])
+        self.assertEqual("", rows[1]["size"])
+        self.assertIn("pong", rows[1]["expectation"])
+
+    def test_batches_are_written_in_the_background(self):
+        event_log = EventLogWriter(self.path("events.jsonl"), batch_size=3, flush_interval=60)
+        test = WSTest("ws://127.0.0.1")
+        try:
+            for size in range(3):
+                event_log.on_send(test, time.monotonic(), None, size)
+
+            deadline = time.monotonic() + 5
+            while event_log.events_written < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            event_log.on_send(test, time.monotonic(), None, 3)
+            self.assertEqual(3, event_log.events_written)
+            event_log.flush()
+            self.assertEqual(4, event_log.events_written)
+        finally:
+            event_log.close()
+
+        self.assertEqual([0, 1, 2, 3], [event["size"] for event in self.read_jsonl(self.path("events.jsonl"))])
+
+    def test_each_connection_gets_a_number_shared_with_its_channels(self):
+        channel = WSTest("channel")
+        test = WSTest("ws://127.0.0.1").with_channel("prices", channel)
+        with EventLogWriter(self.path("events.jsonl")) as event_log:
+            for _ in range(2):
+                event_log.on_connect(test, time.monotonic(), 0.01)
+                event_log.on_send(test, time.monotonic(), None, 1)
+                event_log.on_receive(channel, time.monotonic(), "{}", 2)
+
+        events = self.read_jsonl(self.path("events.jsonl"))
+
+        self.assertEqual([0, 0, 0, 1, 1, 1], [event["connection"] for event in events])
+
+    def test_oldest_events_are_dropped_once_the_queue_is_full(self):
+        event_log = EventLogWriter(self.path("events.jsonl"), flush_interval=60, max_queued=2)
+        test = WSTest("ws://127.0.0.1")
+        try:
+            for size in range(5):
+                event_log.on_send(test, time.monotonic(), None, size)
+
+            self.assertEqual(3, event_log.events_dropped)
+            event_log.flush()
+            self.assertEqual(2, event_log.events_written)
+        finally:
+            event_log.close()
+
+        self.assertEqual([3, 4], [event["size"] for event in self.read_jsonl(self.path("events.jsonl"))])
+
+    def test_appends_to_csv_with_one_header(self):
+        for _ in range(2):
+            with EventLogWriter(self.path("events.csv")) as event_log:
+                event_log.on_connect(WSTest("ws://127.0.0.1"), time.monotonic(), 0.01)
+
+        with open(self.path("events.csv"), encoding="utf-8", newline="") as log_file:
+            lines = log_file.read().splitlines()
+
+        self.assertEqual(3, len(lines))
+        self.assertEqual("timestamp,connection,event,direction,size,expectation,latency", lines[0])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            EventLogWriter(self.path("events.parquet"), format="parquet")
+
+        self.assertFalse(os.path.exists(self.path("events.parquet")))
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from pywsitest import DataFeeder
+
+
+class DataFeederTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint:disable=consider-using-with
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as data_file:
+            data_file.write(content)
+        return path
+
+    def test_circular_csv(self):
+        path = self.write("users.csv", "token,device\nabc,1\n\n\"d,e\",2\n")
+
+        with DataFeeder(path) as feeder:
+            rows = [feeder.next_row() for _ in range(3)]
+
+        self.assertEqual([
+            {"token": "abc", "device": "1"},
+            {"token": "d,e", "device": "2"},
+            {"token": "abc", "device": "1"},
+        ], rows)
+
+    def test_unique_json_lines(self):
+        path = self.write("users.jsonl", "{\"token\": \"abc\", \"device\": 1}\n{\"token\": \"def\", \"device\": 2}")
+
+        with DataFeeder(path, strategy="unique") as feeder:
+            first = feeder.next_row()
+            second = feeder.next_row()
+
+            with self.assertRaises(LookupError):
+                feeder.next_row()
+
+        self.assertEqual({"token": "abc", "device": 1}, first)
+        self.assertEqual({"token": "def", "device": 2}, second)
+
+    def test_random_rows(self):
+        path = self.write("users.csv", "user\n" + "\n".join(str(user) for user in range(10)) + "\n\n")
+
+        with DataFeeder(path, strategy="random", seed=1) as feeder:
+            rows = [feeder.next_row()["user"] for _ in range(200)]
+            self.assertEqual(10, len(feeder._offsets))  # pylint:disable=protected-access
+
+        with DataFeeder(path, strategy="random", seed=1) as feeder:
+            repeated = [feeder.next_row()["user"] for _ in range(200)]
+
+        self.assertEqual({str(user) for user in range(10)}, set(rows))
+        self.assertEqual(rows, repeated)
+
+    def test_empty_file(self):
+        path = self.write("users.csv", "user\n")
+
+        for strategy in DataFeeder.STRATEGIES:
+            with DataFeeder(path, strategy=strategy) as feeder, self.assertRaises(LookupError):
+                feeder.next_row()
+
+    def test_unknown_strategy(self):
+        path = self.write("users.csv", "user\n1\n")
+
+        with self.assertRaises(ValueError):
+            DataFeeder(path, strategy="shuffled")
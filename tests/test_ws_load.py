@@ -0,0 +1,151 @@
+import asyncio
+import time
+import unittest
+
+from pywsitest import LoadProfile, LoadRunner, WSPerformanceError, WSServer, WSTest, WSResponse, WSMessage
+from pywsitest.ws_load import LoadPhase
+from tests.utils import syncify
+
+
+class LoadProfileTests(unittest.TestCase):
+
+    def test_create_load_profile(self):
+        profile = LoadProfile()
+
+        self.assertEqual([], profile.phases)
+        self.assertEqual(0, profile.target)
+
+    def test_phases(self):
+        profile = (
+            LoadProfile()
+            .with_ramp(10, rate=5)
+            .with_hold(30)
+            .with_step(20, 15, name="step")
+            .with_spike(50, 5, name="peak")
+            .with_spike(40, 5)
+        )
+
+        self.assertEqual([
+            LoadPhase("ramp-1", 10, 5, 0.0),
+            LoadPhase("hold-2", 10, None, 30),
+            LoadPhase("step", 20, None, 15),
+            LoadPhase("peak", 50, None, 5),
+            LoadPhase("peak-end", 20, None, 0.0),
+            LoadPhase("spike-6", 40, None, 5),
+            LoadPhase("spike-end-7", 20, None, 0.0),
+        ], profile.phases)
+        self.assertEqual(20, profile.target)
+
+
+class LoadRunnerTests(unittest.TestCase):
+
+    @syncify
+    async def test_run_profile(self):
+        server = WSServer().with_push(WSMessage().with_attribute("type", "hello"), 0.0, count=1)
+
+        users = set()
+
+        def scenario(user: int) -> WSTest:
+            users.add(user)
+            return (
+                WSTest(server.uri)
+                .with_parameter("user", user)
+                .with_response(WSResponse().with_attribute("type", "hello"))
+            )
+
+        profile = (
+            LoadProfile()
+            .with_ramp(4, rate=40)
+            .with_hold(0.1)
+            .with_spike(6, 0.1)
+            .with_ramp(0, rate=100)
+        )
+        runner = LoadRunner(scenario, profile)
+
+        async with server:
+            started = time.monotonic()
+            await runner.run()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(6, runner.users_started)
+        self.assertGreaterEqual(elapsed, 0.075 + 0.1 + 0.1 + 0.03)
+        self.assertEqual(0, runner.stats.failures)
+        self.assertGreater(runner.stats.runs, 6)
+        self.assertEqual(0, runner.stats.open_connections)
+
+        summary = runner.summary()
+        self.assertEqual(["ramp-1", "hold-2", "spike-3", "spike-end-4", "ramp-5"], list(summary))
+        self.assertGreater(summary["ramp-1"]["connect_duration"]["count"], 0)
+        self.assertGreater(summary["spike-3"]["connect_duration"]["count"], 0)
+        self.assertEqual(0, summary["hold-2"]["failures"])
+        self.assertEqual(set(range(6)), users)
+
+    @syncify
+    async def test_failures_are_counted_per_phase(self):
+        async with WSServer() as server:
+            uri = server.uri
+
+        runner = LoadRunner(lambda user: WSTest(uri), LoadProfile().with_step(2, 0.05, name="down"))
+
+        await runner.run()
+
+        self.assertGreater(runner.failures["down"], 1)
+        self.assertEqual(runner.failures["down"], runner.stats.failures)
+        self.assertEqual(0, runner.summary()["down"]["connect_duration"]["count"])
+
+    @syncify
+    async def test_objectives_are_checked_once_the_profile_ends(self):
+        server = WSServer().with_push(WSMessage().with_attribute("type", "hello"), 0.0, count=1)
+
+        def scenario(user: int) -> WSTest:
+            return (
+                WSTest(server.uri)
+                .with_min_throughput(1000000)
+                .with_max_error_rate(0.0)
+                .with_response(WSResponse().with_attribute("type", "hello"))
+            )
+
+        runner = LoadRunner(scenario, LoadProfile().with_step(2, 0.2, name="slow"))
+
+        async with server:
+            with self.assertRaises(WSPerformanceError) as context:
+                await runner.run()
+
+        self.assertGreater(runner.stats.runs, 2)
+        self.assertEqual(0, runner.stats.failures)
+        self.assertEqual([], runner.errors)
+        self.assertEqual(["frames_received_per_second", "error_rate"], [check["metric"] for check in runner.objectives])
+        self.assertEqual(["frames_received_per_second"], [check["metric"] for check in context.exception.failures])
+
+    @syncify
+    async def test_unexpected_errors_are_counted(self):
+        def factory(user):
+            raise LookupError(f"no row for user {user}")
+
+        runner = LoadRunner(factory, LoadProfile().with_step(2, 0.05, name="broken"))
+
+        await runner.run()
+
+        self.assertEqual(2, runner.failures["broken"])
+        self.assertEqual(2, runner.stats.failures)
+        self.assertEqual([LookupError] * 2, [type(error) for error in runner.errors])
+
+    @syncify
+    async def test_closed_users_stop_when_a_cancellation_is_lost(self):
+        runs = []
+
+        class LosesCancellation(WSTest):
+            async def run(self):
+                runs.append(self)
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    # what wait_for does when a run finishes as it's cancelled
+                    pass
+
+        runner = LoadRunner(lambda user: LosesCancellation("ws://127.0.0.1"), LoadProfile().with_step(3, 0.05))
+
+        await asyncio.wait_for(runner.run(), 5)
+
+        self.assertEqual(3, len(runs))
+        self.assertEqual([], runner.errors)
@@ -82,3 +82,33 @@ class WSMessageTests(unittest.TestCase):
         ws_message = ws_message.resolve(response)
 
         self.assertEqual(expected_value, str(ws_message))
+
+    def test_ws_message_has_no_instance_dict(self):
+        self.assertFalse(hasattr(WSMessage(), "__dict__"))
+
+    def test_clone_shares_attributes(self):
+        ws_message = WSMessage().with_attribute("type", "ping").with_delay(0.5)
+
+        clone = ws_message.clone()
+
+        self.assertIs(ws_message.attributes, clone.attributes)
+        self.assertEqual(0.5, clone.delay)
+
+    def test_clone_copies_attributes_on_write(self):
+        ws_message = WSMessage().with_attribute("type", "ping")
+
+        clone = ws_message.clone().with_attribute("id", 1)
+        ws_message.with_attribute("other", 2)
+
+        self.assertEqual({"type": "ping", "other": 2}, ws_message.attributes)
+        self.assertEqual({"type": "ping", "id": 1}, clone.attributes)
+
+    def test_resolve_clone_leaves_original_unresolved(self):
+        ws_message = WSMessage().with_attribute("id", "${body/id}").with_attribute("type", "ack")
+
+        resolved = ws_message.clone().resolve({"body": {"id": 1}})
+        unresolved = ws_message.clone().resolve({})
+
+        self.assertEqual({"id": 1, "type": "ack"}, resolved.attributes)
+        self.assertEqual({"id": "${body/id}", "type": "ack"}, ws_message.attributes)
+        self.assertIs(ws_message.attributes, unresolved.attributes)
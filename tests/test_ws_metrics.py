@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from pywsitest import MetricsExporter, WSStats
+from pywsitest.ws_metrics import to_openmetrics, CONTENT_TYPE
+
+
+class WSMetricsTests(unittest.TestCase):
+
+    def test_to_openmetrics(self):
+        stats = WSStats()
+        stats.open_connections = 2
+        stats.max_queue_depth = 7
+        stats.frames_sent = 5
+        stats.request_latency.record(0.001)
+        stats.request_latency.record(0.003)
+
+        lines = to_openmetrics(stats).splitlines()
+
+        self.assertIn("# TYPE pywsitest_open_connections gauge", lines)
+        self.assertIn("pywsitest_open_connections 2", lines)
+        self.assertIn("# TYPE pywsitest_max_queue_depth gauge", lines)
+        self.assertIn("pywsitest_max_queue_depth 7", lines)
+        self.assertIn("pywsitest_queue_time_seconds_count 0", lines)
+        self.assertIn("# TYPE pywsitest_frames_sent counter", lines)
+        self.assertIn("pywsitest_frames_sent_total 5", lines)
+        self.assertIn("pywsitest_frames_received_total 0", lines)
+        self.assertIn("# TYPE pywsitest_request_latency_seconds histogram", lines)
+        self.assertIn("pywsitest_request_latency_seconds_bucket{le=\"0.001024\"} 1", lines)
+        self.assertIn("pywsitest_request_latency_seconds_bucket{le=\"0.004096\"} 2", lines)
+        self.assertIn("pywsitest_request_latency_seconds_bucket{le=\"+Inf\"} 2", lines)
+        self.assertIn("pywsitest_request_latency_seconds_count 2", lines)
+        self.assertIn("pywsitest_run_duration_seconds_count 0", lines)
+        self.assertEqual("# EOF", lines[-1])
+
+    def test_to_openmetrics_with_prefix(self):
+        self.assertIn("load_frames_sent_total 0", to_openmetrics(WSStats(), prefix="load").splitlines())
+
+    def test_serve(self):
+        stats = WSStats()
+        stats.matches = 3
+        exporter = MetricsExporter(stats).serve()
+
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as response:  # nosec
+                content_type = response.headers["Content-Type"]
+                body = response.read().decode("utf-8")
+        finally:
+            exporter.stop()
+
+        self.assertEqual(CONTENT_TYPE, content_type)
+        self.assertIn("pywsitest_matches_total 3", body.splitlines())
+
+    def test_write(self):
+        stats = WSStats()
+        stats.timeouts = 1
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "pywsitest.prom")
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, path)
+
+        MetricsExporter(stats).write(path)
+
+        with open(path, encoding="utf-8") as file:
+            self.assertIn("pywsitest_timeouts_total 1", file.read().splitlines())
+        self.assertEqual(["pywsitest.prom"], os.listdir(directory))
@@ -0,0 +1,22 @@
+import unittest
+
+from pywsitest import WSPerformanceError
+
+
+class WSPerformanceErrorTests(unittest.TestCase):
+
+    def test_performance_error(self):
+        with self.assertRaises(WSPerformanceError):
+            raise WSPerformanceError()
+
+    def test_performance_error_with_report(self):
+        report = [
+            {"metric": "error_rate", "max": 0.1, "actual": 0.0, "passed": True},
+            {"metric": "response_latency/p99", "max": 0.2, "actual": 0.3, "passed": False},
+        ]
+
+        error = WSPerformanceError("Missed", report=report)
+
+        self.assertEqual("Missed", str(error))
+        self.assertEqual(report, error.report)
+        self.assertEqual(report[1:], error.failures)
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pywsitest.ws_recording import (
+    WSRecorder, SENT, RECEIVED, LEGACY_MAGIC, RECORD_HEADER, read_recording, to_message, to_response
+)
+
+
+class WSRecordingTests(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_record_and_read_frames(self):
+        recorder = WSRecorder(self.path)
+        recorder.record(SENT, "{\"type\": \"connect\"}")
+        recorder.record(RECEIVED, "{\"type\": \"connected\", \"body\": \"café\"}")
+        recorder.close()
+
+        frames = list(read_recording(self.path))
+
+        self.assertEqual(2, len(frames))
+        self.assertEqual((SENT, "{\"type\": \"connect\"}"), frames[0][1:])
+        self.assertEqual((RECEIVED, "{\"type\": \"connected\", \"body\": \"café\"}"), frames[1][1:])
+        self.assertLessEqual(frames[0][0], frames[1][0])
+
+    def test_record_binary_frames(self):
+        recorder = WSRecorder(self.path)
+        recorder.record(RECEIVED, b"\x00\xff")
+        recorder.record(SENT, "{}")
+        recorder.close()
+
+        self.assertEqual([(RECEIVED, b"\x00\xff"), (SENT, "{}")], [frame[1:] for frame in read_recording(self.path)])
+
+    def test_recording_is_appended_to(self):
+        for payload in ("{\"first\": 1}", "{\"second\": 2}"):
+            recorder = WSRecorder(self.path)
+            recorder.record(SENT, payload)
+            recorder.close()
+
+        payloads = [payload for _, _, payload in read_recording(self.path)]
+
+        self.assertEqual(["{\"first\": 1}", "{\"second\": 2}"], payloads)
+
+    def test_appended_timestamps_never_go_backwards(self):
+        for wall_clock in (1000.0, 900.0, 2000.0):
+            with patch("time.time", return_value=wall_clock):
+                recorder = WSRecorder(self.path)
+            recorder.record(SENT, "{}")
+            recorder.close()
+
+        timestamps = [timestamp for timestamp, _, _ in read_recording(self.path)]
+
+        self.assertEqual(sorted(timestamps), timestamps)
+        self.assertGreaterEqual(timestamps[2], 1000.0)
+
+    def test_truncated_record_is_skipped_and_replaced(self):
+        recorder = WSRecorder(self.path)
+        recorder.record(SENT, "{\"first\": 1}")
+        recorder.record(SENT, "{\"second\": 2}")
+        recorder.close()
+        with open(self.path, "r+b") as file:
+            file.truncate(file.seek(0, 2) - 3)
+
+        self.assertEqual(["{\"first\": 1}"], [payload for _, _, payload in read_recording(self.path)])
+
+        recorder = WSRecorder(self.path)
+        recorder.record(SENT, "{\"third\": 3}")
+        recorder.close()
+
+        self.assertEqual(["{\"first\": 1}", "{\"third\": 3}"],
+                         [payload for _, _, payload in read_recording(self.path)])
+
+    def test_legacy_recording_is_read_and_appended_to(self):
+        with open(self.path, "wb") as file:
+            file.write(LEGACY_MAGIC + RECORD_HEADER.pack(5.0, SENT, 2) + b"{}")
+
+        recorder = WSRecorder(self.path)
+        recorder.record(RECEIVED, "[]")
+        recorder.close()
+
+        frames = list(read_recording(self.path))
+
+        self.assertEqual([(5.0, SENT, "{}")], frames[:1])
+        self.assertEqual((RECEIVED, "[]"), frames[1][1:])
+        self.assertGreaterEqual(frames[1][0], 5.0)
+
+    def test_read_empty_recording(self):
+        WSRecorder(self.path).close()
+
+        self.assertEqual([], list(read_recording(self.path)))
+
+    def test_read_invalid_recording(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a recording")
+
+        with self.assertRaises(ValueError):
+            list(read_recording(self.path))
+
+    def test_to_message(self):
+        message = to_message("{\"type\": \"connect\", \"body\": {\"room\": 1}}", 0.5)
+
+        self.assertEqual({"type": "connect", "body": {"room": 1}}, message.attributes)
+        self.assertEqual(0.5, message.delay)
+
+    def test_to_response(self):
+        response = to_response("{\"type\": \"connected\", \"body\": {\"room\": 1}, \"error\": null}")
+
+        self.assertEqual({"type": "connected", "body": {"room": 1}}, response.attributes)
+        self.assertTrue(response.is_match({"type": "connected", "body": {"room": 1}, "extra": True}))
+        self.assertFalse(response.is_match({"type": "connected", "body": {"room": 2}}))
+
+    def test_to_response_with_keys(self):
+        payload = "{\"type\": \"connected\", \"id\": \"abc\", \"sent\": 123}"
+
+        self.assertEqual({"type": "connected"}, to_response(payload, keys=["type"]).attributes)
+        self.assertEqual({"type": "connected"}, to_response(payload, ignore=["id", "sent"]).attributes)
+        self.assertEqual({"id": "abc"}, to_response(payload, keys=["id", "sent"], ignore=["sent"]).attributes)
+
+    def test_to_response_from_list(self):
+        response = to_response("[\"first\", \"second\"]")
+
+        self.assertTrue(response.is_match(["first", "second"]))
+        self.assertFalse(response.is_match(["second", "first"]))
@@ -22,6 +22,15 @@ class WSResponseTests(unittest.TestCase):  # noqa: pylint - too-many-public-meth
         self.assertEqual(123, ws_response.attributes["test"])
         self.assertEqual(1, len(ws_response.attributes))
 
+    def test_with_timeout(self):
+        first = WSResponse()
+        ws_response = WSResponse().with_timeout(1.5, after=first)
+
+        self.assertEqual(1.5, ws_response.timeout)
+        self.assertIs(first, ws_response.timeout_after)
+        self.assertIsNone(first.timeout)
+        self.assertIsNone(first.timeout_after)
+
     def test_all_attributes_is_match(self):
         ws_response = (
             WSResponse()
@@ -302,3 +311,44 @@ class WSResponseTests(unittest.TestCase):  # noqa: pylint - too-many-public-meth
         ]
 
         self.assertTrue(ws_response.is_match(test_data))
+
+    def test_ws_response_has_no_instance_dict(self):
+        self.assertFalse(hasattr(WSResponse(), "__dict__"))
+
+    def test_clone_copies_attributes_and_triggers_on_write(self):
+        trigger = WSMessage().with_attribute("type", "ack")
+        ws_response = WSResponse().with_attribute("type", "pong").with_trigger(trigger)
+
+        clone = ws_response.clone()
+        self.assertIs(ws_response.attributes, clone.attributes)
+        self.assertIs(ws_response.triggers, clone.triggers)
+
+        clone.with_attribute("id", 1).with_trigger(WSMessage())
+
+        self.assertEqual({"type": "pong"}, ws_response.attributes)
+        self.assertEqual([trigger], ws_response.triggers)
+        self.assertEqual({"type": "pong", "id": 1}, clone.attributes)
+        self.assertEqual(2, len(clone.triggers))
+        self.assertTrue(clone.is_match({"type": "pong", "id": 1}))
+
+    def test_clone_copies_timeout(self):
+        first = WSResponse()
+        clone = WSResponse().with_timeout(2.0, after=first).clone()
+
+        self.assertEqual(2.0, clone.timeout)
+        self.assertIs(first, clone.timeout_after)
+
+    def test_get_differences(self):
+        ws_response = (
+            WSResponse()
+            .with_attribute("type", "pong")
+            .with_attribute("id", 1)
+            .with_attribute("body")
+            .with_attribute("colours/colour", "red")
+        )
+
+        differences = ws_response.get_differences({"type": "pong", "id": 2, "colours": {"colour": "blue"}})
+
+        self.assertEqual({"id": [2], "body": [], "colours/colour": ["blue"]}, differences)
+        matching = {"type": "pong", "id": 1, "body": 0, "colours": {"colour": "red"}}
+        self.assertEqual({}, ws_response.get_differences(matching))
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+import unittest
+
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+from pywsitest import WSServer, WSTest, WSResponse, WSMessage
+from tests.utils import syncify
+
+
+class WSServerTests(unittest.TestCase):
+
+    def test_create_ws_server(self):
+        server = WSServer()
+
+        self.assertEqual("ws://127.0.0.1:0", server.uri)
+        self.assertFalse(server.replies)
+        self.assertFalse(server.pushes)
+
+    @syncify
+    async def test_start_on_free_port(self):
+        async with WSServer() as server:
+            self.assertNotEqual(0, server.port)
+            self.assertEqual(f"ws://127.0.0.1:{server.port}", server.uri)
+
+    @syncify
+    async def test_reply_to_matching_frame(self):
+        server = (
+            WSServer()
+            .with_reply(
+                WSResponse()
+                .with_attribute("type", "ping")
+                .with_trigger(
+                    WSMessage()
+                    .with_attribute("type", "pong")
+                    .with_attribute("id", "${id}")
+                )
+            )
+        )
+
+        async with server:
+            ws_tester = (
+                WSTest(server.uri)
+                .with_response_timeout(1.0)
+                .with_message(WSMessage().with_attribute("type", "ignored"))
+                .with_message(WSMessage().with_attribute("type", "ping").with_attribute("id", 1))
+                .with_message(WSMessage().with_attribute("type", "ping").with_attribute("id", 2))
+                .with_response(WSResponse().with_attribute("type", "pong").with_attribute("id", 1))
+                .with_response(WSResponse().with_attribute("type", "pong").with_attribute("id", 2))
+            )
+
+            await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(3, len(server.received_json))
+        self.assertEqual(1, server.connections)
+
+    @syncify
+    async def test_push_on_interval(self):
+        server = WSServer().with_push(WSMessage().with_attribute("type", "tick"), 0.01, count=3)
+
+        async with server:
+            ws_tester = WSTest(server.uri).with_response_timeout(1.0)
+            for _ in range(3):
+                ws_tester.with_response(WSResponse().with_attribute("type", "tick"))
+
+            await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(3, len(ws_tester.received_json))
+
+    @syncify
+    async def test_latency_with_jitter(self):
+        server = (
+            WSServer()
+            .with_push(WSMessage().with_attribute("type", "tick"), 0.0, count=1)
+            .with_latency(0.2, jitter=0.05, seed=1)
+        )
+
+        async with server:
+            ws_tester = (
+                WSTest(server.uri)
+                .with_response_timeout(1.0)
+                .with_response(WSResponse().with_attribute("type", "tick"))
+            )
+
+            start = time.monotonic()
+            await ws_tester.run()
+            elapsed = time.monotonic() - start
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertGreaterEqual(elapsed, 0.15)
+
+    @syncify
+    async def test_disconnect_after_frames(self):
+        server = WSServer().with_disconnect_after(frames=1)
+
+        async with server:
+            async with websockets.connect(server.uri) as websocket:
+                await websocket.send(json.dumps({"type": "hello"}))
+                with self.assertRaises(ConnectionClosed):
+                    await asyncio.wait_for(websocket.recv(), timeout=1.0)
+
+        self.assertEqual(1, len(server.received_json))
+
+    @syncify
+    async def test_history_keeps_latest_frames(self):
+        server = WSServer().with_history(2)
+
+        async with server:
+            async with websockets.connect(server.uri) as websocket:
+                for index in range(5):
+                    await websocket.send(json.dumps({"index": index}))
+                await websocket.close()
+            await asyncio.wait_for(self._wait_for_frames(server, 5), timeout=5.0)
+
+        self.assertEqual(5, server.frames_received)
+        self.assertEqual([json.dumps({"index": 3}), json.dumps({"index": 4})], list(server.received_json))
+
+    async def _wait_for_frames(self, server: WSServer, frames: int):
+        while server.frames_received < frames:
+            await asyncio.sleep(0.01)
+
+    def test_default_history_is_bounded(self):
+        server = WSServer()
+
+        self.assertEqual(1000, server.received_json.maxlen)
+        self.assertIsNone(server.with_history(None).received_json.maxlen)
+
+    @syncify
+    async def test_disconnect_after_seconds(self):
+        server = (
+            WSServer()
+            .with_push(WSMessage().with_attribute("type", "tick"), 0.01)
+            .with_disconnect_after(seconds=0.1)
+        )
+
+        async with server:
+            async with websockets.connect(server.uri) as websocket:
+                with self.assertRaises(ConnectionClosed):
+                    while True:
+                        await asyncio.wait_for(websocket.recv(), timeout=1.0)
@@ -0,0 +1,200 @@
+import pickle
+import unittest
+from unittest.mock import patch
+
+from pywsitest import WSStats
+from pywsitest.ws_stats import LatencyHistogram
+
+
+class WSStatsTests(unittest.TestCase):
+
+    def test_create_ws_stats(self):
+        stats = WSStats()
+
+        snapshot = stats.snapshot()
+
+        self.assertEqual(0, snapshot["runs"])
+        self.assertEqual(0, snapshot["frames_sent"])
+        self.assertEqual(0, snapshot["response_latency"]["count"])
+
+    def test_snapshot_rates(self):
+        with patch("time.monotonic", side_effect=[10.0, 12.0]):
+            stats = WSStats().start()
+            stats.frames_sent = 10
+            stats.frames_received = 20
+
+            snapshot = stats.snapshot()
+
+        self.assertEqual(2.0, snapshot["elapsed"])
+        self.assertEqual(5.0, snapshot["frames_sent_per_second"])
+        self.assertEqual(10.0, snapshot["frames_received_per_second"])
+
+    def test_snapshot_rates_with_no_elapsed_time(self):
+        with patch("time.monotonic", return_value=10.0):
+            snapshot = WSStats().start().snapshot()
+
+        self.assertEqual(0.0, snapshot["frames_sent_per_second"])
+        self.assertEqual(0.0, snapshot["frames_received_per_second"])
+
+    def test_rates_are_measured_from_the_first_start(self):
+        stats = WSStats()
+        stats.frames_received = 10
+
+        self.assertIsNone(stats.started)
+        self.assertEqual(0.0, stats.snapshot()["elapsed"])
+        self.assertEqual(0.0, stats.snapshot()["frames_received_per_second"])
+
+        with patch("time.monotonic", side_effect=[100.0, 105.0]):
+            stats.start()
+            stats.start()
+            snapshot = stats.snapshot()
+
+        self.assertEqual(100.0, stats.started)
+        self.assertEqual(5.0, snapshot["elapsed"])
+        self.assertEqual(2.0, snapshot["frames_received_per_second"])
+
+
+class LatencyHistogramTests(unittest.TestCase):
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+
+        self.assertEqual({"count": 0, "mean": 0.0, "max": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0},
+                         histogram.summary())
+
+    def test_record(self):
+        histogram = LatencyHistogram()
+        for value in (0.001, 0.002, 0.003):
+            histogram.record(value)
+
+        self.assertEqual(3, histogram.count)
+        self.assertAlmostEqual(0.002, histogram.summary()["mean"])
+        self.assertEqual(0.003, histogram.max)
+
+    def test_record_tiny_value(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.0)
+
+        self.assertEqual(1, histogram.counts[0])
+        self.assertEqual(0.0, histogram.percentile(50))
+
+    def test_percentiles_are_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 101):
+            histogram.record(value / 1000)
+
+        self.assertAlmostEqual(0.050, histogram.percentile(50), delta=0.050 / 32)
+        self.assertAlmostEqual(0.090, histogram.percentile(90), delta=0.090 / 32)
+        self.assertEqual(0.100, histogram.percentile(100))
+
+    def test_merge_histograms(self):
+        first = LatencyHistogram()
+        first.record(0.001)
+        second = LatencyHistogram()
+        second.record(0.002)
+        second.record(0.1)
+
+        first.merge(second)
+
+        self.assertEqual(3, first.count)
+        self.assertAlmostEqual(0.103, first.total)
+        self.assertEqual(0.1, first.max)
+        self.assertEqual(3, first.cumulative()[-1][1])
+
+    def test_percentiles_of_long_durations(self):
+        histogram = LatencyHistogram()
+        histogram.record(3600.0)
+        histogram.record(0.000005)
+
+        self.assertAlmostEqual(0.000005, histogram.percentile(50), delta=LatencyHistogram.UNIT)
+        self.assertEqual(3600.0, histogram.percentile(100))
+        self.assertLess(len(histogram.counts), 1024)
+
+    def test_cumulative_bounds_cover_each_value(self):
+        histogram = LatencyHistogram()
+        for value in (0.00001, 0.0001, 0.001, 0.0123, 1.5):
+            histogram.record(value)
+
+        buckets = histogram.cumulative()
+
+        self.assertEqual(sorted(buckets), buckets)
+        for value in (0.00001, 0.0001, 0.001, 0.0123, 1.5):
+            upper_bound = next(bound for bound, count in buckets if bound > value)
+            self.assertLessEqual(upper_bound - value, max(value / 32, LatencyHistogram.UNIT))
+
+    def test_merge_is_lossless(self):
+        merged = LatencyHistogram()
+        whole = LatencyHistogram()
+        for part in range(4):
+            histogram = LatencyHistogram()
+            for value in range(part, 1000, 4):
+                histogram.record(value / 997)
+                whole.record(value / 997)
+            merged.merge(histogram)
+
+        self.assertEqual(list(whole.counts), list(merged.counts))
+        self.assertEqual(whole.summary()["p99"], merged.summary()["p99"])
+
+    def test_to_bytes(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 10001):
+            histogram.record(value / 1000)
+
+        data = histogram.to_bytes()
+        copy = LatencyHistogram.from_bytes(data)
+
+        self.assertLess(len(data), len(histogram.counts) * histogram.counts.itemsize)
+        self.assertEqual(list(histogram.counts), list(copy.counts))
+        self.assertEqual(histogram.summary(), copy.summary())
+        self.assertEqual(histogram.summary(), pickle.loads(pickle.dumps(histogram)).summary())
+
+    def test_from_invalid_bytes(self):
+        with self.assertRaises(ValueError):
+            LatencyHistogram.from_bytes(b"not a histogram")
+
+        data = bytearray(LatencyHistogram().to_bytes())
+        data[1] = 7
+        with self.assertRaisesRegex(ValueError, "7 sub bucket bits"):
+            LatencyHistogram.from_bytes(bytes(data))
+
+    def test_merge_stats(self):
+        stats = WSStats()
+        stats.runs = 1
+        stats.connect_duration.record(0.01)
+        other = WSStats()
+        other.runs = 2
+        other.failures = 1
+        other.connect_duration.record(0.02)
+        stats.max_queue_depth = 3
+        other.max_queue_depth = 2
+        stats.started = 1.0
+        other.started = 2.0
+
+        merged = stats.merge(other)
+
+        self.assertIs(stats, merged)
+        self.assertEqual(3, stats.runs)
+        self.assertEqual(1, stats.failures)
+        self.assertEqual(2, stats.connect_duration.count)
+        self.assertEqual(3, stats.max_queue_depth)
+        self.assertEqual(1.0, stats.started)
+
+    def test_check_objectives(self):
+        stats = WSStats()
+        stats.runs = 4
+        stats.failures = 1
+        for _ in range(99):
+            stats.response_latency.record(0.01)
+        stats.response_latency.record(0.5)
+
+        report = stats.check([
+            {"metric": "response_latency/p50", "max": 0.02},
+            {"metric": "response_latency/p99", "max": 0.02},
+            {"metric": "error_rate", "max": 0.1},
+            {"metric": "frames_received_per_second", "min": 0.0},
+        ])
+
+        self.assertEqual([True, True, False, True], [check["passed"] for check in report])
+        self.assertEqual(0.25, report[2]["actual"])
+        self.assertEqual({"metric": "error_rate", "max": 0.1, "actual": 0.25, "passed": False}, report[2])
+        self.assertEqual(0.25, stats.snapshot()["error_rate"])
@@ -1,17 +1,20 @@
 import asyncio
+import inspect
 import json
+import os
+import tempfile
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
+import websockets
 from requests.exceptions import ConnectTimeout
-from pywsitest import WSTest, WSResponse, WSMessage, WSTimeoutError, RestRequest
-
-
-def syncify(coro):
-    def wrapper(*args, **kwargs):
-        response = asyncio.run(coro(*args, **kwargs))
-        return response
-    return wrapper
+from pywsitest import (
+    WSTest, WSResponse, WSMessage, WSTimeoutError, WSPerformanceError, RestRequest, WSServer, WSStats, WSTracer,
+    DataFeeder
+)
+from pywsitest.ws_recording import WSRecorder, SENT, RECEIVED, read_recording
+from tests.utils import syncify
 
 
 class WSTestTests(unittest.TestCase):  # noqa: pylint - too-many-public-methods
@@ -751,3 +754,1515 @@ class WSTestTests(unittest.TestCase):  # noqa: pylint - too-many-public-methods
         with self.assertRaises(WSTimeoutError):
             await ws_tester.run()
         mock_socket.close.assert_called_once()
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_binary_frame(self, mock_websockets):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(path)
+        self.addCleanup(os.remove, path)
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_recording(path)
+            .with_response(
+                WSResponse()
+                .with_attribute("body", "café")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        frame = json.dumps({"body": "café"}, ensure_ascii=False).encode("utf-8")
+        receive_future = asyncio.Future()
+        receive_future.set_result(frame)
+        mock_socket.recv = MagicMock(return_value=receive_future)
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual([frame], ws_tester.received_json)
+        self.assertEqual(len(frame), ws_tester.stats.bytes_received)
+        self.assertEqual([(RECEIVED, frame)], [frame[1:] for frame in read_recording(path)])
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_recording(self, mock_websockets):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(path)
+        self.addCleanup(os.remove, path)
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_recording(path)
+            .with_message(
+                WSMessage()
+                .with_attribute("test", 123)
+            )
+            .with_response(
+                WSResponse()
+                .with_attribute("type")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        send_future = asyncio.Future()
+        send_future.set_result({})
+        mock_socket.send = MagicMock(return_value=send_future)
+
+        receive_future = asyncio.Future()
+        receive_future.set_result(json.dumps({"type": "hello"}))
+        mock_socket.recv = MagicMock(side_effect=[receive_future, asyncio.Future()])
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        frames = sorted((direction, payload) for _, direction, payload in read_recording(path))
+        self.assertEqual([(SENT, "{\"test\": 123}"), (RECEIVED, "{\"type\": \"hello\"}")], frames)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_recording_to_a_bad_path_fails_before_connecting(self, mock_websockets):
+        ws_tester = WSTest("ws://example.com").with_recording(os.path.join(tempfile.gettempdir(), "missing", "log"))
+
+        with self.assertRaises(FileNotFoundError):
+            await ws_tester.run()
+
+        mock_websockets.assert_not_called()
+        self.assertEqual(0, ws_tester.stats.open_connections)
+
+    @patch("asyncio.sleep")
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_replay(self, mock_websockets, mock_sleep):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(path)
+        self.addCleanup(os.remove, path)
+
+        with patch("time.monotonic", side_effect=[0.0, 1.0, 1.5, 3.0]):
+            recorder = WSRecorder(path)
+            recorder.record(SENT, "{\"type\": \"connect\"}")
+            recorder.record(RECEIVED, "{\"type\": \"connected\", \"at\": 1}")
+            recorder.record(SENT, "{\"type\": \"message\"}")
+            recorder.close()
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_replay(path, speed=2.0, ignore_keys=["at"])
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        receive_future = asyncio.Future()
+        mock_socket.recv = MagicMock(side_effect=[receive_future, asyncio.Future()])
+
+        def mock_send(payload):
+            # the server only replies once the connect message has been sent
+            if not receive_future.done():
+                receive_future.set_result(json.dumps({"type": "connected", "at": 2}))
+            send_future = asyncio.Future()
+            send_future.set_result({})
+            return send_future
+
+        mock_socket.send = MagicMock(side_effect=mock_send)
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        mock_sleep.return_value = asyncio.Future()
+        mock_sleep.return_value.set_result(None)
+
+        await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(1, ws_tester.stats.matches)
+        self.assertEqual([], ws_tester.received_responses)
+        self.assertEqual([], ws_tester.sent_messages)
+        self.assertEqual(["{\"type\": \"connect\"}", "{\"type\": \"message\"}"],
+                         [call[0][0] for call in mock_socket.send.call_args_list])
+        self.assertEqual([0.5, 1.0], [call[0][0] for call in mock_sleep.call_args_list])
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_replay_at_max_speed_waits_for_later_sends(self, mock_websockets):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(path)
+        self.addCleanup(os.remove, path)
+
+        recorder = WSRecorder(path)
+        recorder.record(SENT, "{\"type\": \"connect\"}")
+        recorder.close()
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_replay(path, speed=None)
+            .with_message(
+                WSMessage()
+                .with_attribute("type", "first")
+                .with_delay(0.2)
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        send_future = asyncio.Future()
+        send_future.set_result({})
+        mock_socket.send = MagicMock(return_value=send_future)
+
+        mock_socket.recv = MagicMock(side_effect=lambda: asyncio.Future())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(2, mock_socket.send.call_count)
+
+    def test_with_stats(self):
+        stats = WSStats()
+
+        ws_tester = WSTest("wss://example.com").with_stats(stats)
+
+        self.assertEqual(stats, ws_tester.stats)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_stats(self, mock_websockets):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_message(
+                WSMessage()
+                .with_attribute("test", 123)
+            )
+            .with_response(
+                WSResponse()
+                .with_attribute("type")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        send_future = asyncio.Future()
+        send_future.set_result({})
+        mock_socket.send = MagicMock(return_value=send_future)
+
+        receive_future = asyncio.Future()
+        receive_future.set_result(json.dumps({"type": "hello"}))
+        mock_socket.recv = MagicMock(side_effect=[receive_future, asyncio.Future()])
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        self.assertEqual(1, ws_tester.stats.runs)
+        self.assertEqual(1, ws_tester.stats.frames_sent)
+        self.assertEqual(13, ws_tester.stats.bytes_sent)
+        self.assertEqual(1, ws_tester.stats.frames_received)
+        self.assertEqual(17, ws_tester.stats.bytes_received)
+        self.assertEqual(1, ws_tester.stats.matches)
+        self.assertEqual(1, ws_tester.stats.response_latency.count)
+        self.assertEqual(1, ws_tester.stats.run_duration.count)
+        self.assertEqual(0, ws_tester.stats.timeouts)
+        self.assertEqual(0, ws_tester.stats.open_connections)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_stats_count_timeouts(self, mock_websockets):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_response(
+                WSResponse()
+                .with_attribute("type")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.recv = MagicMock(return_value=asyncio.Future())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        with self.assertRaises(WSTimeoutError):
+            await ws_tester.run()
+
+        self.assertEqual(1, ws_tester.stats.timeouts)
+
+    @syncify
+    async def test_soak(self):
+        server = (
+            WSServer()
+            .with_reply(
+                WSResponse()
+                .with_attribute("type", "ping")
+                .with_trigger(
+                    WSMessage()
+                    .with_attribute("type", "pong")
+                    .with_attribute("id", "${id}")
+                )
+            )
+        )
+
+        snapshots = []
+
+        async with server:
+            ws_tester = (
+                WSTest(server.uri)
+                .with_soak(0.5, flush_interval=0.2, sink=snapshots.append)
+                .with_message(WSMessage().with_attribute("type", "ping").with_attribute("id", 1))
+                .with_response(
+                    WSResponse()
+                    .with_attribute("type", "pong")
+                    .with_attribute("id", 1)
+                    .with_trigger(WSMessage().with_attribute("type", "ping").with_attribute("id", "${id}"))
+                )
+            )
+
+            await ws_tester.run()
+
+        self.assertGreater(ws_tester.stats.runs, 1)
+        self.assertEqual(0, ws_tester.stats.failures)
+        # the last run can be cut short when the soak duration expires
+        self.assertLessEqual(ws_tester.stats.runs * 2 - 2, ws_tester.stats.frames_sent)
+        self.assertGreaterEqual(ws_tester.stats.runs * 2, ws_tester.stats.frames_sent)
+        self.assertFalse(ws_tester.received_json)
+        self.assertFalse(ws_tester.received_responses)
+        self.assertFalse(ws_tester.sent_messages)
+        self.assertEqual(3, len(snapshots))
+        self.assertEqual(ws_tester.stats.runs, snapshots[-1]["runs"])
+
+    @syncify
+    async def test_soak_counts_failures_and_flushes_to_file(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        async with WSServer() as server:
+            ws_tester = (
+                WSTest(server.uri)
+                .with_response_timeout(0.05)
+                .with_soak(0.2, flush_interval=1.0, sink=path)
+                .with_response(WSResponse().with_attribute("type"))
+            )
+
+            await ws_tester.run()
+
+        with open(path, encoding="utf-8") as file:
+            snapshots = [json.loads(line) for line in file]
+
+        self.assertEqual(1, len(snapshots))
+        self.assertGreater(snapshots[0]["failures"], 1)
+        self.assertEqual(snapshots[0]["failures"], snapshots[0]["timeouts"])
+
+    @patch("websockets.connect")
+    @patch("requests.request")
+    @syncify
+    async def test_websocket_tracer(self, mock_requests, mock_websockets):
+        request = RestRequest("https://example.com", "GET")
+        message = WSMessage().with_attribute("test", 123)
+        response = WSResponse().with_attribute("type")
+
+        tracer = MagicMock(spec=WSTracer)
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_tracer(tracer)
+            .with_request(request)
+            .with_message(message)
+            .with_response(response)
+        )
+
+        mock_request_response = MagicMock()
+        mock_requests.return_value = mock_request_response
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        send_future = asyncio.Future()
+        send_future.set_result({})
+        mock_socket.send = MagicMock(return_value=send_future)
+
+        receive_json = json.dumps({"type": "hello"})
+        receive_future = asyncio.Future()
+        receive_future.set_result(receive_json)
+        mock_socket.recv = MagicMock(side_effect=[receive_future, asyncio.Future()])
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        tracer.on_connect.assert_called_once()
+        self.assertEqual(ws_tester, tracer.on_connect.call_args[0][0])
+        self.assertEqual((message, 13), tracer.on_send.call_args[0][2:])
+        self.assertEqual((receive_json, 17), tracer.on_receive.call_args[0][2:])
+        self.assertEqual(response, tracer.on_match.call_args[0][2])
+        self.assertEqual(request, tracer.on_request_start.call_args[0][2])
+        self.assertEqual(request, tracer.on_request_end.call_args[0][2])
+        self.assertEqual(mock_request_response, tracer.on_request_end.call_args[0][4])
+        tracer.on_timeout.assert_not_called()
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_tracer_on_timeout(self, mock_websockets):
+        tracer = MagicMock(spec=WSTracer)
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_tracer(tracer)
+            .with_test_timeout(0.1)
+            .with_response(
+                WSResponse()
+                .with_attribute("type")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.recv = MagicMock(return_value=asyncio.Future())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        with self.assertRaises(WSTimeoutError) as ex:
+            await ws_tester.run()
+
+        tracer.on_timeout.assert_called_once()
+        self.assertEqual(ex.exception, tracer.on_timeout.call_args[0][2])
+
+    @patch("websockets.connect")
+    @patch("requests.request")
+    @syncify
+    async def test_websocket_timeline(self, mock_requests, mock_websockets):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_request(RestRequest("https://example.com", "GET"))
+            .with_response(
+                WSResponse()
+                .with_attribute("type")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        first_future = asyncio.Future()
+        first_future.set_result(json.dumps({"body": {}}))
+        second_future = asyncio.Future()
+        second_future.set_result(json.dumps({"type": {}}))
+        mock_socket.recv = MagicMock(side_effect=[first_future, second_future, asyncio.Future()])
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        timeline = ws_tester.timeline
+        self.assertIsNone(timeline.dns)
+        self.assertIsNone(timeline.tcp_connect)
+        self.assertLessEqual(timeline.connect, timeline.first_frame)
+        self.assertLessEqual(timeline.first_frame, timeline.last_match)
+        self.assertLessEqual(timeline.last_match, timeline.finished)
+        self.assertEqual(1, len(timeline.requests))
+        self.assertEqual("https://example.com", timeline.requests[0][2])
+        self.assertEqual(1, ws_tester.stats.connect_duration.count)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_timeout_error_has_timeline(self, mock_websockets):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_response(
+                WSResponse()
+                .with_attribute("type")
+            )
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.recv = MagicMock(return_value=asyncio.Future())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        with self.assertRaises(WSTimeoutError) as ex:
+            await ws_tester.run()
+
+        self.assertEqual(ws_tester.timeline, ex.exception.timeline)
+        self.assertIsNotNone(ex.exception.timeline.connect)
+        self.assertIsNone(ex.exception.timeline.first_frame)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_connect_timeout(self, mock_websockets):
+        ws_tester = WSTest("ws://example.com")
+
+        mock_websockets.side_effect = asyncio.TimeoutError()
+
+        with self.assertRaises(WSTimeoutError) as ex:
+            await ws_tester.run()
+
+        self.assertEqual("Timed out connecting to websocket", str(ex.exception))
+        self.assertIsNone(ex.exception.timeline.connect)
+        self.assertEqual(1, ws_tester.stats.timeouts)
+
+    @syncify
+    async def test_websocket_connect_breakdown(self):
+        server = WSServer().with_push(WSMessage().with_attribute("type", "hello"), 0.0, count=1)
+
+        async with server:
+            ws_tester = (
+                WSTest(server.uri)
+                .with_connect_breakdown()
+                .with_response(
+                    WSResponse()
+                    .with_attribute("type", "hello")
+                )
+            )
+
+            await ws_tester.run()
+
+        timeline = ws_tester.timeline
+        self.assertTrue(ws_tester.is_complete())
+        self.assertLessEqual(timeline.dns, timeline.tcp_connect)
+        self.assertLessEqual(timeline.tcp_connect, timeline.connect)
+
+    @patch("websockets.connect")
+    @patch("ssl.SSLContext")
+    @syncify
+    async def test_websocket_connect_breakdown_with_ssl(self, mock_ssl, mock_websockets):
+        ws_tester = WSTest("wss://example.com").with_connect_breakdown()
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        ssl_context = MagicMock()
+        mock_ssl.return_value = ssl_context
+
+        sock = MagicMock()
+        mock_open_socket = MagicMock(return_value=asyncio.Future())
+        mock_open_socket.return_value.set_result(sock)
+        with patch.object(ws_tester, "_open_socket", mock_open_socket):
+            await ws_tester.run()
+
+        mock_open_socket.assert_called_once_with("example.com", 443)
+        self.assertEqual(ssl_context, mock_websockets.call_args[1]["ssl"])
+        self.assertEqual(sock, mock_websockets.call_args[1]["sock"])
+        self.assertEqual("example.com", mock_websockets.call_args[1]["server_hostname"])
+
+    @syncify
+    async def test_websocket_connect_breakdown_refused(self):
+        async with WSServer() as server:
+            uri = server.uri
+
+        ws_tester = WSTest(uri).with_connect_breakdown()
+
+        with self.assertRaises(OSError):
+            await ws_tester.run()
+
+        self.assertIsNotNone(ws_tester.timeline.dns)
+        self.assertIsNone(ws_tester.timeline.tcp_connect)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_compression_disabled(self, mock_websockets):
+        ws_tester = WSTest("ws://example.com").with_compression(False)
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        mock_websockets.assert_called_once_with("ws://example.com", compression=None)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_compression_with_default_settings(self, mock_websockets):
+        ws_tester = WSTest("ws://example.com").with_compression()
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        mock_websockets.assert_called_once_with("ws://example.com")
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_compression_with_settings(self, mock_websockets):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_compression(client_max_window_bits=10, server_max_window_bits=12, compress_settings={"level": 1})
+        )
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        kwargs = mock_websockets.call_args[1]
+        self.assertIsNone(kwargs["compression"])
+        self.assertEqual(1, len(kwargs["extensions"]))
+        self.assertEqual(10, kwargs["extensions"][0].client_max_window_bits)
+        self.assertEqual(12, kwargs["extensions"][0].server_max_window_bits)
+        self.assertEqual({"level": 1}, kwargs["extensions"][0].compress_settings)
+
+    @syncify
+    async def test_websocket_wire_bytes(self):
+        body = {"colours": ["red", "green", "blue"] * 100}
+        server = WSServer().with_push(WSMessage().with_attribute("body", body), 0.0, count=1)
+
+        async with server:
+            compressed = (
+                WSTest(server.uri)
+                .with_compression(client_max_window_bits=10)
+                .with_message(WSMessage().with_attribute("body", body))
+                .with_response(WSResponse().with_attribute("body"))
+            )
+            uncompressed = (
+                WSTest(server.uri)
+                .with_compression(False)
+                .with_message(WSMessage().with_attribute("body", body))
+                .with_response(WSResponse().with_attribute("body"))
+            )
+
+            await compressed.run()
+            await uncompressed.run()
+
+        self.assertEqual(compressed.stats.bytes_sent, uncompressed.stats.bytes_sent)
+        self.assertEqual(compressed.stats.bytes_received, uncompressed.stats.bytes_received)
+        self.assertLess(compressed.stats.wire_bytes_sent, compressed.stats.bytes_sent / 10)
+        self.assertLess(compressed.stats.wire_bytes_received, compressed.stats.bytes_received / 10)
+        self.assertGreater(uncompressed.stats.wire_bytes_sent, uncompressed.stats.bytes_sent)
+        self.assertGreater(uncompressed.stats.wire_bytes_received, uncompressed.stats.bytes_received)
+
+    def test_spawn_shares_template(self):
+        message = WSMessage().with_attribute("type", "ping")
+        response = WSResponse().with_attribute("type", "pong")
+        template = (
+            WSTest("wss://example.com")
+            .with_parameter("region", "eu")
+            .with_header("Authorization", "token")
+            .with_message(message)
+            .with_response(response)
+        )
+
+        instance = template.spawn(parameters={"user": 1}, headers={"Authorization": "user-1"})
+
+        self.assertEqual({"region": "eu", "user": 1}, instance.parameters)
+        self.assertEqual({"Authorization": "user-1"}, instance.headers)
+        self.assertEqual({"region": "eu"}, template.parameters)
+        self.assertEqual({"Authorization": "token"}, template.headers)
+        self.assertIs(message, instance.messages[0])
+        self.assertIs(response, instance.expected_responses[0])
+        self.assertIsNot(template.messages, instance.messages)
+        self.assertIs(template.stats, instance.stats)
+
+        instance.with_tracer(WSTracer()).with_parameter("other", 2)
+
+        self.assertEqual([], template.tracers)
+        self.assertEqual({"region": "eu"}, template.parameters)
+
+    def test_spawn_shares_no_containers(self):
+        template = (
+            WSTest("wss://example.com")
+            .with_message(WSMessage().with_attribute("type", "ping"))
+            .with_response(WSResponse().with_attribute("type", "pong"))
+            .with_buffer_limits(max_queue=4)
+            .with_compression(client_max_window_bits=10)
+            .with_max_latency(p99=0.1)
+        )
+
+        instance = template.spawn()
+
+        for name, value in vars(instance).items():
+            if isinstance(value, (list, dict, set)):
+                self.assertIsNot(getattr(template, name), value, name)
+        self.assertIsNot(template._connection, instance._connection)  # pylint:disable=protected-access
+        self.assertIs(instance, instance._connection.test)  # pylint:disable=protected-access
+        self.assertIs(template.messages[0], instance.messages[0])
+
+    @syncify
+    async def test_tests_reuse_an_open_websocket(self):
+        server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        )
+
+        async with server:
+            websocket = await websockets.connect(server.uri)
+            try:
+                for _ in range(2):
+                    ws_tester = (
+                        WSTest(server.uri)
+                        .with_websocket(websocket)
+                        .with_message(WSMessage().with_attribute("type", "ping"))
+                        .with_response(WSResponse().with_attribute("type", "pong"))
+                    )
+                    await ws_tester.run()
+
+                    self.assertTrue(ws_tester.is_complete())
+                    self.assertEqual(0, ws_tester.stats.open_connections)
+                    self.assertEqual(0, ws_tester.stats.connect_duration.count)
+                    self.assertEqual("OPEN", websocket.state.name)
+            finally:
+                await websocket.close()
+
+        self.assertEqual(1, server.connections)
+
+    @syncify
+    async def test_spawned_instances_run_independently(self):
+        server = WSServer().with_reply(
+            WSResponse()
+            .with_attribute("type", "ping")
+            .with_trigger(WSMessage().with_attribute("type", "pong").with_attribute("user", "${user}"))
+        )
+
+        async with server:
+            template = (
+                WSTest(server.uri)
+                .with_response_timeout(1.0)
+                .with_message(WSMessage().with_attribute("type", "ping").with_attribute("user", 0))
+                .with_response(WSResponse().with_attribute("type", "pong"))
+            )
+            instances = [template.spawn(parameters={"user": user}) for user in range(3)]
+
+            await asyncio.gather(*(instance.run() for instance in instances))
+
+        self.assertTrue(all(instance.is_complete() for instance in instances))
+        self.assertEqual(3, template.stats.runs)
+        self.assertEqual(1, len(template.messages))
+        self.assertEqual(1, len(template.expected_responses))
+        self.assertFalse(template.received_json)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_feeder_binds_rows(self, mock_websockets):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "users.csv")
+            with open(path, "w", encoding="utf-8") as users:
+                users.write("token,device\nabc,1\ndef,2\n")
+
+            with DataFeeder(path) as feeder:
+                template = (
+                    WSTest("ws://example.com")
+                    .with_feeder(feeder)
+                    .with_parameter("device", "${device}")
+                    .with_header("Authorization", "Bearer ${token}")
+                    .with_header("Other", "${missing}")
+                    .with_message(WSMessage().with_attribute("device", "${device}").with_attribute("type", "hello"))
+                )
+
+                for _ in range(2):
+                    mock_socket = MagicMock()
+                    mock_socket.close = MagicMock(return_value=asyncio.Future())
+                    mock_socket.close.return_value.set_result(MagicMock())
+                    mock_socket.send = MagicMock(return_value=asyncio.Future())
+                    mock_socket.send.return_value.set_result(None)
+                    mock_websockets.return_value = asyncio.Future()
+                    mock_websockets.return_value.set_result(mock_socket)
+
+                    instance = template.spawn()
+                    await instance.run()
+
+        self.assertEqual({"token": "def", "device": "2"}, instance.row)
+        mock_websockets.assert_called_with(
+            "ws://example.com?device=2", extra_headers={"Authorization": "Bearer def", "Other": "${missing}"}
+        )
+        mock_socket.send.assert_called_once_with("{\"device\": \"2\", \"type\": \"hello\"}")
+        self.assertEqual({"device": "${device}", "type": "hello"}, template.messages[0].attributes)
+        self.assertEqual({"device": "${device}"}, template.parameters)
+
+    @patch("websockets.connect")
+    @patch("requests.request")
+    @syncify
+    async def test_websocket_feeder_binds_nested_values_channels_and_requests(self, mock_requests, mock_websockets):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "users.csv")
+            with open(path, "w", encoding="utf-8") as users:
+                users.write("token,device\nabc,1\n")
+
+            with DataFeeder(path) as feeder:
+                template = (
+                    WSTest("ws://example.com")
+                    .with_feeder(feeder)
+                    .with_channel_key("channel")
+                    .with_message(WSMessage().with_attribute("auth", {"token": "${token}", "devices": ["${device}"]}))
+                    .with_channel("a", WSTest("a").with_message(WSMessage().with_attribute("device", "${device}")))
+                    .with_request(
+                        RestRequest("https://example.com", "POST")
+                        .with_header("Authorization", "Bearer ${token}")
+                        .with_body({"device": "${device}"})
+                    )
+                )
+
+                mock_socket = MagicMock()
+                mock_socket.close = MagicMock(return_value=asyncio.Future())
+                mock_socket.close.return_value.set_result(MagicMock())
+                mock_socket.send = MagicMock(return_value=asyncio.Future())
+                mock_socket.send.return_value.set_result(None)
+                mock_websockets.return_value = asyncio.Future()
+                mock_websockets.return_value.set_result(mock_socket)
+
+                await template.spawn().run()
+
+        self.assertEqual(
+            ["{\"auth\": {\"token\": \"abc\", \"devices\": [\"1\"]}}", "{\"device\": \"1\"}"],
+            sorted(call[0][0] for call in mock_socket.send.call_args_list)
+        )
+        mock_requests.assert_called_once_with(
+            "post", "https://example.com", timeout=10.0, headers={"Authorization": "Bearer abc"},
+            json={"device": "1"}
+        )
+        self.assertEqual({"device": "${device}"}, template.requests[0].body)
+        self.assertEqual({"device": "${device}"}, template.channels["a"].messages[0].attributes)
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_response_timeout_with_nearest_misses(self, mock_websockets):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_nearest_misses(2)
+            .with_response(WSResponse().with_attribute("type", "pong").with_attribute("id", 1).with_attribute("body"))
+        )
+
+        frames = [
+            {"type": "ping"},
+            {"type": "pong", "id": 2},
+            {"other": True},
+            {"type": "pong", "id": 3, "body": {}},
+        ]
+        received = []
+        for frame in frames:
+            received.append(asyncio.Future())
+            received[-1].set_result(json.dumps(frame))
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.recv = MagicMock(side_effect=received + [asyncio.Future()])
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        with self.assertRaises(WSTimeoutError) as ex:
+            await ws_tester.run()
+
+        expected_error = "\n".join([
+            "Timed out waiting for responses:",
+            "{\"type\": \"pong\", \"id\": 1, \"body\": null}",
+            "  Nearest (2/3): {\"type\": \"pong\", \"id\": 3, \"body\": {}}",
+            "    matched: type, body; differed: id (received 3)",
+            "  Nearest (1/3): {\"type\": \"pong\", \"id\": 2}",
+            "    matched: type; differed: id (received 2), body (missing)",
+        ])
+        self.assertEqual(expected_error, str(ex.exception))
+
+    @syncify
+    async def test_websocket_nearest_misses_only_score_responses_sharing_an_attribute(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_nearest_misses(1)
+            .with_response(WSResponse().with_attribute("body", {"price": 1}))
+            .with_response(WSResponse().with_attribute("type", "order").with_attribute("status"))
+        )
+        for index in range(100):
+            ws_tester.with_response(WSResponse().with_attribute("type", "order").with_attribute("id", index))
+        frames = [{"type": "quote", "id": 5}, {"type": "quote", "status": "open"}, {"id": [5]}]
+
+        with patch.object(WSResponse, "get_differences", autospec=True,
+                          side_effect=WSResponse.get_differences) as mock_get_differences:
+            with self.assertRaises(WSTimeoutError):
+                await self._run_triggers(ws_tester, frames)
+
+        # the response with a dictionary value is scored against every frame, others only when a value is shared,
+        # then the two near misses found are compared again for the timeout error
+        scored = [(call[0][0].attributes, call[0][1]) for call in mock_get_differences.call_args_list]
+        self.assertEqual(7, len(scored))
+        self.assertEqual(2, scored.count(({"type": "order", "id": 5}, {"type": "quote", "id": 5})))
+        self.assertEqual(2, scored.count(({"type": "order", "status": None}, {"type": "quote", "status": "open"})))
+        self.assertEqual(3, len([frame for response, frame in scored if response == {"body": {"price": 1}}]))
+
+    def test_receive_error_message_is_bounded(self):
+        ws_tester = WSTest("ws://example.com").with_received_response_logging()
+        for index in range(60):
+            ws_tester.with_response(WSResponse().with_attribute("index", index))
+        ws_tester.received_json = [json.dumps({"index": index}) for index in range(1000)]
+        ws_tester.received_json.append(json.dumps({"body": "x" * 2000}))
+
+        lines = ws_tester._get_receive_error_message().split("\n")  # pylint:disable=protected-access
+
+        self.assertEqual("{\"index\": 49}", lines[50])
+        self.assertEqual("...and 10 more", lines[51])
+        self.assertEqual("Received responses:", lines[52])
+        self.assertEqual("...951 earlier responses", lines[53])
+        self.assertEqual("{\"index\": 951}", lines[54])
+        self.assertEqual(1003, len(lines[-1]))
+        self.assertEqual(104, len(lines))
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_connect_with_buffer_limits(self, mock_websockets):
+        ws_tester = WSTest("ws://example.com").with_buffer_limits(max_queue=64, write_limit=2 ** 20)
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        await ws_tester.run()
+
+        mock_websockets.assert_called_once_with("ws://example.com", max_queue=64, write_limit=2 ** 20)
+
+    @syncify
+    async def test_websocket_read_limit_is_only_passed_to_the_legacy_client(self):
+        from websockets.legacy.client import connect as legacy_connect  # pylint:disable=import-outside-toplevel
+
+        server = WSServer().with_push(WSMessage().with_attribute("type", "hello"), 0.0, count=1)
+
+        async with server:
+            # websockets.connect is the asyncio client from websockets 14, and the legacy client before it
+            for connect in (websockets.connect, legacy_connect):
+                ws_tester = (
+                    WSTest(server.uri)
+                    .with_buffer_limits(max_queue=8, read_limit=2 ** 16)
+                    .with_response(WSResponse().with_attribute("type", "hello"))
+                )
+                spy = MagicMock(wraps=connect)
+                spy.__signature__ = inspect.signature(connect)
+                with patch("websockets.connect", spy):
+                    await ws_tester.run()
+
+                self.assertTrue(ws_tester.is_complete())
+                self.assertEqual(
+                    issubclass(connect, legacy_connect), spy.call_args[1].get("read_limit") == 2 ** 16
+                )
+                self.assertEqual(8, spy.call_args[1]["max_queue"])
+
+    async def _run_slow_client(self, connect=None) -> WSStats:
+        class SlowTracer(WSTracer):
+            def on_receive(self, test, timestamp, response, size):
+                time.sleep(0.002)
+
+        server = WSServer().with_push(WSMessage().with_attribute("type", "update"), 0.0, count=20)
+
+        async with server:
+            ws_tester = WSTest(server.uri).with_tracer(SlowTracer()).with_buffer_limits(max_queue=64)
+            for _ in range(20):
+                ws_tester.with_response(WSResponse().with_attribute("type", "update"))
+
+            if connect:
+                with patch("websockets.connect", connect):
+                    await ws_tester.run()
+            else:
+                await ws_tester.run()
+
+        return ws_tester.stats
+
+    @syncify
+    async def test_websocket_receive_queue_is_timed(self):
+        stats = await self._run_slow_client()
+
+        self.assertEqual(20, stats.recv_wait.count)
+        self.assertEqual(20, stats.queue_time.count)
+        self.assertGreater(stats.max_queue_depth, 0)
+        self.assertGreater(stats.queue_time.max, 0.002)
+
+    @syncify
+    async def test_websocket_legacy_receive_queue_is_timed(self):
+        from websockets.legacy.client import connect  # pylint:disable=import-outside-toplevel
+
+        stats = await self._run_slow_client(connect)
+
+        self.assertEqual(20, stats.queue_time.count)
+        self.assertGreater(stats.max_queue_depth, 0)
+
+    async def _run_triggers(self, ws_tester: WSTest, frames: list, send=None) -> list:
+        sent = []
+
+        async def record_send(payload):
+            sent.append((json.loads(payload), time.monotonic()))
+
+        async def receive():
+            if frames:
+                return json.dumps(frames.pop(0))
+            return await asyncio.Future()
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.send = MagicMock(side_effect=send or record_send)
+        mock_socket.recv = MagicMock(side_effect=receive)
+
+        with patch("websockets.connect", MagicMock(return_value=asyncio.Future())) as mock_websockets:
+            mock_websockets.return_value.set_result(mock_socket)
+            started = time.monotonic()
+            await ws_tester.run()
+
+        return [(message, sent_at - started) for message, sent_at in sent]
+
+    @syncify
+    async def test_websocket_triggers_are_sent_concurrently(self):
+        response = WSResponse().with_attribute("type", "hello")
+        for index in range(3):
+            response.with_trigger(WSMessage().with_attribute("index", index).with_delay(0.2))
+        ws_tester = WSTest("ws://example.com").with_message_timeout(5.0).with_response(response)
+        sending = []
+        all_sending = asyncio.Event()
+
+        async def wait_for_all(payload):
+            # sent one after another, the first send would wait for the others until it timed out
+            sending.append(json.loads(payload)["index"])
+            if len(sending) == 3:
+                all_sending.set()
+            await all_sending.wait()
+
+        await self._run_triggers(ws_tester, [{"type": "hello"}], send=wait_for_all)
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual([0, 1, 2], sorted(sending))
+
+    @syncify
+    async def test_websocket_triggers_do_not_block_receiving(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response(
+                WSResponse()
+                .with_attribute("type", "first")
+                .with_trigger(WSMessage().with_attribute("type", "slow").with_delay(0.2))
+            )
+            .with_response(
+                WSResponse()
+                .with_attribute("type", "second")
+                .with_trigger(WSMessage().with_attribute("type", "fast"))
+            )
+        )
+
+        sent = await self._run_triggers(ws_tester, [{"type": "first"}, {"type": "second"}])
+
+        self.assertEqual(["fast", "slow"], [message["type"] for message, _ in sent])
+        self.assertEqual(2, len(ws_tester.sent_messages))
+
+    @syncify
+    async def test_websocket_triggers_in_strict_order(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_strict_trigger_order()
+            .with_response(
+                WSResponse()
+                .with_attribute("type", "first")
+                .with_trigger(WSMessage().with_attribute("type", "slow").with_delay(0.2))
+                .with_trigger(WSMessage().with_attribute("type", "slow again").with_delay(0.2))
+            )
+            .with_response(
+                WSResponse()
+                .with_attribute("type", "second")
+                .with_trigger(WSMessage().with_attribute("type", "fast"))
+            )
+        )
+
+        sleep = asyncio.sleep
+        with patch("asyncio.sleep", MagicMock(side_effect=sleep)) as mock_sleep:
+            sent = await self._run_triggers(ws_tester, [{"type": "first"}, {"type": "second"}])
+
+        self.assertTrue(ws_tester.strict_trigger_order)
+        self.assertEqual(["slow", "slow again", "fast"], [message["type"] for message, _ in sent])
+        # both delays are measured from the match, so the second is already up once the first has been sent
+        self.assertEqual(1, len([call for call in mock_sleep.call_args_list if call[0][0] > 0.1]))
+
+    @syncify
+    async def test_websocket_trigger_timeout_stops_the_run(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_message_timeout(0.05)
+            .with_response(
+                WSResponse()
+                .with_attribute("type", "first")
+                .with_trigger(WSMessage().with_attribute("type", "stuck"))
+            )
+            .with_response(WSResponse().with_attribute("type", "never"))
+        )
+
+        async def stuck_send(_):
+            await asyncio.Future()
+
+        started = time.monotonic()
+        with self.assertRaisesRegex(WSTimeoutError, "Timed out trying to send message"):
+            await self._run_triggers(ws_tester, [{"type": "first"}], send=stuck_send)
+
+        # well within the 10 second response timeout the run would otherwise wait for
+        self.assertLess(time.monotonic() - started, 5.0)
+        self.assertEqual(1, ws_tester.stats.timeouts)
+
+    async def _run_timed_frames(self, ws_tester: WSTest, frames: list):
+        # frames are (seconds after connecting, frame) pairs, the socket stays open after the last one
+        connected = asyncio.get_event_loop().time()
+
+        async def receive():
+            if not frames:
+                return await asyncio.Future()
+            at, frame = frames.pop(0)
+            await asyncio.sleep(max(0.0, connected + at - asyncio.get_event_loop().time()))
+            return json.dumps(frame)
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.recv = MagicMock(side_effect=receive)
+
+        with patch("websockets.connect", MagicMock(return_value=asyncio.Future())) as mock_websockets:
+            mock_websockets.return_value.set_result(mock_socket)
+            await ws_tester.run()
+
+    @syncify
+    async def test_websocket_response_timeout_per_response(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(5.0)
+            .with_response(WSResponse().with_attribute("type", "slow").with_timeout(0.15))
+        )
+        # frames that don't match would keep resetting the response timeout
+        frames = [(0.05 * index, {"type": "noise"}) for index in range(20)]
+
+        started = time.monotonic()
+        with self.assertRaisesRegex(WSTimeoutError, "Timed out waiting for responses:\n{\"type\": \"slow\"}"):
+            await self._run_timed_frames(ws_tester, frames)
+
+        # the noise would hold off the response timeout until 6 seconds in
+        self.assertLess(time.monotonic() - started, 3.0)
+        self.assertEqual(1, ws_tester.stats.timeouts)
+
+    @syncify
+    async def test_websocket_response_with_own_timeout_ignores_response_timeout(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.05)
+            .with_response(WSResponse().with_attribute("type", "slow").with_timeout(0.5))
+        )
+
+        await self._run_timed_frames(ws_tester, [(0.2, {"type": "slow"})])
+
+        self.assertTrue(ws_tester.is_complete())
+
+    @syncify
+    async def test_websocket_response_timeout_after_another_response(self):
+        first = WSResponse().with_attribute("type", "first")
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response(first.with_timeout(0.5))
+            .with_response(WSResponse().with_attribute("type", "second").with_timeout(0.15, after=first))
+        )
+
+        # the second response arrives 0.35 seconds after the test starts, but only 0.1 seconds after the first
+        await self._run_timed_frames(ws_tester, [(0.25, {"type": "first"}), (0.35, {"type": "second"})])
+
+        self.assertTrue(ws_tester.is_complete())
+
+    @syncify
+    async def test_websocket_response_times_out_after_another_response(self):
+        first = WSResponse().with_attribute("type", "first")
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response(first.with_timeout(0.5))
+            .with_response(WSResponse().with_attribute("type", "second").with_timeout(0.1, after=first))
+        )
+
+        started = time.monotonic()
+        with self.assertRaisesRegex(WSTimeoutError, "second"):
+            await self._run_timed_frames(ws_tester, [(0.2, {"type": "first"}), (5.0, {"type": "second"})])
+
+        self.assertTrue(ws_tester.received_responses)
+        self.assertGreater(time.monotonic() - started, 0.25)
+        self.assertLess(time.monotonic() - started, 3.0)
+
+    @syncify
+    async def test_websocket_cancel_is_not_lost_to_a_deadline(self):
+        ws_tester = WSTest("ws://example.com").with_response(WSResponse().with_attribute("type", "pong"))
+        mock_socket = MagicMock()
+        mock_socket.recv = MagicMock(side_effect=lambda: asyncio.Future())
+
+        receiver = asyncio.ensure_future(ws_tester._receive(mock_socket))  # pylint:disable=protected-access
+        while not mock_socket.recv.called:
+            await asyncio.sleep(0)
+
+        # a deadline coming due in the same loop iteration as a real cancel, such as a failed trigger stopping the run
+        ws_tester._connection.interrupt_receiver()  # pylint:disable=protected-access
+        receiver.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await receiver
+
+    @patch("websockets.connect")
+    @syncify
+    async def test_websocket_replay_finishes_without_waiting_for_response_timeout(self, mock_websockets):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(path)
+        self.addCleanup(os.remove, path)
+
+        recorder = WSRecorder(path)
+        recorder.record(SENT, "{\"type\": \"connect\"}")
+        recorder.close()
+
+        ws_tester = WSTest("ws://example.com").with_response_timeout(10.0).with_replay(path, speed=None)
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        send_future = asyncio.Future()
+        send_future.set_result({})
+        mock_socket.send = MagicMock(return_value=send_future)
+        mock_socket.recv = MagicMock(side_effect=lambda: asyncio.Future())
+
+        mock_websockets.return_value = asyncio.Future()
+        mock_websockets.return_value.set_result(mock_socket)
+
+        started = time.monotonic()
+        await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertLess(time.monotonic() - started, 5.0)
+
+    def test_with_correlation(self):
+        ws_tester = WSTest("wss://example.com").with_correlation("id")
+
+        self.assertEqual(("id", "id"), ws_tester.correlation)
+        self.assertEqual(("id", "body/requestId"), ws_tester.with_correlation("id", "body/requestId").correlation)
+
+    @syncify
+    async def test_websocket_correlated_replies(self):
+        server = WSServer().with_reply(
+            WSResponse()
+            .with_attribute("type", "request")
+            .with_trigger(WSMessage().with_attribute("type", "reply").with_attribute("body", "${id}"))
+        )
+
+        async with server:
+            ws_tester = WSTest(server.uri).with_correlation("id", "body")
+            for request_id in range(3):
+                ws_tester.with_message(WSMessage().with_attribute("type", "request").with_attribute("id", request_id))
+            for request_id in reversed(range(3)):
+                ws_tester.with_response(
+                    WSResponse().with_attribute("type", "reply").with_attribute("body", request_id)
+                )
+
+            await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(3, ws_tester.stats.round_trip.count)
+        self.assertFalse(ws_tester._sent_at)  # pylint:disable=protected-access
+        self.assertFalse(ws_tester._correlated)  # pylint:disable=protected-access
+
+    @syncify
+    async def test_websocket_correlated_replies_are_routed_by_id(self):
+        ws_tester = WSTest("ws://example.com").with_correlation("id", "body/requestId")
+        for request_id in range(100):
+            ws_tester.with_response(WSResponse().with_attribute("body/requestId", request_id))
+        ws_tester.with_response(WSResponse().with_attribute("type", "done"))
+        frames = [{"body": {"requestId": request_id}} for request_id in range(100)] + [{"type": "done"}]
+
+        with patch.object(WSResponse, "is_match", autospec=True, side_effect=WSResponse.is_match) as mock_is_match:
+            await self._run_triggers(ws_tester, frames)
+
+        self.assertTrue(ws_tester.is_complete())
+        # one lookup for each correlated reply, the last frame has no id so it's checked against what's left
+        self.assertEqual(101, mock_is_match.call_count)
+        self.assertEqual(0, ws_tester.stats.round_trip.count)
+
+    @syncify
+    async def test_websocket_frames_with_unknown_ids_skip_correlated_responses(self):
+        ws_tester = WSTest("ws://example.com").with_response_timeout(0.1).with_correlation("id", "body/requestId")
+        for request_id in range(100):
+            ws_tester.with_response(WSResponse().with_attribute("body/requestId", request_id))
+        ws_tester.with_response(WSResponse().with_attribute("type", "done"))
+        frames = [{"body": {"requestId": 500}}, {"type": "other"}]
+
+        with patch.object(WSResponse, "is_match", autospec=True, side_effect=WSResponse.is_match) as mock_is_match:
+            with self.assertRaises(WSTimeoutError):
+                await self._run_triggers(ws_tester, frames)
+
+        # neither frame can match a response expecting an id, so each is only checked against the one without
+        self.assertEqual(2, mock_is_match.call_count)
+
+    @syncify
+    async def test_websocket_replayed_replies_are_routed_by_id(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        os.remove(path)
+        self.addCleanup(os.remove, path)
+
+        recorder = WSRecorder(path)
+        recorder.record(SENT, "{\"type\": \"request\", \"id\": 1}")
+        recorder.record(RECEIVED, "{\"type\": \"reply\", \"id\": 1}")
+        recorder.close()
+
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(1.0)
+            .with_correlation("id", "id")
+            .with_replay(path, speed=None)
+        )
+
+        replies = asyncio.Queue()
+
+        async def send(payload):
+            replies.put_nowait(json.dumps({"type": "reply", "id": json.loads(payload)["id"]}))
+
+        mock_socket = MagicMock()
+        mock_socket.close = MagicMock(return_value=asyncio.Future())
+        mock_socket.close.return_value.set_result(MagicMock())
+        mock_socket.send = MagicMock(side_effect=send)
+        mock_socket.recv = MagicMock(side_effect=replies.get)
+
+        with patch("websockets.connect", MagicMock(return_value=asyncio.Future())) as mock_websockets:
+            mock_websockets.return_value.set_result(mock_socket)
+            await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(1, ws_tester.stats.round_trip.count)
+
+    def test_with_channel(self):
+        channel = WSTest("channel")
+        ws_tester = WSTest("wss://example.com").with_channel_key("body/channel").with_channel("prices", channel)
+
+        self.assertEqual("body/channel", ws_tester.channel_key)
+        self.assertIs(channel, ws_tester.channels["prices"])
+
+    @syncify
+    async def test_websocket_channels_share_one_connection(self):
+        server = WSServer().with_reply(
+            WSResponse()
+            .with_attribute("type", "subscribe")
+            .with_trigger(WSMessage().with_attribute("type", "subscribed").with_attribute("channel", "${channel}"))
+        )
+
+        async with server:
+            ws_tester = WSTest(server.uri).with_channel_key("channel")
+            for channel in range(50):
+                ws_tester.with_channel(
+                    channel,
+                    WSTest("channel")
+                    .with_message(WSMessage().with_attribute("type", "subscribe").with_attribute("channel", channel))
+                    .with_response(
+                        WSResponse()
+                        .with_attribute("type", "subscribed")
+                        .with_trigger(WSMessage().with_attribute("type", "ack").with_attribute("channel", channel))
+                    )
+                )
+
+            await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(1, ws_tester.stats.runs)
+        self.assertEqual(0, ws_tester.stats.open_connections)
+        self.assertEqual(50, ws_tester.stats.matches)
+        self.assertEqual(100, ws_tester.stats.frames_sent)
+        self.assertEqual(50, len(ws_tester.received_json))
+        for value, channel in ws_tester.channels.items():
+            self.assertTrue(channel.is_complete())
+            self.assertEqual([{"type": "subscribe", "channel": value}, {"type": "ack", "channel": value}],
+                             [message.attributes for message in channel.sent_messages])
+            self.assertEqual([json.dumps({"type": "subscribed", "channel": value})], channel.received_json)
+
+    @syncify
+    async def test_websocket_channel_frames_only_match_their_channel(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response_timeout(0.1)
+            .with_channel_key("channel")
+            .with_channel("a", WSTest("a").with_response(WSResponse().with_attribute("type", "update")))
+            .with_channel("b", WSTest("b").with_response(WSResponse().with_attribute("type", "update")))
+        )
+
+        with self.assertRaises(WSTimeoutError) as context:
+            await self._run_triggers(ws_tester, [{"type": "update", "channel": "a"}])
+
+        self.assertTrue(ws_tester.channels["a"].is_complete())
+        self.assertFalse(ws_tester.channels["b"].is_complete())
+        self.assertFalse(ws_tester.is_complete())
+        self.assertEqual("Timed out waiting for responses:\nChannel \"b\":\n{\"type\": \"update\"}",
+                         str(context.exception))
+
+    def test_spawn_copies_channels(self):
+        channel = WSTest("channel").with_message(WSMessage())
+        template = WSTest("wss://example.com").with_channel_key("channel").with_channel(1, channel)
+
+        instance = template.spawn()
+
+        self.assertIsNot(channel, instance.channels[1])
+        self.assertIsNot(channel.messages, instance.channels[1].messages)
+        self.assertIs(channel.messages[0], instance.channels[1].messages[0])
+
+    def test_with_performance_objectives(self):
+        ws_tester = (
+            WSTest("wss://example.com")
+            .with_max_latency(p50=0.05, p99=0.2)
+            .with_max_latency(p99=0.1, metric="round_trip")
+            .with_min_throughput(1000)
+            .with_min_throughput(10, direction="sent")
+            .with_max_error_rate(0.001)
+        )
+
+        self.assertEqual([
+            {"metric": "response_latency/p50", "max": 0.05},
+            {"metric": "response_latency/p99", "max": 0.2},
+            {"metric": "round_trip/p99", "max": 0.1},
+            {"metric": "frames_received_per_second", "min": 1000},
+            {"metric": "frames_sent_per_second", "min": 10},
+            {"metric": "error_rate", "max": 0.001},
+        ], ws_tester.objectives)
+
+        with self.assertRaises(ValueError):
+            ws_tester.with_min_throughput(10, direction="both")
+
+    def test_correlated_latency_objectives_default_to_round_trip(self):
+        ws_tester = WSTest("wss://example.com").with_correlation("id").with_max_latency(p99=0.2)
+
+        self.assertEqual([{"metric": "round_trip/p99", "max": 0.2}], ws_tester.objectives)
+
+    @syncify
+    async def test_websocket_latency_is_timed_from_the_message_answered(self):
+        server = WSServer().with_reply(
+            WSResponse().with_attribute("type", "ping").with_trigger(WSMessage().with_attribute("type", "pong"))
+        ).with_reply(
+            WSResponse().with_attribute("type", "pong").with_trigger(WSMessage().with_attribute("type", "done"))
+        )
+        latencies = []
+
+        class Latencies(WSTracer):
+            def on_match(self, test, timestamp, response, latency):
+                latencies.append(latency)
+
+        async with server:
+            ws_tester = (
+                WSTest(server.uri)
+                .with_tracer(Latencies())
+                .with_max_latency(p99=0.3)
+                .with_message(WSMessage().with_attribute("type", "ping").with_delay(0.5))
+                .with_response(
+                    WSResponse()
+                    .with_attribute("type", "pong")
+                    .with_trigger(WSMessage().with_attribute("type", "pong").with_delay(0.5))
+                )
+                .with_response(WSResponse().with_attribute("type", "done"))
+            )
+
+            await ws_tester.run()
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(2, len(latencies))
+        self.assertLess(max(latencies), 0.3)
+
+    @syncify
+    async def test_websocket_latency_is_timed_after_the_response_it_waits_on(self):
+        first = WSResponse().with_attribute("type", "first")
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_response(first)
+            .with_response(WSResponse().with_attribute("type", "second").with_timeout(5.0, after=first))
+        )
+
+        await self._run_timed_frames(ws_tester, [(0.5, {"type": "first"}), (0.6, {"type": "second"})])
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertGreater(ws_tester.stats.response_latency.max, 0.4)
+        self.assertLess(ws_tester.stats.response_latency.percentile(50), 0.4)
+
+    @syncify
+    async def test_websocket_performance_objectives_met(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_max_latency(p99=1.0)
+            .with_max_error_rate(0.0)
+            .with_response(WSResponse().with_attribute("type", "hello"))
+        )
+
+        await self._run_triggers(ws_tester, [{"type": "hello"}])
+
+        self.assertTrue(ws_tester.is_complete())
+
+    @syncify
+    async def test_websocket_throughput_is_measured_from_the_start_of_the_run(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_min_throughput(1)
+            .with_response(WSResponse().with_attribute("type", "hello"))
+        )
+        created = ws_tester.stats.started
+
+        before_run = time.monotonic()
+        await self._run_triggers(ws_tester, [{"type": "hello"}])
+
+        self.assertIsNone(created)
+        self.assertGreaterEqual(ws_tester.stats.started, before_run)
+
+    @syncify
+    async def test_websocket_performance_objectives_missed(self):
+        ws_tester = (
+            WSTest("ws://example.com")
+            .with_max_latency(p50=0.05, p99=1.0)
+            .with_min_throughput(1000)
+            .with_response(WSResponse().with_attribute("type", "hello"))
+        )
+
+        with self.assertRaises(WSPerformanceError) as context:
+            await self._run_timed_frames(ws_tester, [(0.1, {"type": "hello"})])
+
+        self.assertTrue(ws_tester.is_complete())
+        self.assertEqual(["response_latency/p50", "frames_received_per_second"],
+                         [check["metric"] for check in context.exception.failures])
+        self.assertEqual(3, len(context.exception.report))
+        lines = str(context.exception).split("\n")
+        self.assertEqual("Missed performance objectives:", lines[0])
+        self.assertTrue(lines[1].startswith("response_latency/p50: "))
+        self.assertTrue(lines[1].endswith("(max 0.05)"))
+        self.assertGreater(context.exception.failures[0]["actual"], 0.05)
+        self.assertTrue(lines[2].endswith("(min 1000)"))
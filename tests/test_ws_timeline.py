@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import patch
+
+from pywsitest.ws_timeline import WSTimeline
+
+
+class WSTimelineTests(unittest.TestCase):
+
+    def test_create_ws_timeline(self):
+        timeline = WSTimeline()
+
+        self.assertEqual({
+            "dns": None,
+            "tcp_connect": None,
+            "connect": None,
+            "first_frame": None,
+            "last_match": None,
+            "finished": None,
+            "requests": [],
+        }, timeline.to_dict())
+
+    def test_mark(self):
+        with patch("time.monotonic", side_effect=[10.0, 10.5]):
+            timeline = WSTimeline()
+            offset = timeline.mark("connect")
+
+        self.assertEqual(0.5, offset)
+        self.assertEqual(0.5, timeline.connect)
+
+    def test_requests_to_dict(self):
+        timeline = WSTimeline()
+        timeline.requests.append((0.1, 0.2, "https://example.com"))
+
+        self.assertEqual([{"start": 0.1, "duration": 0.2, "uri": "https://example.com"}],
+                         timeline.to_dict()["requests"])
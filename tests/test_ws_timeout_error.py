@@ -1,6 +1,7 @@
 import unittest
 
 from pywsitest import WSTimeoutError
+from pywsitest.ws_timeline import WSTimeline
 
 
 class WSTimeoutErrorTests(unittest.TestCase):
@@ -8,3 +9,11 @@ class WSTimeoutErrorTests(unittest.TestCase):
     def test_receive_timeout_error(self):
         with self.assertRaises(WSTimeoutError):
             raise WSTimeoutError()
+
+    def test_timeout_error_with_timeline(self):
+        timeline = WSTimeline()
+
+        error = WSTimeoutError("Timed out", timeline=timeline)
+
+        self.assertEqual("Timed out", str(error))
+        self.assertEqual(timeline, error.timeline)
@@ -0,0 +1,17 @@
+import unittest
+
+from pywsitest import WSTracer
+
+
+class WSTracerTests(unittest.TestCase):
+
+    def test_hooks_do_nothing_by_default(self):
+        tracer = WSTracer()
+
+        self.assertIsNone(tracer.on_connect(None, 1.0, 0.1))
+        self.assertIsNone(tracer.on_send(None, 1.0, None, 10))
+        self.assertIsNone(tracer.on_receive(None, 1.0, "{}", 2))
+        self.assertIsNone(tracer.on_match(None, 1.0, None, 0.1))
+        self.assertIsNone(tracer.on_request_start(None, 1.0, None))
+        self.assertIsNone(tracer.on_request_end(None, 1.0, None, 0.1, None))
+        self.assertIsNone(tracer.on_timeout(None, 1.0, None))
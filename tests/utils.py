@@ -0,0 +1,26 @@
+import asyncio
+import threading
+
+
+def syncify(coro):
+    def wrapper(*args, **kwargs):
+        response = asyncio.run(coro(*args, **kwargs))
+        return response
+    return wrapper
+
+
+class LoopThread:
+    # an event loop in a daemon thread, for servers that tests making blocking calls connect to
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
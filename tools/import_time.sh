@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# the slowest imports of pywsitest and everything it exports, cumulative microseconds in the second column
+python -X importtime -c "from pywsitest import *" 2>&1 | sort -t'|' -k2 -n | tail -20